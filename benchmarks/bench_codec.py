@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Micro-benchmark the JSON codec backends on conversation-shaped documents.
+
+Usage: python benchmarks/bench_codec.py [--repeat 20] [--min-speedup 1.5] [--json]
+
+Documents range from a header-only idea to a multi-megabyte conversation
+with embedded files and a response. For each installed backend reports the
+best time to encode (indented, as conversations are written, and compact)
+and decode each document. With --min-speedup, exits non-zero if the
+fastest backend is not at least that many times faster than the standard
+library at decoding and indented encoding of the typical document, so
+regressions are caught. (On documents of several megabytes made of a few
+big strings decoding speeds are about even, as both spend their time
+copying the strings.)
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from synthetic import make_idea  # noqa: E402
+
+from ideacli import codec, store  # noqa: E402
+
+# name: (embedded files, size of each file)
+SHAPES = {
+    "small": (0, 0),
+    "typical": (3, 2000),
+    "large": (20, 20000),
+    "huge": (40, 100000),
+}
+
+
+def _documents():
+    rng = random.Random(0)
+    docs = {}
+    for name, (n_files, file_size) in SHAPES.items():
+        idea = make_idea(rng, f"{len(docs):08x}", n_files, file_size, min_files=n_files)
+        if n_files:
+            idea["state"] = "updated"
+            idea["response"] = {"analysis": idea["body"] * 10, "files": idea["files"]}
+        docs[name] = store.order_keys(idea)
+    return docs
+
+
+def _timed(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+def measure(docs, repeat):
+    results = {}
+    for name in codec.BACKENDS:
+        if codec.use(name) != name:
+            continue
+        results[name] = {}
+        for shape, doc in docs.items():
+            data = codec.dumps(doc, indent=True).encode("utf-8")
+            results[name][shape] = {
+                "size_kb": len(data) / 1000,
+                "dumps_ms": _timed(lambda d=doc: codec.dumps(d, indent=True), repeat),
+                "compact_ms": _timed(lambda d=doc: codec.dumps(d), repeat),
+                "loads_ms": _timed(lambda d=data: codec.loads(d), repeat),
+            }
+    codec.use()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--min-speedup", type=float,
+                        help="Fail unless the fastest backend beats json by this factor")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    docs = _documents()
+    results = measure(docs, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for shape in docs:
+            print(f"{shape} ({results['json'][shape]['size_kb']:.0f} kB)")
+            for name, by_shape in results.items():
+                times = by_shape[shape]
+                print(f"  {name:>8}  dumps {times['dumps_ms']:8.3f}ms  "
+                      f"compact {times['compact_ms']:8.3f}ms  loads {times['loads_ms']:8.3f}ms")
+
+    if args.min_speedup:
+        baseline = results["json"]["typical"]
+        fast = [name for name in results if name != "json"]
+        if not fast:
+            print("No fast backend installed", file=sys.stderr)
+            sys.exit(1)
+        for key in ("dumps_ms", "loads_ms"):
+            speedup = baseline[key] / min(results[name]["typical"][key] for name in fast)
+            if speedup < args.min_speedup:
+                print(f"Regression: {key} only {speedup:.2f}x faster than json",
+                      file=sys.stderr)
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
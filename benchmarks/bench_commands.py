@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""Time every ideacli subcommand against a generated repository.
+
+Usage:
+    python benchmarks/bench_commands.py [--ideas 2000] [--runs 20] [--output results.json]
+    python benchmarks/bench_commands.py --compare baseline.json [--threshold 1.25]
+
+Generates an .ideas_repo with --ideas conversations (file sizes drawn from a
+lognormal distribution, states mixed by --states weights), commits it to
+git, then calls the entry point of each command in-process --runs times on
+different ideas: list, show, enquire, update (on the ideas just enquired
+about), files, extract, import and status. The first 'list' builds the
+index and is reported separately as list_cold.
+
+Results are JSON: the parameters (which, with the fixed --seed, decide the
+generated repository), the ideacli commit they were measured on and the
+median and 90th percentile milliseconds per command. --compare reads such
+a file from another commit and exits non-zero if any median is more than
+--threshold times slower, so regressions show up.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from synthetic import generate_repo, lognormal_sizes  # noqa: E402
+
+from ideacli import commit, gitbackend, paths  # noqa: E402
+from ideacli.enquire import enquire  # noqa: E402
+from ideacli.files import extract_files, list_files  # noqa: E402
+from ideacli.importer import import_idea  # noqa: E402
+from ideacli.list import list_ideas  # noqa: E402
+from ideacli.repository import status  # noqa: E402
+from ideacli.show import show_idea  # noqa: E402
+from ideacli.update import update_idea  # noqa: E402
+
+COMMANDS = ("list_cold", "list", "show", "enquire", "update", "files", "extract", "import",
+            "status")
+
+
+def _source_commit():
+    """Return (commit, dirty) of the ideacli checkout being measured, or (None, None)."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    try:
+        head = subprocess.run(["git", "rev-parse", "HEAD"], cwd=here, check=True,
+                              capture_output=True, text=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               cwd=here, check=True, capture_output=True, text=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return head, bool(dirty.strip())
+
+
+def _parse_states(pairs):
+    """Turn ['added=5', 'updated=3'] into {'added': 5.0, 'updated': 3.0}."""
+    states = {}
+    for pair in pairs:
+        name, _, weight = pair.rpartition("=")
+        states[name] = float(weight)
+    return states
+
+
+def _call(func, args):
+    """Run a command entry point with its output discarded; returns elapsed seconds."""
+    with open(os.devnull, "w", encoding="utf-8") as devnull, \
+            contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+        start = time.perf_counter()
+        try:
+            func(SimpleNamespace(**args))
+        except SystemExit as e:
+            if e.code:
+                raise RuntimeError(f"{func.__name__}({args}) exited with {e.code}") from None
+        return time.perf_counter() - start
+
+
+@contextlib.contextmanager
+def _chdir(path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def _summary(timings):
+    timings = sorted(timings)
+    return {
+        "runs": len(timings),
+        "median_ms": statistics.median(timings) * 1000,
+        "p90_ms": timings[min(len(timings) - 1, int(len(timings) * 0.9))] * 1000,
+    }
+
+
+def measure(root, repo_path, ids, runs):
+    """Return {command: summary} for the commands, each run on different ideas."""
+    rng = random.Random(1)
+    sample = rng.sample(ids, min(len(ids), runs))
+    base = {"path": root}
+    timings = {name: [] for name in COMMANDS}
+
+    timings["list_cold"].append(_call(list_ideas, dict(base, workers=None)))
+    source = os.path.join(root, "imported.py")
+    with open(source, "w", encoding="utf-8") as f:
+        f.write("def imported():\n    return 42\n" * 50)
+    extract_dir = os.path.join(root, "extracted")
+    os.makedirs(extract_dir)
+
+    for idea_id in sample:
+        timings["list"].append(_call(list_ideas, dict(base, workers=None)))
+        timings["show"].append(_call(show_idea, dict(base, id=idea_id)))
+        timings["files"].append(_call(list_files, dict(base, id=idea_id)))
+        # enquire then update walks the idea through a round trip with an LLM
+        timings["enquire"].append(_call(enquire, dict(base, id=idea_id, prompt=None,
+                                                      output=None)))
+        answer = {"files_needed": ["src/module_0.py"], "files": {},
+                  "analysis": "Synthetic answer"}
+        timings["update"].append(_call(update_idea, dict(base, id=idea_id,
+                                                         json=json.dumps(answer))))
+        timings["import"].append(_call(import_idea, dict(base, id=idea_id, source=source,
+                                                         destination=None, force=True)))
+        with _chdir(extract_dir):
+            timings["extract"].append(_call(extract_files, dict(base, id=idea_id)))
+    for _ in sample:
+        timings["status"].append(_call(status, dict(base, workers=None)))
+    return {name: _summary(values) for name, values in timings.items() if values}
+
+
+def compare(results, baseline, threshold):
+    """Print median ratios against baseline; returns the commands over threshold."""
+    if results["params"] != baseline.get("params"):
+        print("Warning: parameters differ from the baseline, results are not comparable",
+              file=sys.stderr)
+    slower = []
+    print(f"{'command':>10} {'baseline':>10} {'now':>10} {'ratio':>7}")
+    for name, summary in results["commands"].items():
+        before = baseline.get("commands", {}).get(name)
+        if not before:
+            continue
+        ratio = summary["median_ms"] / before["median_ms"] if before["median_ms"] else 1.0
+        flag = "  <-- slower" if ratio > threshold else ""
+        print(f"{name:>10} {before['median_ms']:9.2f}ms {summary['median_ms']:9.2f}ms "
+              f"{ratio:6.2f}x{flag}")
+        if ratio > threshold:
+            slower.append(name)
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ideas", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=20, help="Calls per command")
+    parser.add_argument("--max-files", type=int, default=5, help="Embedded files per idea, at most")
+    parser.add_argument("--file-size", type=int, default=2000,
+                        help="Median characters per embedded file")
+    parser.add_argument("--file-size-sigma", type=float, default=1.0,
+                        help="Spread of file sizes (lognormal sigma; 0 for fixed sizes)")
+    parser.add_argument("--max-file-size", type=int, default=200000)
+    parser.add_argument("--states", nargs="+", metavar="STATE=WEIGHT",
+                        default=["added=5", "analysis requested=2", "updated=3"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="Results file to compare with")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="Slowdown ratio --compare fails at (default: 1.25)")
+    args = parser.parse_args()
+
+    # Keep runs off the user's clipboard, and timing the same code everywhere
+    sys.modules["pyperclip"] = None
+    os.environ.setdefault("IDEACLI_NO_DAEMON", "1")
+
+    params = {
+        "ideas": args.ideas, "runs": args.runs, "max_files": args.max_files,
+        "file_size": args.file_size, "file_size_sigma": args.file_size_sigma,
+        "max_file_size": args.max_file_size, "states": _parse_states(args.states),
+        "seed": args.seed,
+    }
+    head, dirty = _source_commit()
+    results = {
+        "params": params,
+        "commit": head,
+        "dirty": dirty,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+    root = tempfile.mkdtemp(prefix="ideacli-bench-commands-")
+    try:
+        start = time.perf_counter()
+        sizes = lognormal_sizes(args.file_size, args.file_size_sigma, args.max_file_size)
+        repo_path = generate_repo(root, args.ideas, args.max_files, sizes, args.seed,
+                                  params["states"])
+        gitbackend.get_backend(repo_path).init()
+        commit.commit_paths(repo_path, [p for p, _, _ in paths.scan(repo_path).values()],
+                            "Synthetic ideas")
+        results["generate_s"] = time.perf_counter() - start
+        results["commands"] = measure(root, repo_path, sorted(paths.scan(repo_path)),
+                                      args.runs)
+    finally:
+        shutil.rmtree(root)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            slower = compare(results, json.load(f), args.threshold)
+        if slower:
+            print(f"Slower than the baseline: {', '.join(slower)}", file=sys.stderr)
+            sys.exit(1)
+    elif not args.output:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
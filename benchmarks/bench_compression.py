@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Compare conversation compression methods.
+
+Usage: python benchmarks/bench_compression.py [--ideas 5000] [--reads 1000] [--git]
+
+For each method (none, gzip and, if zstandard is installed, zstd) reports
+the total size of the conversation files, the time to load whole
+conversations and just their headers and, with --git, the time of
+'git repack -adf' and the resulting pack size.
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from synthetic import generate_repo  # noqa: E402
+
+from ideacli import commit, compression, gitbackend, migrate, paths, store  # noqa: E402
+
+
+def _timed(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+def _pack_size(repo_path):
+    pack_dir = os.path.join(repo_path, ".git", "objects", "pack")
+    return sum(os.path.getsize(os.path.join(pack_dir, name)) for name in os.listdir(pack_dir))
+
+
+def measure(repo_path, sample, git):
+    files = [p for p, _, _ in paths.scan(repo_path).values()]
+    results = {
+        "size_mb": sum(os.path.getsize(p) for p in files) / 1e6,
+        "load_us": (_timed(lambda: [store.load_conversation(p) for p in sample])
+                    * 1000 / len(sample)),
+        "header_us": (_timed(lambda: [store.read_header(p) for p in sample])
+                      * 1000 / len(sample)),
+    }
+    if git:
+        commit.commit_paths(repo_path, files, "Benchmark")
+        results["repack_ms"] = _timed(
+            lambda: subprocess.run(["git", "repack", "-adf", "-q"], cwd=repo_path, check=True),
+            repeat=1)
+        results["pack_mb"] = _pack_size(repo_path) / 1e6
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ideas", type=int, default=5000)
+    parser.add_argument("--reads", type=int, default=1000)
+    parser.add_argument("--git", action="store_true", help="Also time 'git repack'")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    methods = ["none", "gzip"] + (["zstd"] if compression.HAS_ZSTD else [])
+    os.environ["IDEACLI_FSYNC"] = "0"
+    results = {}
+    for method in methods:
+        # A fresh repository per method, so each repack only sees its own history
+        root = tempfile.mkdtemp(prefix="ideacli-bench-compression-")
+        try:
+            repo_path = generate_repo(root, args.ideas)
+            if args.git:
+                gitbackend.get_backend(repo_path).init()
+            migrate.recompress(repo_path, method)
+            files = sorted(p for p, _, _ in paths.scan(repo_path).values())
+            sample = random.Random(0).sample(files, min(args.reads, len(files)))
+            results[method] = measure(repo_path, sample, args.git)
+        finally:
+            shutil.rmtree(root)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for key in results["none"]:
+        print(f"{key:>10} " + "  ".join(f"{m} {results[m][key]:10.2f}" for m in methods))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Compare per-operation latency of the git backends.
+
+Usage: python benchmarks/bench_git.py [--commits 50] [--preload 1000]
+
+For each available backend, a repository is preloaded with --preload
+conversations, then --commits single-idea commits and a status call are
+timed. The status call is the summary 'ideacli status' uses.
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from ideacli import commit, gitbackend, paths, store
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from synthetic import generate_repo, make_idea  # noqa: E402
+
+
+def bench(backend_name, n_commits, preload):
+    os.environ["IDEACLI_GIT_BACKEND"] = backend_name
+    root = tempfile.mkdtemp(prefix="ideacli-bench-git-")
+    try:
+        repo_path = generate_repo(root, preload)
+        gitbackend.get_backend(repo_path).init()
+        commit.commit_paths(repo_path, [path for path, _, _ in paths.scan(repo_path).values()],
+                            "Preload")
+
+        rng = random.Random(1)
+        latencies = []
+        for n in range(n_commits):
+            idea_id = f"b{n:07x}"
+            idea_path = paths.idea_path(repo_path, idea_id)
+            store.save_conversation(idea_path, make_idea(rng, idea_id))
+            start = time.perf_counter()
+            commit.commit_paths(repo_path, [idea_path], f"Add idea: {idea_id}")
+            latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        gitbackend.get_backend(repo_path).summary()
+        status_time = time.perf_counter() - start
+        return {
+            "backend": backend_name,
+            "commit_median": statistics.median(latencies),
+            "commit_max": max(latencies),
+            "status": status_time,
+        }
+    finally:
+        shutil.rmtree(root)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commits", type=int, default=50)
+    parser.add_argument("--preload", type=int, default=1000)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    for var, value in (("GIT_AUTHOR_NAME", "bench"), ("GIT_AUTHOR_EMAIL", "bench@example.com"),
+                       ("GIT_COMMITTER_NAME", "bench"),
+                       ("GIT_COMMITTER_EMAIL", "bench@example.com")):
+        os.environ.setdefault(var, value)
+
+    backends = ["subprocess"] + (["dulwich"] if gitbackend.HAS_DULWICH else [])
+    results = [bench(name, args.commits, args.preload) for name in backends]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'backend':>12} {'commit median':>14} {'commit max':>11} {'status':>9}")
+    for row in results:
+        print(f"{row['backend']:>12} {row['commit_median'] * 1000:>12.1f}ms "
+              f"{row['commit_max'] * 1000:>9.1f}ms {row['status'] * 1000:>7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Compare the flat and sharded conversation layouts.
+
+Usage: python benchmarks/bench_layout.py [--ideas 100000] [--lookups 10000] [--git]
+
+Times listing the conversations (a plain listdir and ideacli's scan), ID
+lookups and, with --git, 'git status' in each layout.
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from synthetic import generate_repo  # noqa: E402
+
+from ideacli import commit, gitbackend, migrate, paths  # noqa: E402
+
+
+def _timed(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+def _listdir_all(repo_path):
+    top = paths.conversation_dir(repo_path)
+    for name in os.listdir(top):
+        if not name.endswith(".json"):
+            os.listdir(os.path.join(top, name))
+
+
+def measure(repo_path, ids, git):
+    results = {
+        "listdir_ms": _timed(lambda: _listdir_all(repo_path)),
+        "scan_ms": _timed(lambda: paths.scan(repo_path)),
+        "lookup_us": (_timed(lambda: [os.stat(paths.idea_path(repo_path, i)) for i in ids])
+                      * 1000 / len(ids)),
+    }
+    if git:
+        results["git_status_ms"] = _timed(
+            lambda: subprocess.run(["git", "status", "--porcelain"], cwd=repo_path, check=True,
+                                   stdout=subprocess.DEVNULL))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ideas", type=int, default=100000)
+    parser.add_argument("--lookups", type=int, default=10000)
+    parser.add_argument("--git", action="store_true", help="Also time 'git status'")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    os.environ["IDEACLI_FSYNC"] = "0"
+    root = tempfile.mkdtemp(prefix="ideacli-bench-layout-")
+    try:
+        repo_path = generate_repo(root, args.ideas, max_files=0)
+        rng = random.Random(0)
+        ids = [f"{rng.randrange(args.ideas):08x}" for _ in range(args.lookups)]
+        batch = None
+        if args.git:
+            gitbackend.get_backend(repo_path).init()
+            commit.commit_paths(repo_path, [p for p, _, _ in paths.scan(repo_path).values()],
+                                "Preload")
+            batch = commit.Batch(repo_path)
+
+        results = {"flat": measure(repo_path, ids, args.git)}
+        start = time.perf_counter()
+        migrate.relayout(repo_path, "sharded", batch)
+        if batch:
+            batch.commit("Shard")
+            batch.close()
+        results["migrate_s"] = time.perf_counter() - start
+        results["sharded"] = measure(repo_path, ids, args.git)
+    finally:
+        shutil.rmtree(root)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"migration {results['migrate_s']:.2f}s")
+    for key in results["flat"]:
+        print(f"{key:>14} flat {results['flat'][key]:10.2f}  "
+              f"sharded {results['sharded'][key]:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
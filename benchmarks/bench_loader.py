@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Benchmark bulk conversation loading with different worker counts.
+
+Usage: python benchmarks/bench_loader.py [--sizes 1000 10000 100000] [--workers 1 4 8 16]
+
+Runs against a freshly generated repository, so files are usually in the
+page cache; on network filesystems or after dropping caches the gap between
+serial and parallel loading is much larger.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from ideacli import index, loader, paths, store
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from synthetic import generate_repo  # noqa: E402
+
+
+def _timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def bench(n_ideas, worker_counts, file_size):
+    root = tempfile.mkdtemp(prefix="ideacli-bench-")
+    try:
+        repo_path = generate_repo(root, n_ideas, file_size=file_size)
+        files = sorted(path for path, _, _ in paths.scan(repo_path).values())
+
+        results = {"ideas": n_ideas}
+        for workers in worker_counts:
+            results[f"load_w{workers}"] = _timed(
+                lambda: loader.load_all(repo_path, files, workers=workers, processes=False))
+            results[f"header_w{workers}"] = _timed(
+                lambda: loader.load_all(repo_path, files, reader=store.read_header,
+                                        workers=workers, processes=False))
+        results["index_cold"] = _timed(lambda: index.entries(repo_path))
+        results["index_warm"] = _timed(lambda: index.entries(repo_path))
+        return results
+    finally:
+        shutil.rmtree(root)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--file-size", type=int, default=2000,
+                        help="Characters per embedded file")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = [bench(n, args.workers, args.file_size) for n in args.sizes]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    columns = [key for key in results[0] if key != "ideas"]
+    print(f"{'ideas':>8} " + " ".join(f"{c:>12}" for c in columns))
+    for row in results:
+        print(f"{row['ideas']:>8} " + " ".join(f"{row[c]:>11.3f}s" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Measure 'ideacli search' index build, incremental refresh and query times.
+
+Usage: python benchmarks/bench_search.py [--ideas 100000] [--queries 20]
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from synthetic import generate_repo  # noqa: E402
+
+from ideacli import paths, search, store  # noqa: E402
+
+QUERIES = ["ab", "subject:ab", "ab* cd*", '"ab cd"', "files:ab NOT body:cd"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ideas", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--file-size", type=int, default=2000)
+    args = parser.parse_args()
+
+    os.environ["IDEACLI_FSYNC"] = "0"
+    root = tempfile.mkdtemp(prefix="ideacli-bench-search-")
+    try:
+        start = time.perf_counter()
+        repo_path = generate_repo(root, args.ideas, file_size=args.file_size)
+        print(f"generate    {time.perf_counter() - start:8.2f}s")
+
+        start = time.perf_counter()
+        search.search(repo_path, "warmup")
+        print(f"build       {time.perf_counter() - start:8.2f}s")
+
+        idea_file = paths.idea_path(repo_path, "00000000")
+        idea = store.load_conversation(idea_file)
+        idea["subject"] += " zzbenchmark"
+        store.save_conversation(idea_file, idea)
+        start = time.perf_counter()
+        assert search.search(repo_path, "zzbenchmark")
+        print(f"one change  {(time.perf_counter() - start) * 1000:8.1f}ms")
+
+        for query in QUERIES:
+            timings = []
+            for _ in range(args.queries):
+                start = time.perf_counter()
+                search.search(repo_path, query)
+                timings.append(time.perf_counter() - start)
+            print(f"{query:<24} {statistics.median(timings) * 1000:8.1f}ms")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
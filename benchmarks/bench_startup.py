@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Measure end-to-end wall-clock time of short ideacli commands.
+
+Usage: python benchmarks/bench_startup.py [--runs 20] [--ideas 100] [--budget-ms 150]
+
+Each command runs in a fresh interpreter, as it does from a shell script.
+With --budget-ms the script exits non-zero if any median exceeds it.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from synthetic import generate_repo  # noqa: E402
+
+
+def time_command(root, argv, runs):
+    # Same as the installed 'ideacli' console script
+    command = [sys.executable, "-c", "from ideacli.cli import main; main()", *argv]
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=root, check=True, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--ideas", type=int, default=100)
+    parser.add_argument("--budget-ms", type=float, help="Fail if a median exceeds this")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="ideacli-bench-startup-")
+    try:
+        generate_repo(root, args.ideas)
+        commands = {
+            "python": None,
+            "version": ["version"],
+            "list": ["list"],
+            "show": ["show", "--id", "00000000"],
+        }
+        results = {}
+        for name, argv in commands.items():
+            if argv is None:
+                start_argv = [sys.executable, "-c", "pass"]
+                timings = []
+                for _ in range(args.runs):
+                    start = time.perf_counter()
+                    subprocess.run(start_argv, check=True)
+                    timings.append(time.perf_counter() - start)
+                results[name] = statistics.median(timings) * 1000
+            else:
+                results[name] = time_command(root, argv, args.runs)
+    finally:
+        shutil.rmtree(root)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for name, ms in results.items():
+            print(f"{name:>10} {ms:8.1f}ms")
+
+    if args.budget_ms is not None:
+        over = [name for name, ms in results.items() if ms > args.budget_ms]
+        if over:
+            print(f"Over budget ({args.budget_ms}ms): {', '.join(over)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Evaluate local file selection against the files the LLM asked for.
+
+Usage:
+    python benchmarks/eval_selection.py --path PROJECT [--max-files 5] [--max-tokens 0]
+    python benchmarks/eval_selection.py --synthetic 200
+
+Every conversation of the ideas repository in PROJECT that recorded a
+files_needed list (the LLM's answer to "which files do you need?") is run
+through ideacli.retrieval.select_files, and its picks are scored against
+that list: precision, recall, F1, how often at least one needed file was
+picked, and the mean reciprocal rank of the first needed file in the full
+ranking. --synthetic generates ideas instead, whose bodies mention a few
+words from the files marked as needed, to check the harness and rough
+behaviour without a history of real conversations.
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from synthetic import generate_repo  # noqa: E402
+
+from ideacli import paths, retrieval, store  # noqa: E402
+from ideacli.model import Conversation  # noqa: E402
+
+
+def _score(picked, ranking, needed):
+    hits = len(set(picked) & needed)
+    precision = hits / len(picked) if picked else 0.0
+    recall = hits / len(needed)
+    f1 = 2 * precision * recall / (precision + recall) if hits else 0.0
+    first = next((n for n, (name, _) in enumerate(ranking, 1) if name in needed), None)
+    return {"precision": precision, "recall": recall, "f1": f1, "hit": float(hits > 0),
+            "mrr": 1 / first if first else 0.0}
+
+
+def evaluate(repo_path, max_files, max_tokens, verbose=False):
+    """Return {metric: mean} over the conversations with files_needed, and their number."""
+    results = []
+    for _, (idea_file, _, _) in sorted(paths.scan(repo_path).items()):
+        conversation = Conversation.load(idea_file)
+        needed = conversation.get("files_needed")
+        names = set(conversation.file_names())
+        if not isinstance(needed, list):
+            continue
+        needed = {name for name in needed if name in names}
+        if not needed:
+            continue
+        picked = [name for name, _ in retrieval.select_files(repo_path, conversation,
+                                                             max_files, max_tokens)]
+        texts = retrieval.file_texts(repo_path, conversation)
+        query = f"{conversation.subject or ''}\n{conversation.body or ''}"
+        score = _score(picked, retrieval.rank(query, texts), needed)
+        results.append(score)
+        if verbose:
+            print(f"[{conversation.id}] needed {sorted(needed)} picked {picked} "
+                  f"f1 {score['f1']:.2f}")
+    if not results:
+        return {}, 0
+    return {key: statistics.mean(r[key] for r in results) for key in results[0]}, len(results)
+
+
+def generate(root, n_ideas, seed):
+    """Generate ideas with files_needed: their bodies quote words of those files."""
+    rng = random.Random(seed)
+    repo_path = generate_repo(root, n_ideas, max_files=8, file_size=1500, seed=seed)
+    for _, (idea_file, _, _) in paths.scan(repo_path).items():
+        idea = store.load_conversation(idea_file)
+        files = list(idea.get("files", {}))
+        if len(files) < 2:
+            continue
+        needed = rng.sample(files, rng.randint(1, min(3, len(files))))
+        hints = []
+        for name in needed:
+            hints.extend(rng.sample(idea["files"][name]["content"].split(), 3))
+        idea["body"] += "\n" + " ".join(hints)
+        idea["files_needed"] = needed
+        store.save_conversation(idea_file, idea)
+    return repo_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--path", help="Project whose .ideas_repo to evaluate on")
+    parser.add_argument("--synthetic", type=int, metavar="N",
+                        help="Evaluate on N generated ideas instead")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-files", type=int, default=5)
+    parser.add_argument("--max-tokens", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="Print every conversation")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+    if bool(args.path) == bool(args.synthetic):
+        parser.error("give either --path or --synthetic")
+
+    root = tempfile.mkdtemp(prefix="ideacli-eval-") if args.synthetic else None
+    try:
+        if root:
+            repo_path = generate(root, args.synthetic, args.seed)
+        else:
+            repo_path = os.path.join(os.path.abspath(args.path), ".ideas_repo")
+        metrics, count = evaluate(repo_path, args.max_files, args.max_tokens, args.verbose)
+    finally:
+        if root:
+            shutil.rmtree(root)
+
+    if not count:
+        print("No conversations with files_needed to evaluate on", file=sys.stderr)
+        sys.exit(1)
+    if args.json:
+        print(json.dumps({"conversations": count, **metrics}, indent=2))
+    else:
+        print(f"{count} conversations")
+        for key, value in metrics.items():
+            print(f"  {key:>9}: {value:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Generate synthetic ideas repositories for benchmarking."""
+
+import math
+import os
+import random
+import string
+
+from ideacli import paths, store
+
+STATES = ("added", "analysis requested", "updated")
+
+
+def _text(rng, size):
+    """Return roughly size characters of source-like text."""
+    words = []
+    length = 0
+    while length < size:
+        word = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(2, 9)))
+        words.append(word)
+        length += len(word) + 1
+    lines = [" ".join(words[i:i + 12]) for i in range(0, len(words), 12)]
+    return "\n".join(lines)[:size]
+
+
+def lognormal_sizes(median, sigma, limit=None):
+    """Return a file size sampler: lognormal around median, capped at limit characters.
+
+    Real projects have many small files and a long tail of big ones; sigma
+    sets how long the tail is (0 gives every file the median size).
+    """
+    mu = math.log(max(1, median))
+
+    def sample(rng):
+        size = int(rng.lognormvariate(mu, sigma)) if sigma else median
+        return min(size, limit) if limit else size
+    return sample
+
+
+def _choose_state(rng, states):
+    if not states:
+        return rng.choice(STATES)
+    return rng.choices(list(states), weights=list(states.values()))[0]
+
+
+def make_idea(rng, idea_id, max_files=3, file_size=2000, min_files=0, states=None):
+    """Return a conversation dict with min_files to max_files embedded files.
+
+    file_size is a number of characters or a sampler such as
+    lognormal_sizes(); states maps each state to its weight (default: all
+    equally likely).
+    """
+    size = file_size if callable(file_size) else (lambda _: file_size)
+    idea = {
+        "id": idea_id,
+        "subject": _text(rng, rng.randint(15, 60)).replace("\n", " "),
+        "state": _choose_state(rng, states),
+        "body": _text(rng, rng.randint(100, 800)),
+    }
+    n_files = rng.randint(min_files, max_files)
+    if n_files:
+        idea["files"] = {
+            f"module_{i}.py": {"content": _text(rng, size(rng)), "path": "src"}
+            for i in range(n_files)
+        }
+        idea["prompt"] = _text(rng, size(rng) // 2)
+    return idea
+
+
+def generate_repo(root, n_ideas, max_files=3, file_size=2000, seed=0, states=None):
+    """Create root/.ideas_repo with n_ideas conversations and return its path.
+
+    See make_idea for file_size and states.
+    """
+    rng = random.Random(seed)
+    repo_path = os.path.join(root, ".ideas_repo")
+    os.makedirs(paths.conversation_dir(repo_path), exist_ok=True)
+    for n in range(n_ideas):
+        idea_id = f"{n:08x}"
+        idea_file = paths.idea_path(repo_path, idea_id)
+        paths.ensure_parent(idea_file)
+        store.save_conversation(idea_file,
+                                make_idea(rng, idea_id, max_files, file_size, states=states))
+    return repo_path
@@ -3,6 +3,7 @@ import json
 import sys
 import os
 
+
 def extract_filename_and_path(key):
     # If key includes a path, split it
     if "/" in key:
@@ -10,6 +11,7 @@ def extract_filename_and_path(key):
         return filename, path
     return key, ""
 
+
 def normalize_files(files):
     new_files = {}
     # Legacy: dict mapping str to str, or str to {content, path}
@@ -17,10 +19,17 @@ def normalize_files(files):
         filename, path = extract_filename_and_path(key)
         if isinstance(value, dict):
             # Already in new form, but ensure both keys exist
-            content = value.get("content", "")
             vpath = value.get("path", path)
             if vpath is None:
                 vpath = ""
+            if "blob" in value and "content" not in value:
+                # Body lives in the blob store; keep the reference
+                new_files[filename] = {
+                    "blob": value["blob"],
+                    "path": vpath
+                }
+                continue
+            content = value.get("content", "")
             new_files[filename] = {
                 "content": content,
                 "path": vpath
@@ -35,6 +44,7 @@ def normalize_files(files):
             print(f"WARNING: Ignoring unexpected value for file {key}: {value}", file=sys.stderr)
     return new_files
 
+
 def cleanup_idea_json(data):
     # Normalize root-level files
     if "files" in data and isinstance(data["files"], dict):
@@ -47,6 +57,7 @@ def cleanup_idea_json(data):
 
     return data
 
+
 if __name__ == "__main__":
     input_data = json.load(sys.stdin)
     cleaned = cleanup_idea_json(input_data)
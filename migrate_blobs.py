@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Move the file bodies of an ideas repository into its blob store, or back.
+
+Usage: python migrate_blobs.py [--path DIR] [--inline] [--gc]
+
+By default every embedded file body is written to .ideas_repo/blobs/ and
+replaced by its hash; --inline does the reverse. --gc deletes blobs no
+conversation refers to any more (e.g. after 'ideacli rm'). Set
+"blob_store": true in .ideas_repo/config.json so new files are stored the
+same way.
+"""
+import argparse
+import os
+import sys
+
+from ideacli import blobs, index, paths, store
+from ideacli.repository import resolve_idea_path
+
+
+def migrate(repo_path, inline=False):
+    """Convert every conversation; returns the number of files rewritten."""
+    convert = blobs.inline_idea if inline else blobs.externalize_idea
+    changed = []
+    for name, (idea_file, _, _) in sorted(paths.scan(repo_path).items()):
+        idea = store.load_conversation(idea_file)
+        if convert(repo_path, idea):
+            store.save_conversation(idea_file, idea)
+            changed.append((name, idea))
+    index.record_many(repo_path, changed)
+    return len(changed)
+
+
+def collect_garbage(repo_path):
+    """Delete unreferenced blobs; returns how many were removed."""
+    live = set()
+    for idea_file, _, _ in paths.scan(repo_path).values():
+        live.update(blobs.referenced(store.load_conversation(idea_file)))
+    removed = 0
+    blob_dir = os.path.join(repo_path, blobs.BLOB_DIR)
+    for prefix in os.listdir(blob_dir) if os.path.isdir(blob_dir) else []:
+        for rest in os.listdir(os.path.join(blob_dir, prefix)):
+            if prefix + rest not in live:
+                os.remove(os.path.join(blob_dir, prefix, rest))
+                removed += 1
+        if not os.listdir(os.path.join(blob_dir, prefix)):
+            os.rmdir(os.path.join(blob_dir, prefix))
+    return removed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--path", help="Path to ideas repository")
+    parser.add_argument("--inline", action="store_true",
+                        help="Move blob contents back into the conversation files")
+    parser.add_argument("--gc", action="store_true", help="Delete unreferenced blobs")
+    args = parser.parse_args()
+
+    repo_path = resolve_idea_path(args)
+    if not os.path.isdir(paths.conversation_dir(repo_path)):
+        print(f"Error: no ideas repository at {repo_path}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Rewrote {migrate(repo_path, args.inline)} conversation(s).")
+    if args.gc:
+        print(f"Removed {collect_garbage(repo_path)} unreferenced blob(s).")
@@ -1,14 +1,19 @@
 """CLI tool for managing LLM conversation ideas."""
 
 # Use relative import
-from .cli import main
+from .cli import main  # noqa: F401  (re-exported as ideacli.main)
 
-try:
-    from importlib.metadata import version, PackageNotFoundError
-except ImportError:  # For Python <3.8, but you can skip this if you only support 3.8+
-    from importlib_metadata import version, PackageNotFoundError
 
-try:
-    __version__ = version("ideacli")
-except PackageNotFoundError:
-    __version__ = "unknown"
+def __getattr__(name):
+    """Compute __version__ on first use, as importlib.metadata is slow to import."""
+    if name == "__version__":
+        try:
+            from importlib.metadata import version, PackageNotFoundError
+        except ImportError:  # For Python <3.8, but you can skip this if you only support 3.8+
+            from importlib_metadata import version, PackageNotFoundError
+
+        try:
+            return version("ideacli")
+        except PackageNotFoundError:
+            return "unknown"
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,24 +2,35 @@
 
 import os
 import sys
-import json
+import time
 import uuid
-import subprocess
+from ideacli import codec, commit, index, paths, store
 from ideacli.repository import resolve_idea_path
 from ideacli.clipboard import copy_to_clipboard
 
 ERROR_REPO_NOT_FOUND = "Error: ideas repository not found at '{}'. Forget to run 'ideacli init'?"
+# Number of bulk-added ideas recorded in the index per transaction
+INDEX_CHUNK_SIZE = 1000
+
 
 def add(args):
     """Add by prompting user/reading piped input, saves, commits & copies ID to clipboard."""
     repo_path = resolve_idea_path(args)
 
     # Check that conversations directory exists
-    conversation_dir = os.path.join(repo_path, "conversations")
+    conversation_dir = paths.conversation_dir(repo_path)
     if not os.path.exists(conversation_dir):
         print(ERROR_REPO_NOT_FOUND.format(repo_path), file=sys.stderr)
         sys.exit(1)
 
+    if getattr(args, "jsonl", None):
+        try:
+            add_jsonl(args, repo_path)
+        except OSError as e:
+            print(f"Error reading {args.jsonl}: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+
     if sys.stdin.isatty():
         # Interactive
         subject = input("Subject: ").strip()
@@ -38,31 +49,118 @@ def add(args):
         print("Error: Both subject and body are required.", file=sys.stderr)
         sys.exit(1)
 
-    # Create unique random ID
-    idea_id = str(uuid.uuid4())[:8]  # Short UUID
+    idea_id, idea_path = _save_idea(repo_path, subject, body)
+
+    # Git commit, now or with the next 'ideacli commit'
+    message = f"Add idea: {idea_id} - {subject}"
+    if getattr(args, "no_commit", False):
+        commit.defer(repo_path, [idea_path], message)
+        outcome = "queued for commit"
+    else:
+        commit.commit_paths(repo_path, [idea_path], message)
+        outcome = "committed"
+
+    # Clipboard
+    copy_to_clipboard(idea_id)
+    print(f"Idea '{subject}' saved as {idea_id} and {outcome}.")
+
+
+def _new_id(repo_path):
+    """Return a random short ID that no conversation uses yet."""
+    while True:
+        idea_id = str(uuid.uuid4())[:8]  # Short UUID
+        # A single directory lookup, whatever the number of ideas
+        if not os.path.lexists(paths.idea_path(repo_path, idea_id)):
+            return idea_id
+
+
+def _new_idea(repo_path, subject, body):
+    """Return a new conversation for subject and body."""
+    idea_id = _new_id(repo_path)
 
-    # Prepare JSON
-    idea = {
+    return {
         "id": idea_id,
         "subject": subject,
+        "state": "added",
         "body": body
     }
 
-    # Write file
-    conversation_dir = os.path.join(repo_path, "conversations")
-    os.makedirs(conversation_dir, exist_ok=True)
-    idea_path = os.path.join(conversation_dir, f"{idea_id}.json")
-    with open(idea_path, "w", encoding="utf-8") as f:
-        json.dump(idea, f, indent=2)
-
-    # Git commit
-    subprocess.run(["git", "add", "."], cwd=repo_path, check=True)
-    subprocess.run(
-        ["git", "commit", "-m", f"Add idea: {idea_id} - {subject}"],
-        cwd=repo_path,
-        check=True
-    )
 
-    # Clipboard
-    copy_to_clipboard(idea_id)
-    print(f"Idea '{subject}' saved as {idea_id} and committed.")
+def _write_idea(repo_path, idea):
+    """Write a new conversation file and return its path."""
+    idea_path = paths.idea_path(repo_path, idea["id"])
+    paths.ensure_parent(idea_path)
+    store.save_conversation(idea_path, idea)
+    return idea_path
+
+
+def _save_idea(repo_path, subject, body):
+    """Create, write and index a new idea; returns (idea_id, idea_path)."""
+    idea = _new_idea(repo_path, subject, body)
+    idea_path = _write_idea(repo_path, idea)
+    index.record(repo_path, idea["id"], idea)
+    return idea["id"], idea_path
+
+
+def _jsonl_records(stream):
+    """Yield (subject, body) for every valid record of a JSONL stream, warning about the rest."""
+    for line_no, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = codec.loads(line)
+        except ValueError as e:
+            print(f"Warning: skipping line {line_no}: {e}", file=sys.stderr)
+            continue
+        if not isinstance(record, dict):
+            print(f"Warning: skipping line {line_no}: not a JSON object", file=sys.stderr)
+            continue
+        subject = str(record.get("subject") or "").strip()
+        body = str(record.get("body") or "").strip()
+        if not subject or not body:
+            print(f"Warning: skipping line {line_no}: both subject and body are required",
+                  file=sys.stderr)
+            continue
+        yield subject, body
+
+
+def add_jsonl(args, repo_path):
+    """Add one idea per JSONL record ({"subject": ..., "body": ...}) with a single commit.
+
+    Records are streamed and index updates are flushed in chunks, so memory
+    use doesn't grow with the size of the input.
+    """
+    source = args.jsonl
+    stream = sys.stdin if source == "-" else open(source, "r", encoding="utf-8")
+    no_commit = getattr(args, "no_commit", False)
+    sink = commit.Queue(repo_path) if no_commit else commit.Batch(repo_path)
+    start = time.perf_counter()
+    count = 0
+    try:
+        unindexed = []
+        for subject, body in _jsonl_records(stream):
+            idea = _new_idea(repo_path, subject, body)
+            idea_path = _write_idea(repo_path, idea)
+            if no_commit:
+                sink.add([idea_path], f"Add idea: {idea['id']} - {subject}")
+            else:
+                sink.add(idea_path)
+            unindexed.append((idea["id"], idea))
+            if len(unindexed) >= INDEX_CHUNK_SIZE:
+                index.record_many(repo_path, unindexed)
+                unindexed = []
+            count += 1
+        index.record_many(repo_path, unindexed)
+
+        if count and not no_commit:
+            name = "stdin" if source == "-" else os.path.basename(source)
+            sink.commit(f"Add {count} ideas from {name}")
+    finally:
+        sink.close()
+        if stream is not sys.stdin:
+            stream.close()
+
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed else 0.0
+    outcome = "queued for commit" if no_commit else "committed"
+    print(f"Added {count} ideas in {elapsed:.2f}s ({rate:.0f} ideas/s), {outcome}.")
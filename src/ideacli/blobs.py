@@ -0,0 +1,141 @@
+"""Content-addressed storage for the files embedded in conversations.
+
+When the ``blob_store`` setting is on, file bodies are written once to
+``.ideas_repo/blobs/<2 hex>/<62 hex>`` (named by the SHA-256 of the
+content) and the conversation JSON keeps only a reference in place of the
+content::
+
+    "files": {"app.py": {"blob": "3f2a...", "path": "src"}}
+
+Identical files are stored once however many ideas embed them, and
+commands only read a body when they actually need it (``extract``,
+``show``, the analysis prompt). ``migrate_blobs.py`` converts existing
+repositories either way.
+"""
+
+import hashlib
+import os
+from ideacli import config, store
+
+BLOB_DIR = "blobs"
+
+
+def blob_path(repo_path, digest):
+    """Return the path of the blob with the given hex digest."""
+    return os.path.join(repo_path, BLOB_DIR, digest[:2], digest[2:])
+
+
+def put(repo_path, content):
+    """Store content (str) if not already present and return its hex digest."""
+    data = content.encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+    path = blob_path(repo_path, digest)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        store.write_atomic(path, data, config.get(repo_path, "fsync"))
+    return digest
+
+
+def get(repo_path, digest):
+    """Return the content of a blob."""
+    with open(blob_path(repo_path, digest), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def enabled(repo_path):
+    """Whether new file bodies should go to the blob store."""
+    return bool(config.get(repo_path, "blob_store"))
+
+
+def file_content(repo_path, file_obj):
+    """Return the body of a file entry in any of its stored forms, or None.
+
+    Handles legacy plain strings, {"content": ...} and {"blob": ...} entries.
+    """
+    if isinstance(file_obj, str):
+        return file_obj
+    if isinstance(file_obj, dict):
+        if "content" in file_obj:
+            return file_obj["content"]
+        if "blob" in file_obj:
+            return get(repo_path, file_obj["blob"])
+    return None
+
+
+def _externalize_entry(repo_path, file_obj):
+    """Return file_obj with a string body moved to the blob store."""
+    if isinstance(file_obj, str):
+        return {"blob": put(repo_path, file_obj)}
+    if isinstance(file_obj, dict) and isinstance(file_obj.get("content"), str):
+        entry = {key: value for key, value in file_obj.items() if key != "content"}
+        entry["blob"] = put(repo_path, file_obj["content"])
+        return entry
+    return file_obj
+
+
+def _inline_entry(repo_path, file_obj, as_dict):
+    """Return file_obj with a blob reference replaced by the body itself."""
+    if not (isinstance(file_obj, dict) and "blob" in file_obj):
+        return file_obj
+    content = get(repo_path, file_obj["blob"])
+    rest = {key: value for key, value in file_obj.items() if key != "blob"}
+    if not rest and not as_dict:
+        return content
+    rest["content"] = content
+    return rest
+
+
+def externalize_files(repo_path, files_data):
+    """Return files_data (dict or list form) with string bodies moved to the blob store."""
+    if isinstance(files_data, dict):
+        return {name: _externalize_entry(repo_path, obj) for name, obj in files_data.items()}
+    if isinstance(files_data, list):
+        return [_externalize_entry(repo_path, obj) for obj in files_data]
+    return files_data
+
+
+def inline_files(repo_path, files_data):
+    """Return files_data (dict or list form) with blob references resolved to bodies."""
+    if isinstance(files_data, dict):
+        return {name: _inline_entry(repo_path, obj, False) for name, obj in files_data.items()}
+    if isinstance(files_data, list):
+        return [_inline_entry(repo_path, obj, True) for obj in files_data]
+    return files_data
+
+
+def _convert(repo_path, idea, convert):
+    """Apply convert to the root and response files of idea; returns True if it changed."""
+    changed = False
+    containers = [idea]
+    if isinstance(idea.get("response"), dict):
+        containers.append(idea["response"])
+    for container in containers:
+        if "files" in container:
+            converted = convert(repo_path, container["files"])
+            if converted != container["files"]:
+                container["files"] = converted
+                changed = True
+    return changed
+
+
+def externalize_idea(repo_path, idea):
+    """Move every embedded file body of idea to the blob store, in place."""
+    return _convert(repo_path, idea, externalize_files)
+
+
+def inline_idea(repo_path, idea):
+    """Replace every blob reference in idea by the file body, in place."""
+    return _convert(repo_path, idea, inline_files)
+
+
+def referenced(idea):
+    """Yield the digests of all blobs referenced by idea."""
+    containers = [idea]
+    if isinstance(idea.get("response"), dict):
+        containers.append(idea["response"])
+    for container in containers:
+        files_data = container.get("files")
+        entries = files_data.values() if isinstance(files_data, dict) else files_data or []
+        for entry in entries:
+            if isinstance(entry, dict) and "blob" in entry:
+                yield entry["blob"]
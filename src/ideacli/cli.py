@@ -1,57 +1,79 @@
 """Command line interface for ideacli."""
 
 import argparse
-# Use relative import
-from ideacli.repository import init_repo, status
-from ideacli.add import add
-from ideacli.list import list_ideas
-from ideacli.show import show_idea
-from ideacli.enquire import enquire
-from ideacli.update import update_idea
-from ideacli.files import list_files, extract_files
-from ideacli.rename import rename_idea
-from ideacli.importer import import_idea
-from ideacli.rm import remove_file
+import importlib
+import sys
+
+# Command modules are only imported once a subcommand has been chosen, so
+# that e.g. 'ideacli list' doesn't pay for loading every other command.
+COMMANDS = {
+    "init": ("ideacli.repository", "init_repo"),
+    "status": ("ideacli.repository", "status"),
+    "add": ("ideacli.add", "add"),
+    "list": ("ideacli.list", "list_ideas"),
+    "search": ("ideacli.search", "search_ideas"),
+    "related": ("ideacli.related", "related_ideas"),
+    "show": ("ideacli.show", "show_idea"),
+    "enquire": ("ideacli.enquire", "enquire"),
+    "update": ("ideacli.update", "update_idea"),
+    "drive": ("ideacli.drive", "drive"),
+    "files": ("ideacli.files", "list_files"),
+    "extract": ("ideacli.files", "extract_files"),
+    "rename": ("ideacli.rename", "rename_idea"),
+    "import": ("ideacli.importer", "import_idea"),
+    "rm": ("ideacli.rm", "remove_file"),
+    "commit": ("ideacli.commit", "commit_pending"),
+    "migrate": ("ideacli.migrate", "migrate_repo"),
+    "serve": ("ideacli.daemon", "serve"),
+}
+
+# Global options that measure a command, see ideacli.profiling
+DIAGNOSTICS = ("timings", "timings_json", "profile", "trace_memory")
+
+
+def load_command(command):
+    """Import and return the function implementing a subcommand."""
+    module_name, function_name = COMMANDS[command]
+    return getattr(importlib.import_module(module_name), function_name)
+
 
 def main():
     """Main entry point for the ideacli command."""
     parser = create_parser()
     args = parser.parse_args()
 
-    if args.command == "init":
-        init_repo(args)
-    elif args.command == "status":
-        status(args)
-    elif args.command == "add":
-        add(args)
-    elif args.command == "list":
-        list_ideas(args)
-    elif args.command == "show":
-        show_idea(args)
-    elif args.command == "enquire":
-        enquire(args)
-    elif args.command == "update":
-        update_idea(args)
-    elif args.command == "files":
-        list_files(args)
-    elif args.command == "extract":
-        extract_files(args)
-    elif args.command == "rename":
-        rename_idea(args)
+    diagnostics = {name: value for name, value in vars(args).items()
+                   if name in DIAGNOSTICS and value}
+    if args.command in COMMANDS and diagnostics:
+        # Measured in this process, never handed to a server
+        from ideacli import profiling
+        profiling.run(args.command, load_command, args, **diagnostics)
+    elif args.command in COMMANDS:
+        # Hand the command to a running 'ideacli serve' if there is one
+        from ideacli.daemon import forward
+        code = forward(args, sys.argv[1:])
+        if code is not None:
+            sys.exit(code)
+        load_command(args.command)(args)
     elif args.command == "version":
         # Import here to avoid circular import
         from ideacli import __version__
         print(f"ideacli version {__version__}")
-    elif args.command == 'import':
-        import_idea(args)
-    elif args.command == 'rm':
-        remove_file(args)
     else:
         parser.print_help()
 
+
 def create_parser():
     """Creates and returns the argparse parser."""
     parser = argparse.ArgumentParser(description="CLI tool for managing LLM conversation ideas")
+    parser.add_argument("--timings", action="store_true",
+                        help="Print where the command spent its time (JSON, files, git, clipboard)")
+    parser.add_argument("--timings-json", metavar="FILE",
+                        help="Write the timings of the command to FILE as JSON")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="Run the command under cProfile and dump the stats to FILE")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Report peak memory and the biggest allocation sites")
     subparsers = parser.add_subparsers(dest="command", help="Commands")
 
     # Init command
@@ -61,14 +83,54 @@ def create_parser():
     # Status command
     status_parser = subparsers.add_parser("status", help="Check status of ideas repository")
     status_parser.add_argument("--path", help="Path to the repository")
+    status_parser.add_argument("--workers", type=int,
+                               help="Number of parallel readers (default: config or CPU count)")
+    status_parser.add_argument("--fast", action="store_true",
+                               help="Only count conversations; don't ask git for its status")
 
     # Add command
     add_parser = subparsers.add_parser("add", help="Add a new idea to the repository")
     add_parser.add_argument("--path", help="Path to the repository")
+    add_parser.add_argument("--no-commit", action="store_true",
+                            help="Queue the new idea for the next 'ideacli commit'")
+    add_parser.add_argument("--jsonl", metavar="FILE",
+                            help="Add one idea per JSON line {\"subject\": ..., \"body\": ...} "
+                                 "from FILE ('-' for stdin), with a single commit")
 
     # List command
     list_parser = subparsers.add_parser("list", help="List all ideas")
     list_parser.add_argument("--path", help="Path to the repository")
+    list_parser.add_argument("--workers", type=int,
+                             help="Number of parallel readers (default: config or CPU count)")
+
+    # Search command
+    search_parser = subparsers.add_parser(
+        "search", help="Full-text search of subjects, bodies, responses and files"
+    )
+    search_parser.add_argument("query", nargs="+",
+                               help='Words, "phrases", prefix* or field:term '
+                                    "(fields: subject, body, response, files)")
+    search_parser.add_argument("--path", help="Path to the repository")
+    search_parser.add_argument("--limit", type=int, default=20,
+                               help="Maximum number of results (default: 20)")
+    search_parser.add_argument("--rescan", action="store_true",
+                               help="Check every conversation for changes, e.g. after "
+                                    "editing files by hand")
+    search_parser.add_argument("--workers", type=int,
+                               help="Number of parallel readers (default: config or CPU count)")
+
+    # Related command
+    related_parser = subparsers.add_parser("related",
+                                           help="Show the ideas most similar to an idea")
+    related_parser.add_argument("--path", help="Path to the repository")
+    related_parser.add_argument("--id", help="ID of the idea", required=True)
+    related_parser.add_argument("--top", type=int, default=5,
+                                help="Number of related ideas to show (default: 5)")
+    related_parser.add_argument("--rescan", action="store_true",
+                                help="Check every conversation for changes, e.g. after "
+                                     "editing files by hand")
+    related_parser.add_argument("--workers", type=int,
+                                help="Number of parallel readers (default: config or CPU count)")
 
     # Show command
     show_parser = subparsers.add_parser("show", help="Show a specific idea by ID")
@@ -79,8 +141,23 @@ def create_parser():
     enquire_parser = subparsers.add_parser("enquire",
                                            help="Prepare an idea with prompt for LLM input")
     enquire_parser.add_argument("--path", help="Path to the repository")
-    enquire_parser.add_argument("--id", help="ID of the idea to enquire about", required=True)
+    enquire_parser.add_argument("--id", help="ID of the idea to enquire about")
+    enquire_parser.add_argument("--ids-from", metavar="FILE",
+                                help="Prepare every idea whose ID is on a line of FILE")
+    enquire_parser.add_argument("--all", action="store_true",
+                                help="Prepare every idea in the --state state")
+    enquire_parser.add_argument("--state", default="added",
+                                help="State of the ideas --all prepares (default: added)")
+    enquire_parser.add_argument("--output", metavar="FILE",
+                                help="Write the prompt to FILE; with --ids-from or --all, "
+                                     "one {id, state, prompt} JSON line per idea")
+    enquire_parser.add_argument("--workers", type=int,
+                                help="Ideas prepared in parallel by --ids-from and --all "
+                                     "(default: config)")
     enquire_parser.add_argument("--prompt", help="Additional prompt for the LLM")
+    enquire_parser.add_argument("--select", choices=["llm", "bm25"],
+                                help="Ask the LLM which files it needs, or pick them locally "
+                                     "and go straight to the analysis prompt (default: config)")
 
     # Update command
     update_parser = subparsers.add_parser("update", help="Update an idea using LLM response.")
@@ -88,6 +165,42 @@ def create_parser():
     update_parser.add_argument("--id",
                                required=False,
                                help="The ID of the idea. (Only needed if stdin isn't used)")
+    update_parser.add_argument("--jsonl", metavar="FILE",
+                               help="Apply a JSONL file of responses, {id, response} per line "
+                                    "(OpenAI batch output also works); - reads stdin")
+    update_parser.add_argument("--output", metavar="FILE",
+                               help="With --jsonl, write the next prompts as JSONL to FILE")
+    update_parser.add_argument("--workers", type=int,
+                               help="Ideas read and written in parallel by --jsonl "
+                                    "(default: config)")
+    update_parser.add_argument("--max-tokens", type=int,
+                               help="Token budget of the analysis prompt (default: config)")
+    update_parser.add_argument("--max-chars", type=int,
+                               help="Character budget of the analysis prompt (default: config)")
+
+    # Drive command
+    drive_parser = subparsers.add_parser(
+        "drive", help="Send ideas' prompts to an LLM API and apply its replies")
+    drive_parser.add_argument("--path", help="Path to the repository")
+    drive_parser.add_argument("--id", nargs="+", help="IDs of the ideas to drive")
+    drive_parser.add_argument("--all", action="store_true",
+                              help="Drive every idea in the --state state")
+    drive_parser.add_argument("--state", default="added",
+                              help="State of the ideas --all drives (default: added)")
+    drive_parser.add_argument("--select", choices=["llm", "bm25"],
+                              help="As for enquire (default: config)")
+    drive_parser.add_argument("--concurrency", type=int,
+                              help="Requests in flight at once (default: config)")
+    drive_parser.add_argument("--rpm", type=int,
+                              help="Requests per minute at most (default: config)")
+    drive_parser.add_argument("--retries", type=int,
+                              help="Retries of a failed request (default: config)")
+    drive_parser.add_argument("--base-url", help="Chat completions API base URL (default: config)")
+    drive_parser.add_argument("--model", help="Model to ask (default: config)")
+    drive_parser.add_argument("--mock", action="store_true",
+                              help="Answer with the built-in mock LLM (see ideacli.mockserver)")
+    drive_parser.add_argument("--workers", type=int,
+                              help="Threads for refreshing the index (default: config)")
 
     # Files command
     files_parser = subparsers.add_parser("files", help="List code files suggested in response")
@@ -98,6 +211,12 @@ def create_parser():
     extract_parser = subparsers.add_parser("extract", help="Extract code samples into files")
     extract_parser.add_argument("--path", help="Path to the repo")
     extract_parser.add_argument("--id", required=True, help="ID of the idea")
+    extract_parser.add_argument("--dry-run", action="store_true",
+                                help="Report what would be written or removed, changing nothing")
+    extract_parser.add_argument("--diff", action="store_true",
+                                help="Show a diff of every file that changes")
+    extract_parser.add_argument("--workers", type=int,
+                                help="Number of parallel writers (default: config or CPU count)")
 
     # Rename command
     rename_parser = subparsers.add_parser("rename", help="Rename the subject of an idea by ID")
@@ -106,16 +225,18 @@ def create_parser():
     rename_parser.add_argument("--target", required=True, help="New subject/title for the idea")
 
     # Version command
-    version_parser = subparsers.add_parser("version", help="Show the installed version of ideacli")
+    subparsers.add_parser("version", help="Show the installed version of ideacli")
 
     # Import command
     import_parser = subparsers.add_parser('import', help='Import a file into an idea')
     import_parser.add_argument('source', help='Source file to import')
-    import_parser.add_argument('--destination', 
-                               help='Destination filename within the idea (defaults to source filename)')
+    import_parser.add_argument('--destination',
+                               help='Destination filename within the idea '
+                                    '(defaults to source filename)')
     import_parser.add_argument('--id', required=True, help='ID of the idea to import into')
     import_parser.add_argument('--path', help='Custom path to ideas repository')
-    import_parser.add_argument('--force', action='store_true', help='Force overwrite if file already exists')
+    import_parser.add_argument('--force', action='store_true',
+                               help='Force overwrite if file already exists')
 
     # rm command
     rm_parser = subparsers.add_parser('rm', help='Remove a file from an idea')
@@ -123,7 +244,31 @@ def create_parser():
     rm_parser.add_argument('file_name', help='Name of the file to remove')
     rm_parser.add_argument('--path', help='Custom path to ideas repository')
 
+    # commit command
+    commit_parser = subparsers.add_parser('commit',
+                                          help='Commit changes queued with --no-commit')
+    commit_parser.add_argument('--path', help='Custom path to ideas repository')
+    commit_parser.add_argument('-m', '--message',
+                               help='Commit message (default: combined queued messages)')
+
+    # migrate command
+    migrate_parser = subparsers.add_parser(
+        'migrate', help='Convert conversations to another layout or compression')
+    migrate_parser.add_argument('--path', help='Custom path to ideas repository')
+    migrate_parser.add_argument('--layout', choices=['flat', 'sharded'],
+                                help='flat: conversations/<id>.json, '
+                                     'sharded: conversations/<id[:2]>/<id>.json')
+    migrate_parser.add_argument('--compression', choices=['none', 'gzip', 'zstd'],
+                                help='How conversation files are stored')
+
+    # serve command
+    serve_parser = subparsers.add_parser('serve',
+                                         help='Run a server that keeps the repository warm')
+    serve_parser.add_argument('--path', help='Custom path to ideas repository')
+    serve_parser.add_argument('--stop', action='store_true', help='Stop a running server')
+
     return parser
 
+
 if __name__ == "__main__":
     main()
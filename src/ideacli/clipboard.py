@@ -4,6 +4,15 @@ import platform
 import subprocess
 
 
+def load_pyperclip():
+    """Import pyperclip on first use; returns None if it isn't installed."""
+    try:
+        import pyperclip
+    except ImportError:
+        return None
+    return pyperclip
+
+
 def copy_to_clipboard(text):
     """Copy text to clipboard based on platform."""
     system = platform.system()
@@ -0,0 +1,155 @@
+"""JSON encoding and decoding for conversations and other large documents.
+
+Uses orjson or msgspec when one is installed (``pip install ideacli[fast]``)
+and the standard library otherwise, with identical results: the fast
+backends are only used for documents they handle exactly as ``json`` does.
+Before encoding, a walk over the document (cheap, as conversations are a
+few nodes holding big strings) looks for anything they write differently
+(non-string keys, integers beyond 64 bits, floats written with an exponent,
+NaN); such documents, and output with non-ASCII characters, which ``json``
+escapes, are encoded by the standard library instead. Decoded documents are
+checked for integers a fast decoder turned into floats the same way.
+
+The backend is picked once per process; ``IDEACLI_JSON=json`` (or
+``orjson``, ``msgspec``) forces one.
+"""
+
+import importlib.util
+import json
+import math
+import os
+
+BACKENDS = ("orjson", "msgspec", "json")
+INDENT = 2
+
+DecodeError = json.JSONDecodeError
+
+# Range of integers the fast backends encode and decode exactly
+_MIN_INT = -2 ** 63
+_MAX_INT = 2 ** 64 - 1
+# Range of floats repr() (and so json) writes without an exponent
+_MIN_PLAIN_FLOAT = 1e-4
+_MAX_PLAIN_FLOAT = 1e16
+
+_backend = None
+_fast = None
+
+
+def _available(name):
+    return name == "json" or importlib.util.find_spec(name) is not None
+
+
+def _pick(wanted):
+    candidates = ((wanted,) if wanted in BACKENDS else ()) + BACKENDS
+    for name in candidates:
+        if _available(name):
+            return name
+    return "json"
+
+
+def use(name=None):
+    """Select the backend by name, or by IDEACLI_JSON if None; returns the name selected.
+
+    A backend that isn't installed is replaced by the best one that is.
+    """
+    global _backend, _fast
+    picked = _pick(name or os.environ.get("IDEACLI_JSON", "").strip().lower())
+    fast = None
+    if picked == "orjson":
+        import orjson
+
+        fast = orjson
+    elif picked == "msgspec":
+        import msgspec.json
+
+        fast = msgspec.json
+    # _fast first: other threads take a set _backend to mean it is ready
+    _fast = fast
+    _backend = picked
+    return _backend
+
+
+def backend():
+    """Return the name of the backend in use."""
+    if _backend is None:
+        use()
+    return _backend
+
+
+def _encodes_alike(obj):
+    """Whether a fast backend encodes obj exactly as json.dumps does (up to ASCII escaping)."""
+    if isinstance(obj, str) or obj is None or obj is True or obj is False:
+        return True
+    if isinstance(obj, dict):
+        return all(isinstance(key, str) and _encodes_alike(value) for key, value in obj.items())
+    if isinstance(obj, list):
+        return all(_encodes_alike(item) for item in obj)
+    if isinstance(obj, int):
+        return _MIN_INT <= obj <= _MAX_INT
+    if isinstance(obj, float):
+        return math.isfinite(obj) and (obj == 0 or _MIN_PLAIN_FLOAT <= abs(obj) < _MAX_PLAIN_FLOAT)
+    return False
+
+
+def _decoded_alike(obj):
+    """Whether obj, decoded by a fast backend, holds no integer it may have made a float."""
+    if isinstance(obj, dict):
+        return all(_decoded_alike(value) for value in obj.values())
+    if isinstance(obj, list):
+        return all(_decoded_alike(item) for item in obj)
+    if isinstance(obj, float):
+        return not (obj.is_integer() and abs(obj) > _MAX_INT)
+    return True
+
+
+def _fast_dumps(obj, indent):
+    if _backend == "orjson":
+        option = _fast.OPT_INDENT_2 if indent else 0
+        return _fast.dumps(obj, option=option)
+    data = _fast.encode(obj)
+    return _fast.format(data, indent=INDENT) if indent else data
+
+
+def dumps(obj, indent=False):
+    """Return obj as JSON text, like json.dumps(obj, indent=2) or compact without indent."""
+    if backend() != "json" and _encodes_alike(obj):
+        try:
+            text = _fast_dumps(obj, indent).decode("utf-8")
+        except (TypeError, ValueError, _fast_error()):
+            text = ""
+        # json escapes DEL and every non-ASCII character
+        if text and text.isascii() and "\x7f" not in text:
+            return text
+    if indent:
+        return json.dumps(obj, indent=INDENT)
+    return json.dumps(obj, separators=(",", ":"))
+
+
+def loads(data):
+    """Decode JSON text or UTF-8 bytes.
+
+    Raises DecodeError (a ValueError) if data is not valid JSON.
+    """
+    if backend() != "json":
+        try:
+            obj = _fast.loads(data) if _backend == "orjson" else _fast.decode(data)
+        except (TypeError, ValueError, _fast_error()):
+            pass  # Let the standard library decide, and word the error
+        else:
+            if _decoded_alike(obj):
+                return obj
+    return json.loads(data)
+
+
+def load(f):
+    """Decode the JSON content of a file object opened in text or binary mode."""
+    return loads(f.read())
+
+
+def _fast_error():
+    """Return the base exception class of the fast backend's errors."""
+    if _backend == "msgspec":
+        import msgspec
+
+        return msgspec.MsgspecError
+    return ValueError
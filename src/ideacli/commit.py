@@ -0,0 +1,162 @@
+"""Git commits of ideas repository changes, immediate or batched.
+
+Commands stage only the paths they touched. With ``--no-commit`` those
+paths are queued in ``.ideas_repo/.cache/pending.jsonl`` instead, and
+``ideacli commit`` later commits everything queued as a single commit.
+Paths are spooled to a file and handed to the git backend (see
+ideacli.gitbackend), so batches of any size run in constant memory and
+never hit argv limits.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from ideacli import gitbackend, index
+from ideacli.repository import resolve_idea_path
+
+PENDING_FILE = "pending.jsonl"
+# Queued messages listed in a batch commit message before summarising the rest
+MAX_LISTED_MESSAGES = 50
+
+
+class Batch:
+    """A set of touched paths to be committed (or queued) together."""
+
+    def __init__(self, repo_path):
+        self.repo_path = os.path.abspath(repo_path)
+        self.count = 0
+        self._spool_dir = tempfile.mkdtemp(dir=index.cache_dir(self.repo_path), prefix="batch-")
+        self._all = open(os.path.join(self._spool_dir, "all"), "w", encoding="utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Discard the spooled paths."""
+        self._all.close()
+        shutil.rmtree(self._spool_dir, ignore_errors=True)
+
+    def relative(self, path):
+        """Return path relative to the repo root, as git expects it."""
+        return os.path.relpath(os.path.abspath(path), self.repo_path)
+
+    def add(self, path):
+        """Record a touched path (absolute, or relative to the repo root)."""
+        self._all.write(self.relative(os.path.join(self.repo_path, path)) + "\0")
+        self.count += 1
+
+    def commit(self, message):
+        """Stage exactly the recorded paths and commit them."""
+        self._all.close()
+        message_file = os.path.join(self._spool_dir, "message")
+        with open(message_file, "w", encoding="utf-8") as f:
+            f.write(message)
+        gitbackend.get_backend(self.repo_path).commit(self._all.name, message_file)
+
+
+def commit_paths(repo_path, paths, message):
+    """Stage exactly the given paths and commit them."""
+    with Batch(repo_path) as batch:
+        for path in paths:
+            batch.add(path)
+        batch.commit(message)
+
+
+def _pending_file(repo_path):
+    return os.path.join(index.cache_dir(repo_path), PENDING_FILE)
+
+
+class Queue:
+    """Appends changes to the pending queue for the next 'ideacli commit'."""
+
+    def __init__(self, repo_path):
+        self.repo_path = repo_path
+        self._file = open(_pending_file(repo_path), "a", encoding="utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Flush the queued records to disk."""
+        self._file.close()
+
+    def add(self, paths, message):
+        """Queue paths (absolute, or relative to the repo root) with their commit message."""
+        record = {
+            "paths": [os.path.relpath(os.path.join(self.repo_path, p), self.repo_path)
+                      for p in paths],
+            "message": message,
+        }
+        self._file.write(json.dumps(record) + "\n")
+
+
+def defer(repo_path, paths, message):
+    """Queue paths and a message for the next 'ideacli commit'."""
+    with Queue(repo_path) as queue:
+        queue.add(paths, message)
+
+
+def read_pending(repo_path):
+    """Yield the queued records, oldest first."""
+    pending = _pending_file(repo_path)
+    if not os.path.exists(pending):
+        return
+    with open(pending, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _batch_message(repo_path, count):
+    """Combine the queued messages, listing at most MAX_LISTED_MESSAGES of them."""
+    lines = [f"Batch of {count} changes", ""]
+    for n, record in enumerate(read_pending(repo_path)):
+        if n == MAX_LISTED_MESSAGES:
+            lines.append(f"- ... and {count - n} more")
+            break
+        lines.append(f"- {record['message']}")
+    return "\n".join(lines)
+
+
+def flush(repo_path, message=None):
+    """Commit every queued change as one commit. Returns the number of queued changes."""
+    with Batch(repo_path) as batch:
+        count = 0
+        first_message = None
+        for record in read_pending(repo_path):
+            for path in record["paths"]:
+                batch.add(path)
+            first_message = first_message or record["message"]
+            count += 1
+        if not count:
+            return 0
+
+        if not message:
+            message = first_message if count == 1 else _batch_message(repo_path, count)
+        batch.commit(message)
+    os.remove(_pending_file(repo_path))
+    return count
+
+
+def commit_pending(args):
+    """Commit all changes queued with --no-commit as a single commit."""
+    repo_path = resolve_idea_path(args)
+    try:
+        count = flush(repo_path, getattr(args, "message", None))
+    except (OSError, ValueError, subprocess.CalledProcessError) as e:
+        print(f"Error committing queued changes: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if count:
+        print(f"Committed {count} queued change(s).")
+    else:
+        print("Nothing queued to commit.")
@@ -0,0 +1,92 @@
+"""Optional compression of conversation files.
+
+The ``compression`` setting picks how conversations are written: ``none``
+(plain JSON, the default), ``gzip`` (stdlib) or ``zstd`` (needs the
+zstandard package; gzip is used if it is missing). Files keep their
+``.json`` name whatever the format, and readers tell formats apart by their
+magic bytes, so a repository can hold a mix of them; ``ideacli migrate
+--compression`` rewrites them all.
+"""
+
+import gzip
+import importlib.util
+import io
+import sys
+
+METHODS = ("none", "gzip", "zstd")
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+HAS_ZSTD = importlib.util.find_spec("zstandard") is not None
+
+
+def method_of(data):
+    """Return the compression method of data from its first bytes."""
+    if data[:2] == GZIP_MAGIC:
+        return "gzip"
+    if data[:4] == ZSTD_MAGIC:
+        return "zstd"
+    return "none"
+
+
+def _zstandard():
+    if not HAS_ZSTD:
+        raise ValueError("file is zstd compressed but zstandard is not installed "
+                         "(pip install ideacli[zstd])")
+    import zstandard
+
+    return zstandard
+
+
+def effective_method(method):
+    """Return the method actually used to write when method is configured."""
+    if method not in METHODS:
+        print(f"Warning: unknown compression '{method}', writing plain JSON", file=sys.stderr)
+        return "none"
+    if method == "zstd" and not HAS_ZSTD:
+        print("Warning: zstandard not installed, compressing with gzip", file=sys.stderr)
+        return "gzip"
+    return method
+
+
+def compress(data, method):
+    """Return data (bytes) compressed with method.
+
+    Output is deterministic (no timestamps), so unchanged content compresses
+    to identical bytes and rewrites can still be skipped.
+    """
+    if method == "gzip":
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    if method == "zstd":
+        return _zstandard().ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return data
+
+
+def decompress(data):
+    """Return data (bytes) uncompressed, whatever its format."""
+    method = method_of(data)
+    if method == "gzip":
+        return gzip.decompress(data)
+    if method == "zstd":
+        return _zstandard().ZstdDecompressor().decompressobj().decompress(data)
+    return data
+
+
+def open_text(path):
+    """Open a possibly compressed file for reading as UTF-8 text, decompressing as it is read."""
+    f = open(path, "rb")  # pylint: disable=consider-using-with
+    try:
+        method = method_of(f.peek(4)[:4])
+        if method == "gzip":
+            f.close()  # GzipFile never closes a file object it is handed
+            stream = gzip.open(path, "rb")
+        elif method == "zstd":
+            stream = _zstandard().ZstdDecompressor().stream_reader(f, closefd=True)
+        else:
+            stream = f
+        return io.TextIOWrapper(stream, encoding="utf-8")
+    except BaseException:
+        f.close()
+        raise
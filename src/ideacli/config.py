@@ -0,0 +1,111 @@
+"""Per-repository configuration for ideacli.
+
+Settings are read from ``.ideas_repo/config.json`` and can be overridden
+with ``IDEACLI_<KEY>`` environment variables (e.g. ``IDEACLI_WORKERS=8``).
+"""
+
+import json
+import os
+import sys
+
+CONFIG_FILE = "config.json"
+# Parsed config files keyed by path, reused while the file is unchanged, as
+# bulk commands look settings up for every conversation they write
+_files = {}
+
+DEFAULTS = {
+    # Threads used by bulk loaders; 0 picks a default from the CPU count
+    "workers": 0,
+    # Average file size (bytes) above which bulk loads decode in a process pool
+    "process_threshold": 1024 * 1024,
+    # "subprocess" (git command line) or "dulwich" (in-process, if installed)
+    "git_backend": "subprocess",
+    # Store embedded file bodies in .ideas_repo/blobs/ instead of the conversation JSON
+    "blob_store": False,
+    # "flat" (conversations/<id>.json) or "sharded" (conversations/<id[:2]>/<id>.json);
+    # change it with 'ideacli migrate'
+    "layout": "flat",
+    # Write conversations without indentation (smaller, but harder to diff)
+    "compact_json": False,
+    # "none", "gzip" or "zstd" (if zstandard is installed): how conversations are
+    # written; any format is read. Convert existing files with 'ideacli migrate'
+    "compression": "none",
+    # "normal" or "no": whether 'ideacli status' looks for untracked files
+    "status_untracked": "normal",
+    # Let 'ideacli status' use git's built-in filesystem monitor (git 2.37+,
+    # macOS and Windows) so it doesn't stat the whole working tree
+    "git_fsmonitor": False,
+    # Budget of the analysis prompt 'ideacli update' builds from the files the
+    # LLM asked for, in estimated tokens and in characters (0: no limit)
+    "prompt_max_tokens": 0,
+    "prompt_max_chars": 0,
+    # How enquire picks the files an idea needs: "llm" asks the LLM first,
+    # "bm25" ranks them locally and goes straight to the analysis prompt
+    "file_selection": "llm",
+    # Most files "bm25" selection picks
+    "select_max_files": 5,
+    # LLM used by 'ideacli drive' (see ideacli.provider): an OpenAI-compatible
+    # endpoint, the model, and the environment variable holding the API key
+    "llm_provider": "openai",
+    "llm_base_url": "https://api.openai.com/v1",
+    "llm_model": "gpt-4o-mini",
+    "llm_api_key_env": "OPENAI_API_KEY",
+    # Requests in flight at once, requests a minute (0: no limit), retries of a
+    # failed request and seconds before one times out
+    "llm_concurrency": 8,
+    "llm_requests_per_minute": 0,
+    "llm_retries": 5,
+    "llm_timeout": 120,
+    # Flush conversation writes to disk before renaming them into place
+    "fsync": True,
+}
+
+
+def _coerce(key, value):
+    """Convert an environment string to the type of the key's default."""
+    default = DEFAULTS.get(key)
+    if isinstance(default, bool):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    if isinstance(default, int):
+        return int(value)
+    return value
+
+
+def _read_file(config_file):
+    """Return the settings in config_file ({} if there is none), reparsed only when it changes."""
+    try:
+        st = os.stat(config_file)
+    except OSError:
+        return {}
+    stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+    cached = _files.get(config_file)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    settings = {}
+    try:
+        with open(config_file, "r", encoding="utf-8") as f:
+            settings = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: ignoring invalid {config_file}: {e}", file=sys.stderr)
+    _files[config_file] = (stamp, settings)
+    return settings
+
+
+def load_config(repo_path):
+    """Return the effective configuration of the repo at repo_path."""
+    config = dict(DEFAULTS)
+    config.update(_read_file(os.path.join(repo_path, CONFIG_FILE)))
+    for key in DEFAULTS:
+        env_value = os.environ.get(f"IDEACLI_{key.upper()}")
+        if env_value is not None:
+            try:
+                config[key] = _coerce(key, env_value)
+            except ValueError:
+                print(f"Warning: ignoring invalid IDEACLI_{key.upper()}={env_value!r}",
+                      file=sys.stderr)
+    return config
+
+
+def get(repo_path, key):
+    """Return a single configuration value."""
+    return load_config(repo_path)[key]
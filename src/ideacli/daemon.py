@@ -0,0 +1,197 @@
+"""Optional long-running server that keeps an ideas repository warm.
+
+``ideacli serve`` listens on a Unix socket in ``.ideas_repo/.cache/`` and
+runs commands in-process, with the Python modules, the prompt template and
+recently read conversations already loaded. While it is running, the CLI
+forwards read-mostly commands to it; if it isn't running (or can't be
+reached) the CLI simply runs the command itself.
+"""
+
+import os
+import socket
+import sys
+from contextlib import contextmanager
+from ideacli import codec
+from ideacli.repository import IDEAS_REPO, resolve_repo_root
+
+SOCKET_NAME = "ideacli.sock"
+# Commands the CLI hands to a running server: read-mostly ones only, so not
+# enquire, which copies its prompt to the caller's clipboard
+DAEMON_COMMANDS = {"list", "search", "related", "show", "files", "status"}
+# Settings sent with every forwarded command, see ideacli.config
+ENV_PREFIX = "IDEACLI_"
+# Conversations kept decoded in memory by the server
+CACHE_ENTRIES = 2048
+
+
+def socket_path(repo_path):
+    """Return the path of the server socket for an ideas repository."""
+    return os.path.join(repo_path, ".cache", SOCKET_NAME)
+
+
+def _send(path, request):
+    """Send one request to the server at path and return its decoded reply."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(path)
+        conn.sendall(codec.dumps(request).encode("utf-8") + b"\n")
+        conn.shutdown(socket.SHUT_WR)
+        chunks = []
+        while True:
+            chunk = conn.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    return codec.loads(b"".join(chunks))
+
+
+def _client_env():
+    """Return the IDEACLI_* settings of this process, which the server applies per request."""
+    return {key: value for key, value in os.environ.items() if key.startswith(ENV_PREFIX)}
+
+
+@contextmanager
+def _environment(env):
+    """Make the IDEACLI_* variables exactly those of env for the duration."""
+    from ideacli import codec
+
+    previous = _client_env()
+    json_backend = os.environ.get("IDEACLI_JSON")
+    for key in previous:
+        del os.environ[key]
+    os.environ.update({key: value for key, value in env.items()
+                       if key.startswith(ENV_PREFIX)})
+    # The JSON backend is picked once per process, so pick again if it differs
+    switch = os.environ.get("IDEACLI_JSON") != json_backend
+    if switch:
+        codec.use()
+    try:
+        yield
+    finally:
+        for key in _client_env():
+            del os.environ[key]
+        os.environ.update(previous)
+        if switch:
+            codec.use()
+
+
+def forward(args, argv):
+    """Run a command through a running server.
+
+    Returns the command's exit code, or None if no server could take it,
+    in which case the caller runs the command directly.
+    """
+    if args.command not in DAEMON_COMMANDS or os.environ.get("IDEACLI_NO_DAEMON"):
+        return None
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    try:
+        path = socket_path(os.path.join(resolve_repo_root(args), IDEAS_REPO))
+        if not os.path.exists(path):
+            return None
+        reply = _send(path, {"argv": argv, "cwd": os.getcwd(), "env": _client_env()})
+    except (OSError, TypeError, ValueError):
+        return None
+    sys.stdout.write(reply.get("stdout", ""))
+    sys.stderr.write(reply.get("stderr", ""))
+    return reply.get("code", 0)
+
+
+def _run(argv, cwd, env):
+    """Run one command in-process, with the client's cwd and settings, capturing its output."""
+    import io
+    import traceback
+    from contextlib import redirect_stderr, redirect_stdout
+    from ideacli.cli import create_parser, load_command
+
+    out, err = io.StringIO(), io.StringIO()
+    code = 0
+    previous_cwd = os.getcwd()
+    try:
+        os.chdir(cwd)
+        with _environment(env), redirect_stdout(out), redirect_stderr(err):
+            try:
+                args = create_parser().parse_args(argv)
+                load_command(args.command)(args)
+            except SystemExit as e:
+                if isinstance(e.code, str):
+                    print(e.code, file=sys.stderr)
+                    code = 1
+                else:
+                    code = e.code or 0
+            except Exception:  # pylint: disable=broad-except
+                traceback.print_exc()
+                code = 1
+    finally:
+        os.chdir(previous_cwd)
+    return {"stdout": out.getvalue(), "stderr": err.getvalue(), "code": code}
+
+
+def _handle(conn):
+    """Serve one connection; returns False once asked to shut down."""
+    with conn, conn.makefile("rb") as reader:
+        request = codec.loads(reader.readline() or b"{}")
+        if request.get("shutdown"):
+            reply, keep_running = {"stdout": "Server stopped.\n", "code": 0}, False
+        elif request.get("ping"):
+            reply, keep_running = {"code": 0}, True
+        else:
+            reply = _run(request.get("argv", []), request.get("cwd", "/"), request.get("env", {}))
+            keep_running = True
+        conn.sendall(codec.dumps(reply).encode("utf-8"))
+    return keep_running
+
+
+def serve(args):
+    """Run the server for an ideas repository until stopped."""
+    from ideacli import index, store
+    from ideacli.repository import resolve_idea_path
+
+    repo_path = resolve_idea_path(args)
+    path = socket_path(repo_path)
+
+    if not hasattr(socket, "AF_UNIX"):
+        print("Error: 'ideacli serve' needs Unix domain sockets.", file=sys.stderr)
+        sys.exit(1)
+
+    if getattr(args, "stop", False):
+        try:
+            print(_send(path, {"shutdown": True})["stdout"], end="")
+        except OSError:
+            print("No server running.")
+        return
+
+    index.cache_dir(repo_path)
+    if os.path.exists(path):
+        try:
+            _send(path, {"ping": True})
+            print(f"Error: a server is already running on {path}", file=sys.stderr)
+            sys.exit(1)
+        except OSError:
+            os.remove(path)  # Left behind by a server that didn't shut down cleanly
+
+    # Warm everything the forwarded commands need
+    store.enable_cache(CACHE_ENTRIES)
+    index.entries(repo_path)
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o077)
+    try:
+        server.bind(path)
+    finally:
+        os.umask(old_umask)
+    server.listen()
+    print(f"Serving {repo_path} on {path} (stop with Ctrl+C or 'ideacli serve --stop')")
+    try:
+        while True:
+            conn, _ = server.accept()
+            try:
+                if not _handle(conn):
+                    break
+            except (OSError, ValueError) as e:
+                print(f"Warning: dropped request: {e}", file=sys.stderr)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        if os.path.exists(path):
+            os.remove(path)
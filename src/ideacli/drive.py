@@ -0,0 +1,136 @@
+"""Drive ideas through their LLM round trips with a provider instead of the clipboard.
+
+'ideacli drive' takes each idea through the states enquire and update
+move it through by hand:
+
+    added --enquire--> analysis requested --LLM picks files--> updated
+          --LLM answers--> added
+
+sending each prompt to the configured provider (see ideacli.provider) and
+applying the reply as 'update' would. Ideas already part way, in the
+"analysis requested" or "updated" state, carry on from there. Ideas are
+driven concurrently under asyncio, at most llm_concurrency at a time, and
+each one is saved after every step, so an interrupted run can simply be
+started again.
+"""
+
+import asyncio
+import functools
+import sys
+import time
+from ideacli import config, enquire, index, paths, provider
+from ideacli.model import Conversation
+from ideacli.repository import resolve_idea_id, resolve_idea_path
+from ideacli.update import apply_response
+
+# Prompts sent per idea at most: the file question, the analysis and,
+# for ideas resumed in an odd state, one more
+MAX_STEPS = 3
+
+
+def _next_prompt(data):
+    """Return the prompt that the LLM has to answer next for data."""
+    if data.state == "updated" and data.get("files_needed") and data.last_prompt:
+        return data.last_prompt
+    return data.prompt
+
+
+def _save(repo_path, idea_id, data, idea_file):
+    if data.save(idea_file):
+        index.record(repo_path, idea_id, data)
+
+
+def _apply(repo_path, data, reply):
+    apply_response(repo_path, data, provider.parse_reply(reply))
+
+
+async def drive_one(repo_path, llm, idea_id, args):
+    """Take one idea through to its answer; returns the states it went through.
+
+    File, template and index work runs in the default executor, so the
+    event loop is only ever waiting on it, not blocked by it.
+    """
+    loop = asyncio.get_event_loop()
+    idea_file = paths.idea_path(repo_path, idea_id)
+    data = await loop.run_in_executor(None, Conversation.load, idea_file)
+    states = [data.state or "added"]
+
+    async def save():
+        await loop.run_in_executor(None, _save, repo_path, idea_id, data, idea_file)
+        states.append(data.state)
+
+    if states[0] == "added":
+        await loop.run_in_executor(
+            None, functools.partial(enquire.prepare, repo_path, data, args, quiet=True))
+        await save()
+    for _ in range(MAX_STEPS):
+        if data.state not in ("analysis requested", "updated"):
+            break
+        reply = await llm.complete(_next_prompt(data))
+        await loop.run_in_executor(None, _apply, repo_path, data, reply)
+        await save()
+    return states
+
+
+def select_ideas(repo_path, args):
+    """Return the IDs to drive: --id values, or with --all every idea in --state."""
+    if args.id:
+        return [resolve_idea_id(repo_path, idea_id) for idea_id in args.id]
+    return index.ids_in_state(repo_path, args.state or "added", args.workers)
+
+
+async def drive_all(repo_path, llm, idea_ids, args, concurrency):
+    """Drive every idea, concurrency at a time; returns {id: states or exception}."""
+    semaphore = asyncio.Semaphore(concurrency)
+    results = {}
+
+    async def run(idea_id):
+        async with semaphore:
+            try:
+                results[idea_id] = await drive_one(repo_path, llm, idea_id, args)
+                print(f"[{idea_id}] {' -> '.join(results[idea_id])}")
+            except (provider.ProviderError, ValueError, OSError) as e:
+                results[idea_id] = e
+                print(f"[{idea_id}] failed: {e}", file=sys.stderr)
+
+    await asyncio.gather(*(run(idea_id) for idea_id in idea_ids))
+    return results
+
+
+def drive(args):
+    """Send the prompts of many ideas to an LLM and apply its replies."""
+    repo_path = resolve_idea_path(args)
+    if not args.id and not args.all:
+        print("Error: give --id (one or more) or --all", file=sys.stderr)
+        sys.exit(1)
+    idea_ids = select_ideas(repo_path, args)
+    if not idea_ids:
+        print("No ideas to drive.")
+        return
+
+    mock = None
+    base_url = args.base_url
+    if args.mock:
+        from ideacli import mockserver
+        mock, base_url = mockserver.start()
+    try:
+        llm = provider.from_config(repo_path, base_url=base_url, model=args.model,
+                                   concurrency=args.concurrency,
+                                   requests_per_minute=args.rpm, retries=args.retries)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    concurrency = max(1, args.concurrency or config.get(repo_path, "llm_concurrency"))
+    start = time.perf_counter()
+    try:
+        results = asyncio.run(drive_all(repo_path, llm, idea_ids, args, concurrency))
+    finally:
+        llm.close()
+        if mock:
+            mock.shutdown()
+    failed = sum(isinstance(result, Exception) for result in results.values())
+    print(f"Drove {len(results)} ideas in {time.perf_counter() - start:.1f}s: "
+          f"{len(results) - failed} answered, {failed} failed")
+    if failed:
+        sys.exit(1)
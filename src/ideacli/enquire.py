@@ -1,24 +1,37 @@
 """Prepare an idea with prompt for LLM input (patched for no-files shortcut)."""
 
 import os
-import json
-from ideacli.repository import resolve_idea_path
+import sys
+import time
+from ideacli import codec, config, index, loader, paths
+from ideacli.model import Conversation
+from ideacli.clipboard import load_pyperclip
+from ideacli.repository import resolve_idea_id, resolve_idea_path
+
+
+# Parsed templates keyed by path, reused while the file's mtime is unchanged
+_templates = {}
+# Ideas prepared, saved and written out at a time by a batch enquire
+BATCH_CHUNK_SIZE = 1000
 
-try:
-    import pyperclip
-    HAS_PYPERCLIP = True
-except ImportError:
-    HAS_PYPERCLIP = False
 
 def load_template(template_path):
     if os.path.exists(template_path):
+        mtime_ns = os.stat(template_path).st_mtime_ns
+        cached = _templates.get(template_path)
+        if cached and cached[0] == mtime_ns:
+            return cached[1]
         try:
             with open(template_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except json.JSONDecodeError as e:
+                template = codec.load(f)
+        except codec.DecodeError as e:
             print(f"Warning: prompt-template.json is not valid JSON: {e}")
+            return None
+        _templates[template_path] = (mtime_ns, template)
+        return template
     return None
 
+
 def build_format_instructions(template):
     if not template:
         return ""
@@ -29,95 +42,221 @@ def build_format_instructions(template):
     expected = template.get("format_instructions", {}).get("expected_structure")
     if expected:
         lines.append("Your response must be a valid JSON object with this structure:\n\n")
-        lines.append("```json\n" + json.dumps(expected, indent=2) + "\n```\n\n")
+        lines.append("```json\n" + codec.dumps(expected, indent=True) + "\n```\n\n")
     notes = template.get("format_instructions", {}).get("important_notes", [])
     if notes:
         lines.append("IMPORTANT:\n")
         lines.extend(f"- {note}\n" for note in notes)
     return "".join(lines)
 
+
+def format_instructions(repo_path):
+    """Return the response format instructions of the project's prompt-template.json, if any."""
+    template_path = os.path.join(repo_path, "../prompt-template.json")
+    return build_format_instructions(load_template(template_path))
+
+
 def files_in_idea(data):
-    """Returns a list of files mentioned in the idea (in response/files or root-level files)."""
-    files = set()
-    for files_data in (data.get("response", {}).get("files"), data.get("files")):
-        if isinstance(files_data, dict):
-            files.update(files_data.keys())
-        elif isinstance(files_data, list):
-            # If list of dicts with name keys (rare, but some LLMs do this)
-            for entry in files_data:
-                if isinstance(entry, dict) and "name" in entry:
-                    files.add(entry["name"])
-    return list(files)
+    """Returns the files mentioned in the idea (in response/files or root-level files)."""
+    if not isinstance(data, Conversation):
+        data = Conversation.from_dict(data)
+    return data.file_names()
 
-def enquire(args):
-    repo_path = resolve_idea_path(args)
-    conversation_dir = os.path.join(repo_path, "conversations")
-    os.makedirs(conversation_dir, exist_ok=True)
-    conversation_file = os.path.join(conversation_dir, f"{args.id}.json")
 
-    # Load or initialize data
-    data = {"id": args.id}
-    if os.path.exists(conversation_file):
-        with open(conversation_file, "r", encoding="utf-8") as f:
-            data.update(json.load(f))
+def select_locally(repo_path, args, data, quiet=False, settings=None):
+    """Pick the files data needs without asking the LLM, if configured to.
+
+    With file_selection "bm25" (see ideacli.retrieval) the best matching
+    files are recorded as files_needed and data gets the analysis prompt
+    quoting them, in the "updated" state, as if 'update' had been given the
+    LLM's choice. Returns False if the LLM has to be asked.
+    """
+    if settings is None:
+        settings = config.load_config(repo_path)
+    mode = getattr(args, "select", None) or settings["file_selection"]
+    if mode != "bm25":
+        return False
+
+    from ideacli import prompt, retrieval
+    from ideacli.update import build_solution_prompt
+
+    picked = retrieval.select_files(repo_path, data, settings["select_max_files"],
+                                    settings["prompt_max_tokens"])
+    if not picked:
+        if not quiet:
+            print("No file matches the idea; asking the LLM which files it needs.")
+        return False
+    files_needed = [name for name, _ in picked]
+    if not quiet:
+        print("Files picked locally: " + ", ".join(
+            f"{name} ({score:.2f})" for name, score in picked))
+    builder = build_solution_prompt(repo_path, data, files_needed,
+                                    settings["prompt_max_tokens"], settings["prompt_max_chars"])
+    if not quiet and any(stat["status"] != "included" for stat in builder.stats):
+        print(prompt.format_stats(builder.stats))
+    data.state = "updated"
+    data["files_needed"] = files_needed
+    # As update does, keep the analysis prompt as last_prompt too, so that
+    # it replaces the one an earlier round left there
+    data.prompt = data.last_prompt = builder.text()
+    return True
 
+
+def prepare(repo_path, data, args, quiet=False, format_instr=None, settings=None):
+    """Give data (a Conversation) its next prompt and state, without saving it.
+
+    args supplies the optional prompt (replacing the body) and select;
+    quiet keeps it from printing which way the files were chosen.
+    format_instr and settings, if given, save reading the template and
+    config again when many ideas are prepared.
+    """
     # Update body if prompt provided
     if hasattr(args, 'prompt') and args.prompt:
-        data["body"] = args.prompt
+        data.body = args.prompt
 
     # Compose user prompt from subject and body
     user_prompt = ""
-    if "subject" in data and data["subject"]:
-        user_prompt += data["subject"] + "\n\n"
-    if "body" in data and data["body"]:
-        user_prompt += data["body"]
+    if data.subject:
+        user_prompt += data.subject + "\n\n"
+    if data.body:
+        user_prompt += data.body
 
     # Detect what files already exist for this idea
     file_list = files_in_idea(data)
 
     if not file_list:
         # No files yet: skip analysis step, go straight to solution
-        print("No files found for this idea. Skipping 'files needed' step.")
-        data["state"] = "updated"
+        if not quiet:
+            print("No files found for this idea. Skipping 'files needed' step.")
+        data.state = "updated"
         user_prompt += (
             "\n\nThere are currently **no files** in this project."
             "\nPlease create the initial files needed for this idea, as described above."
         )
-        # Optionally add format_instructions if using prompt-template.json
-        template_path = os.path.join(repo_path, "../prompt-template.json")
-        template_content = load_template(template_path)
-        format_instr = build_format_instructions(template_content)
-        lm_prompt = user_prompt + format_instr
-        data["prompt"] = lm_prompt
+    elif select_locally(repo_path, args, data, quiet, settings):
+        return
     else:
         # Files exist: ask which files are needed for the analysis step
-        data["state"] = "analysis requested"
+        data.state = "analysis requested"
         user_prompt += (
             "\n\nWhich of these files would you need to see to answer the following prompt?\n"
             f"{file_list}\n"
             "Respond with a JSON list of filenames."
         )
-        template_path = os.path.join(repo_path, "../prompt-template.json")
-        template_content = load_template(template_path)
-        format_instr = build_format_instructions(template_content)
-        lm_prompt = user_prompt + format_instr
-        data["prompt"] = lm_prompt
+    # Optionally add format_instructions if using prompt-template.json
+    if format_instr is None:
+        format_instr = format_instructions(repo_path)
+    data.prompt = user_prompt + format_instr
+
+
+def batch_ids(repo_path, args):
+    """Return the IDs a batch enquire covers: those listed in --ids-from, or --all in --state."""
+    if getattr(args, "ids_from", None):
+        with open(args.ids_from, "r", encoding="utf-8") as f:
+            # Each ID once, in the order given
+            return list(dict.fromkeys(resolve_idea_id(repo_path, line.strip())
+                                      for line in f if line.strip()))
+    return index.ids_in_state(repo_path, args.state or "added", args.workers)
+
+
+def enquire_batch(args, repo_path):
+    """Prepare many ideas, writing one {"id", "state", "prompt"} JSONL record each to --output.
+
+    The template and config are read once; ideas are prepared in a thread
+    pool, then saved and indexed together, BATCH_CHUNK_SIZE at a time, so
+    memory use doesn't grow with the number of ideas.
+    """
+    idea_ids = batch_ids(repo_path, args)
+    format_instr = format_instructions(repo_path)
+    settings = config.load_config(repo_path)
+
+    def prepare_file(idea_file):
+        data = Conversation.load(idea_file)
+        prepare(repo_path, data, args, quiet=True, format_instr=format_instr, settings=settings)
+        return data
+
+    start = time.perf_counter()
+    written = failed = 0
+    with open(args.output, "w", encoding="utf-8") as out:
+        for offset in range(0, len(idea_ids), BATCH_CHUNK_SIZE):
+            chunk = idea_ids[offset:offset + BATCH_CHUNK_SIZE]
+            idea_files = [paths.idea_path(repo_path, idea_id) for idea_id in chunk]
+            prepared = loader.load_all(repo_path, idea_files, prepare_file, args.workers,
+                                       processes=False)
+            ready = []
+            for idea_id, idea_file, data in zip(chunk, idea_files, prepared):
+                if isinstance(data, Exception):
+                    print(f"[{idea_id}] skipped: {data}", file=sys.stderr)
+                    failed += 1
+                    continue
+                ready.append((idea_id, idea_file, data))
+            conversations = {idea_file: data for _, idea_file, data in ready}
+            saved = loader.load_all(repo_path, conversations,
+                                    lambda idea_file: conversations[idea_file].save(idea_file),
+                                    args.workers, processes=False)
+            index.record_many(repo_path, [(idea_id, data) for (idea_id, _, data), result
+                                          in zip(ready, saved) if result is True])
+            for (idea_id, _, data), result in zip(ready, saved):
+                if isinstance(result, Exception):
+                    print(f"[{idea_id}] could not be saved: {result}", file=sys.stderr)
+                    failed += 1
+                    continue
+                out.write(codec.dumps({"id": idea_id, "state": data.state,
+                                       "prompt": data.prompt}) + "\n")
+                written += 1
+
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {written} prompts to {args.output} in {elapsed:.2f}s"
+          + (f", {failed} ideas skipped." if failed else "."))
+    if failed:
+        sys.exit(1)
+
+
+def enquire(args):
+    repo_path = resolve_idea_path(args)
+    if getattr(args, "ids_from", None) or getattr(args, "all", False):
+        if not getattr(args, "output", None):
+            print("Error: --ids-from and --all need --output FILE for the JSONL prompts",
+                  file=sys.stderr)
+            sys.exit(1)
+        try:
+            enquire_batch(args, repo_path)
+        except OSError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+    if not args.id:
+        print("Error: give --id, --ids-from or --all", file=sys.stderr)
+        sys.exit(1)
+    args.id = resolve_idea_id(repo_path, args.id)
+    conversation_file = paths.idea_path(repo_path, args.id)
+    paths.ensure_parent(conversation_file)
+
+    # Load or initialize data
+    if os.path.exists(conversation_file):
+        data = Conversation.load(conversation_file)
+    else:
+        data = Conversation.from_dict({})
+    data.id = args.id
+
+    prepare(repo_path, data, args)
 
     # Write updated conversation file
-    with open(conversation_file, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    if data.save(conversation_file):
+        index.record(repo_path, args.id, data)
 
     # Copy to clipboard
-    if HAS_PYPERCLIP:
+    pyperclip = load_pyperclip()
+    if pyperclip:
         try:
-            pyperclip.copy(data["prompt"])
-            print(f"LLM prompt copied to clipboard! Length: {len(data['prompt'])} characters")
+            pyperclip.copy(data.prompt)
+            print(f"LLM prompt copied to clipboard! Length: {len(data.prompt)} characters")
         except pyperclip.PyperclipException as e:
             print(f"Warning: Could not copy to clipboard: {e}")
     else:
         print("Warning: pyperclip not installed. Cannot copy to clipboard.")
 
     if hasattr(args, 'output') and args.output:
-        output_data = {"conversation": data, "prompt": data["prompt"]}
+        output_data = {"conversation": data.to_dict(), "prompt": data.prompt}
         with open(args.output, "w", encoding="utf-8") as f:
-            json.dump(output_data, f, indent=2)
+            f.write(codec.dumps(output_data, indent=True))
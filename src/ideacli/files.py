@@ -1,135 +1,239 @@
 """File operations for extracting and listing code samples from ideas."""
 
-import json
+import difflib
+import hashlib
 import os
+import stat
 import sys
-from ideacli.repository import resolve_idea_path
+from ideacli import blobs, codec, config, loader, paths, store
+from ideacli.model import Conversation, iter_files
+from ideacli.repository import resolve_idea_id, resolve_idea_path
+
+# Under the cache directory: what each extract wrote, see extract_files
+MANIFEST_DIR = "extract"
 
-SKIP_FILE_KEYS = {"state", "prompt", "last_prompt", "response", "files_needed"}
 
 def list_files(args):
     """List filenames with paths associated with a conversation."""
     repo_path = resolve_idea_path(args)
-    idea_file = os.path.join(repo_path, "conversations", f"{args.id}.json")
+    args.id = resolve_idea_id(repo_path, args.id)
+    idea_file = paths.idea_path(repo_path, args.id)
 
     if not os.path.isfile(idea_file):
         print(f"No conversation with ID {args.id}")
         sys.exit(1)
 
-    with open(idea_file, encoding="utf-8") as f:
-        idea = json.load(f)
-
-    files = set()
-
-    # Helper to extract filename+path from a file_obj
-    def extract_file_path(filename, file_obj):
-        if isinstance(file_obj, dict):
-            pth = (file_obj.get("path") or "").strip()
-            if pth and not pth.endswith("/"):
-                pth += "/"
-            return f"{pth}{filename}" if pth else filename
-        elif isinstance(file_obj, str):
-            return filename
-        return None
-
-    # Collect file names from both 'response' and root-level 'files'
-    for files_data in (idea.get("response", {}).get("files"), idea.get("files")):
-        if isinstance(files_data, dict):
-            for filename, file_obj in files_data.items():
-                relpath = extract_file_path(filename, file_obj)
-                if relpath:
-                    files.add(relpath)
+    # File names and paths only: the contents are never decoded
+    files = Conversation.load(idea_file).file_paths()
 
     if files:
-        print("\n".join(sorted(files)))
+        print("\n".join(files))
     else:
         print("No files found in idea response.")
 
-def _write_file(filename, content, path=""):
-    """Write content to filename, creating directories as needed."""
-    if isinstance(content, bytes):
-        content = content.decode('utf-8')
+
+def _target_path(filename, path=""):
+    """Return where a file entry is extracted to, relative to the current directory."""
     if path and path not in ("", "."):
-        actual_path = os.path.join(path, filename)
-    else:
-        actual_path = filename
-    dir_name = os.path.dirname(actual_path)
-    if dir_name:
-        os.makedirs(dir_name, exist_ok=True)
-    with open(actual_path, "w", encoding="utf-8") as out_file:
-        out_file.write(content)
-    print(f"Wrote {actual_path}")
-
-def _extract_from_files_data(files_data):
-    """Extract files from a files dict or list structure."""
-    extracted = False
-    if isinstance(files_data, dict):
-        for filename, file_obj in files_data.items():
-            # --- Skip keys that are not actual files ---
-            if filename in SKIP_FILE_KEYS:
-                continue
-            # Legacy: value is just file content
-            if isinstance(file_obj, str):
-                _write_file(filename, file_obj)
-                extracted = True
-            # New format: dict with at least 'content'
-            elif isinstance(file_obj, dict) and "content" in file_obj:
-                content = file_obj["content"]
-                path = (file_obj.get("path") or "").strip()
-                if isinstance(content, dict):
-                    content = json.dumps(content, indent=2)
-                _write_file(filename, content, path)
-                extracted = True
-            else:
-                # Not a file; skip with message (quietly)
-                continue
-    elif isinstance(files_data, list):
-        for file_entry in files_data:
-            if isinstance(file_entry, dict):
-                file_name = file_entry.get("name")
-                content = file_entry.get("content")
-                path = (file_entry.get("path") or "").strip()
-                if file_name and content is not None:
-                    if isinstance(content, dict):
-                        content = json.dumps(content, indent=2)
-                    _write_file(file_name, content, path)
-                    extracted = True
-    return extracted
-
-def _extract_from_approaches(approaches):
-    """Extract files from approaches code_samples."""
-    extracted = False
+        return os.path.normpath(os.path.join(path, filename))
+    return os.path.normpath(filename)
+
+
+def _collect_from_files_data(repo_path, files_data, targets):
+    """Add {target path: content} for the files in a files dict or list structure."""
+    for filename, file_obj in iter_files(files_data):
+        # Legacy plain content, {"content": ...} or {"blob": ...} in the blob store;
+        # anything else is not a file
+        content = blobs.file_content(repo_path, file_obj)
+        if content is None:
+            continue
+        if isinstance(content, dict):
+            content = codec.dumps(content, indent=True)
+        path = (file_obj.get("path") or "").strip() if isinstance(file_obj, dict) else ""
+        targets[_target_path(filename, path)] = content
+
+
+def _collect_from_approaches(approaches, targets):
+    """Add {target path: content} for approaches code_samples."""
     for approach in approaches or []:
         if isinstance(approach, dict):
             for sample in approach.get("code_samples", []):
                 file_path = sample.get("file")
                 code = sample.get("code")
                 if file_path and code:
-                    _write_file(file_path, code)
-                    extracted = True
-    return extracted
+                    targets[_target_path(file_path)] = code
+
+
+def _manifest_file(repo_path, idea_id):
+    """Return the manifest of what idea_id last extracted into the current directory."""
+    from ideacli import index
+
+    where = hashlib.sha256(os.getcwd().encode("utf-8", "surrogateescape")).hexdigest()[:16]
+    return os.path.join(index.cache_dir(repo_path), MANIFEST_DIR, f"{idea_id}-{where}.json")
+
+
+def _load_manifest(manifest_file):
+    """Return {path: {"sha256", "size", "mtime_ns"}} from a manifest, {} if there is none."""
+    try:
+        with open(manifest_file, "rb") as f:
+            manifest = codec.loads(f.read())
+    except (OSError, ValueError):
+        return {}
+    return manifest.get("files", {}) if isinstance(manifest, dict) else {}
+
+
+def _stamp(path, digest):
+    st = os.stat(path)
+    return {"sha256": digest, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _on_disk(path, recorded, read=False):
+    """Return (matches the manifest entry, current bytes or None if missing).
+
+    A file whose size and mtime are those recorded is taken to be unchanged
+    without being read, unless read asks for its bytes anyway.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return False, None
+    stat_matches = bool(recorded) and (st.st_size, st.st_mtime_ns) == (
+        recorded.get("size"), recorded.get("mtime_ns"))
+    if stat_matches and not read:
+        return True, None
+    with open(path, "rb") as f:
+        data = f.read()
+    return stat_matches or (bool(recorded) and
+                            hashlib.sha256(data).hexdigest() == recorded.get("sha256")), data
+
+
+def _print_diff(path, old, new):
+    try:
+        old_lines = old.decode("utf-8").splitlines(keepends=True) if old is not None else []
+    except UnicodeDecodeError:
+        print(f"Binary file {path} differs")
+        return
+    sys.stdout.writelines(difflib.unified_diff(
+        old_lines, new.decode("utf-8").splitlines(keepends=True),
+        fromfile=path if old is not None else "/dev/null", tofile=path))
+    if new and not new.endswith(b"\n"):
+        print()
+
+
+def _write(path, data, fsync):
+    """Atomically replace path with data, keeping the mode of a file already there."""
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = None
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    store.write_atomic(path, data, fsync)
+    if mode is not None:
+        os.chmod(path, mode)
+    return path
+
 
 def extract_files(args):
-    """Extract code samples into real files from an idea conversation."""
+    """Extract code samples into real files from an idea conversation.
+
+    A manifest of the content hashes written is kept per idea and output
+    directory, so files that are already up to date are left alone (keeping
+    their mtimes), changed files are written in parallel with atomic
+    renames, and files extracted before that the idea no longer has are
+    removed unless they were edited since.
+    """
     repo_path = resolve_idea_path(args)
-    conversation_dir = os.path.join(repo_path, "conversations")
-    idea_file = os.path.join(conversation_dir, f"{args.id}.json")
+    args.id = resolve_idea_id(repo_path, args.id)
+    idea_file = paths.idea_path(repo_path, args.id)
+    dry_run = getattr(args, "dry_run", False)
+    show_diff = getattr(args, "diff", False)
 
     if not os.path.isfile(idea_file):
         print(f"Error: No conversation found with ID '{args.id}'")
         sys.exit(1)
 
-    with open(idea_file, encoding="utf-8") as f:
-        idea = json.load(f)
+    idea = Conversation.load(idea_file)
+    response = idea.response
 
-    response = idea.get("response", {})
-
-    extracted = False
-    # Extract from response['files'] and root-level 'files'
-    extracted |= _extract_from_files_data(response.get("files", {}))
-    extracted |= _extract_from_files_data(idea.get("files", {}))
-    # Extract from approaches
-    extracted |= _extract_from_approaches(response.get("approaches", []))
+    # Later entries win: response['files'], then root-level 'files', then approaches
+    targets = {}
+    try:
+        _collect_from_files_data(repo_path, response.get("files", {}), targets)
+        _collect_from_files_data(repo_path, idea.files, targets)
+    except FileNotFoundError as e:
+        print(f"Error: missing blob {e.filename}")
+        sys.exit(1)
+    _collect_from_approaches(response.get("approaches", []), targets)
 
-    if not extracted:
+    if not targets:
         print("No files found to extract.")
+
+    manifest_file = _manifest_file(repo_path, args.id)
+    manifest = _load_manifest(manifest_file)
+    new_manifest = {}
+    to_write = {}
+    unchanged = 0
+    for path, content in targets.items():
+        if isinstance(content, bytes):
+            content = content.decode("utf-8")
+        data = content.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        recorded = manifest.get(path)
+        # --diff needs the old bytes of a file that is going to change
+        matches, old = _on_disk(path, recorded,
+                                read=show_diff and (recorded or {}).get("sha256") != digest)
+        if (matches and recorded["sha256"] == digest) or old == data:
+            unchanged += 1
+            new_manifest[path] = recorded if old is None else _stamp(path, digest)
+            continue
+        if show_diff:
+            _print_diff(path, old, data)
+        to_write[path] = (data, digest)
+
+    # Files this idea extracted here before but no longer has, unless edited since
+    to_remove = []
+    for path, recorded in manifest.items():
+        if path in targets:
+            continue
+        matches, old = _on_disk(path, recorded)
+        if matches:
+            to_remove.append(path)
+        elif old is not None:
+            print(f"Kept {path}: changed since it was extracted")
+
+    if dry_run:
+        for path in to_write:
+            print(f"Would write {path}")
+        for path in to_remove:
+            print(f"Would remove {path}")
+        print(f"Dry run: {len(to_write)} to write, {unchanged} unchanged, "
+              f"{len(to_remove)} to remove")
+        return
+
+    fsync = config.get(repo_path, "fsync")
+    results = loader.load_all(
+        repo_path, list(to_write), reader=lambda path: _write(path, to_write[path][0], fsync),
+        workers=getattr(args, "workers", None), processes=False)
+    failed = 0
+    for path, result in zip(to_write, results):
+        if isinstance(result, Exception):
+            print(f"Error writing {path}: {result}", file=sys.stderr)
+            failed += 1
+            continue
+        print(f"Wrote {path}")
+        new_manifest[path] = _stamp(path, to_write[path][1])
+    for path in to_remove:
+        os.remove(path)
+        print(f"Removed {path}")
+
+    if new_manifest or manifest:
+        os.makedirs(os.path.dirname(manifest_file), exist_ok=True)
+        store.write_atomic(manifest_file, codec.dumps({"files": new_manifest}).encode("utf-8"),
+                           fsync=False)
+    if targets or to_remove:
+        print(f"{len(to_write) - failed} written, {unchanged} unchanged, "
+              f"{len(to_remove)} removed")
+    if failed:
+        sys.exit(1)
@@ -0,0 +1,271 @@
+"""Git backends used to record ideas repository changes.
+
+Two backends are available, chosen with the ``git_backend`` setting (see
+ideacli.config):
+
+* ``subprocess`` (default) runs the ``git`` command line tool.
+* ``dulwich`` uses the optional dulwich package to write blobs, trees and
+  commits in-process, avoiding a fork/exec of git per operation. It falls
+  back to ``subprocess`` when dulwich is not installed.
+
+Paths are handed to backends as a file of NUL separated, repo relative
+paths, so that batches of any size can be committed.
+"""
+
+import importlib.util
+import itertools
+import os
+import shutil
+import subprocess
+import sys
+from ideacli import config
+
+# dulwich takes longer to import than most commands take to run, so it is
+# only imported by the dulwich backend itself
+HAS_DULWICH = importlib.util.find_spec("dulwich") is not None
+
+# Paths per 'git ls-files' command line
+LS_FILES_CHUNK = 1000
+# Porcelain status codes of unmerged paths
+CONFLICTS = {"DD", "AU", "UD", "UA", "DU", "AA", "UU"}
+
+
+def empty_summary(branch=None):
+    """Return a status summary with nothing to report (see SubprocessBackend.summary)."""
+    return {"branch": branch, "ahead": 0, "behind": 0,
+            "staged": 0, "modified": 0, "untracked": 0, "conflicted": 0}
+
+
+def _parse_branch(line, summary):
+    """Fill in branch, ahead and behind from a porcelain '## ...' line."""
+    line = line[3:]
+    for prefix in ("No commits yet on ", "Initial commit on "):
+        if line.startswith(prefix):
+            line = line[len(prefix):]
+    head, _, tracking = line.partition(" [")
+    branch = head.split("...")[0]
+    summary["branch"] = None if branch.startswith("HEAD (") else branch
+    for part in tracking.rstrip("]").split(", "):
+        name, _, count = part.partition(" ")
+        if name in ("ahead", "behind") and count.isdigit():
+            summary[name] = int(count)
+
+
+def parse_porcelain(output):
+    """Return a status summary from 'git status --porcelain -z --branch' output."""
+    summary = empty_summary()
+    entries = iter(output.split("\0"))
+    for entry in entries:
+        if entry.startswith("## "):
+            _parse_branch(entry, summary)
+            continue
+        if len(entry) < 3:
+            continue
+        code = entry[:2]
+        if code[0] in "RC":
+            next(entries, None)  # The path it was renamed or copied from
+        if code == "??":
+            summary["untracked"] += 1
+        elif code in CONFLICTS:
+            summary["conflicted"] += 1
+        elif code != "!!":
+            summary["staged"] += code[0] != " "
+            summary["modified"] += code[1] != " "
+    return summary
+
+
+def read_pathspec(pathspec_file, chunk_size=65536):
+    """Yield the NUL separated paths of a pathspec file without reading it whole."""
+    with open(pathspec_file, "r", encoding="utf-8") as f:
+        rest = ""
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            *entries, rest = (rest + chunk).split("\0")
+            yield from entries
+        if rest:
+            yield rest
+
+
+class SubprocessBackend:
+    """Runs the git command line tool."""
+
+    name = "subprocess"
+
+    def __init__(self, repo_path):
+        self.repo_path = repo_path
+
+    def _git(self, *args):
+        subprocess.run(["git", *args], cwd=self.repo_path, check=True)
+
+    def init(self):
+        """Create an empty git repository."""
+        self._git("init")
+
+    def commit(self, pathspec_file, message_file):
+        """Stage exactly the listed paths (additions, changes or removals) and commit them."""
+        work_dir = os.path.dirname(pathspec_file)
+        present_file = os.path.join(work_dir, "present")
+        gone_file = os.path.join(work_dir, "gone")
+        n_present = n_gone = 0
+        with open(present_file, "w", encoding="utf-8") as present, \
+                open(gone_file, "w", encoding="utf-8") as gone:
+            for path in read_pathspec(pathspec_file):
+                if os.path.exists(os.path.join(self.repo_path, path)):
+                    present.write(path + "\0")
+                    n_present += 1
+                else:
+                    gone.write(path + "\0")
+                    n_gone += 1
+
+        # Paths that are gone and were never committed (e.g. moved before
+        # their first commit) are no change at all, and git rejects them
+        commit_file = pathspec_file
+        if n_gone:
+            tracked = b"".join(self._tracked(read_pathspec(gone_file)))
+            with open(gone_file, "wb") as gone:
+                gone.write(tracked)
+            n_gone = tracked.count(b"\0")
+            commit_file = os.path.join(work_dir, "commit")
+            with open(commit_file, "wb") as commit, open(present_file, "rb") as present:
+                shutil.copyfileobj(present, commit)
+                commit.write(tracked)
+
+        if n_present:
+            self._git("add", f"--pathspec-from-file={present_file}", "--pathspec-file-nul")
+        if n_gone:
+            self._git("rm", "-q", "--cached", "--ignore-unmatch",
+                      f"--pathspec-from-file={gone_file}", "--pathspec-file-nul")
+        if n_present or n_gone:
+            self._git("commit", "-q", "-F", message_file,
+                      f"--pathspec-from-file={commit_file}", "--pathspec-file-nul")
+
+    def _tracked(self, paths):
+        """Yield the NUL terminated paths among paths that git tracks."""
+        paths = iter(paths)
+        while True:
+            chunk = [f":(literal){path}" for path in itertools.islice(paths, LS_FILES_CHUNK)]
+            if not chunk:
+                return
+            yield subprocess.run(["git", "ls-files", "-z", "--", *chunk], cwd=self.repo_path,
+                                 check=True, stdout=subprocess.PIPE).stdout
+
+    def summary(self):
+        """Return counts of staged, modified, untracked and conflicted paths, and the branch.
+
+        Uses machine-readable porcelain output with git's untracked cache,
+        optionally the filesystem monitor (git_fsmonitor setting) and
+        optionally no search for untracked files at all (status_untracked).
+        """
+        settings = config.load_config(self.repo_path)
+        options = ["-c", "core.untrackedCache=true"]
+        if settings["git_fsmonitor"]:
+            options += ["-c", "core.fsmonitor=true"]
+        output = subprocess.check_output(
+            ["git", *options, "status", "--porcelain", "-z", "--branch",
+             f"--untracked-files={settings['status_untracked']}"],
+            cwd=self.repo_path, text=True)
+        return parse_porcelain(output)
+
+
+class DulwichBackend:
+    """Writes git objects in-process with dulwich."""
+
+    name = "dulwich"
+
+    def __init__(self, repo_path):
+        self.repo_path = repo_path
+
+    def init(self):
+        """Create an empty git repository."""
+        from dulwich.repo import Repo
+
+        Repo.init(self.repo_path).close()
+
+    def commit(self, pathspec_file, message_file):
+        """Stage the listed paths (removing missing ones from the index) and commit.
+
+        Blobs are written for the listed paths only and the new tree is
+        derived from HEAD's by replacing just those entries, so the rest of
+        the working tree is never rescanned.
+        """
+        from dulwich.index import index_entry_from_stat
+        from dulwich.object_store import commit_tree_changes
+        from dulwich.objects import Blob, Tree
+        from dulwich.repo import Repo
+
+        with open(message_file, "r", encoding="utf-8") as f:
+            message = f.read().encode("utf-8")
+        repo = Repo(self.repo_path)
+        try:
+            git_index = repo.open_index()
+            changes = []
+            for path in read_pathspec(pathspec_file):
+                key = path.replace(os.sep, "/").encode("utf-8")
+                full_path = os.path.join(self.repo_path, path)
+                if os.path.exists(full_path):
+                    with open(full_path, "rb") as f:
+                        blob = Blob.from_string(f.read())
+                    repo.object_store.add_object(blob)
+                    entry = index_entry_from_stat(os.lstat(full_path), blob.id)
+                    git_index[key] = entry
+                    changes.append((key, entry.mode, blob.id))
+                elif key in git_index:
+                    del git_index[key]
+                    changes.append((key, None, None))
+            git_index.write()
+
+            try:
+                base_tree = repo[repo.head()].tree
+            except KeyError:
+                base_tree = Tree()
+            # Never the whole index, which may hold paths staged by hand
+            tree = commit_tree_changes(repo.object_store, base_tree, changes)
+
+            if hasattr(repo, "get_worktree"):
+                repo.get_worktree().commit(message=message, tree=tree)
+            else:
+                # dulwich < 0.24 commits from the repo itself
+                repo.do_commit(message=message, tree=tree)
+        finally:
+            repo.close()
+
+    def summary(self):
+        """Return the same counts as SubprocessBackend.summary (ahead/behind are not computed)."""
+        from dulwich import porcelain
+
+        untracked = "no" if config.get(self.repo_path, "status_untracked") == "no" else "all"
+        result = porcelain.status(self.repo_path, untracked_files=untracked)
+        try:
+            branch = _text(porcelain.active_branch(self.repo_path))
+        except (KeyError, IndexError, ValueError):
+            branch = None
+        summary = empty_summary(branch)
+        summary["staged"] = sum(len(paths) for paths in result.staged.values())
+        summary["modified"] = len(result.unstaged)
+        summary["untracked"] = len(result.untracked)
+        return summary
+
+
+def _text(path):
+    return path.decode("utf-8", "replace") if isinstance(path, bytes) else path
+
+
+BACKENDS = {
+    SubprocessBackend.name: SubprocessBackend,
+    DulwichBackend.name: DulwichBackend,
+}
+
+
+def get_backend(repo_path):
+    """Return the configured git backend for the repo at repo_path."""
+    name = config.get(repo_path, "git_backend")
+    if name not in BACKENDS:
+        print(f"Warning: unknown git_backend '{name}', using subprocess", file=sys.stderr)
+        name = SubprocessBackend.name
+    if name == DulwichBackend.name and not HAS_DULWICH:
+        print("Warning: dulwich not installed, using the subprocess git backend",
+              file=sys.stderr)
+        name = SubprocessBackend.name
+    return BACKENDS[name](repo_path)
@@ -1,16 +1,18 @@
 """File operations for importing external files into ideas."""
 
-import json
 import os
 import sys
 from pathlib import Path
-from ideacli.repository import resolve_idea_path
+from ideacli import blobs, index, paths
+from ideacli.model import Conversation
+from ideacli.repository import resolve_idea_id, resolve_idea_path
 
 
 def import_idea(args):
     """Import a file into an idea's JSON representation."""
     repo_path = resolve_idea_path(args)
-    idea_file = os.path.join(repo_path, "conversations", f"{args.id}.json")
+    args.id = resolve_idea_id(repo_path, args.id)
+    idea_file = paths.idea_path(repo_path, args.id)
 
     if not os.path.isfile(idea_file):
         print(f"No conversation with ID {args.id}")
@@ -30,41 +32,45 @@ def import_idea(args):
         sys.exit(1)
 
     # Read the idea file
-    with open(idea_file, encoding="utf-8") as f:
-        idea = json.load(f)
+    try:
+        idea = Conversation.load(idea_file)
+    except (OSError, ValueError) as e:
+        print(f"Error reading idea file: {e}")
+        sys.exit(1)
 
     # Determine destination filename - simple approach
     # Always use just the filename by default, unless destination is specified
     dest_filename = args.destination if args.destination else source_path.name
 
-    # Initialize files dictionary if it doesn't exist
-    if "files" not in idea:
-        idea["files"] = {}
-    
-    # Check if file already exists in any location
-    file_exists = False
-    
-    # Check in the root-level "files" dictionary
-    if dest_filename in idea["files"]:
-        file_exists = True
-    
-    # Also check in the response["files"] dictionary if it exists
-    if "response" in idea and "files" in idea["response"]:
-        if isinstance(idea["response"]["files"], dict) and dest_filename in idea["response"]["files"]:
-            file_exists = True
-    
-    # Handle existing file
-    if file_exists and not args.force:
+    # Check if file already exists in any location: the root-level files or
+    # the response's files, in either form
+    if dest_filename in idea.file_names() and not args.force:
         print(f"File {dest_filename} already exists in idea {args.id}. Use --force to overwrite.")
         sys.exit(1)
-    
-    # Store the file content in the idea JSON
-    idea["files"][dest_filename] = file_content
-    
+
+    # Store the file content in the idea JSON, or just its hash if blobs are enabled
+    if blobs.enabled(repo_path):
+        entry = {"blob": blobs.put(repo_path, file_content)}
+    else:
+        entry = file_content
+
+    files = idea.files
+    if isinstance(files, list):
+        # Files stored as a list of {"name": ...} entries stay in that form
+        files = [f for f in files if not (isinstance(f, dict) and f.get("name") == dest_filename)]
+        if isinstance(entry, dict):
+            files.append({"name": dest_filename, **entry})
+        else:
+            files.append({"name": dest_filename, "content": entry})
+    else:
+        files = dict(files) if isinstance(files, dict) else {}
+        files[dest_filename] = entry
+    idea.files = files
+
     # Write back the updated idea JSON
     try:
-        with open(idea_file, 'w', encoding='utf-8') as f:
-            json.dump(idea, f, indent=2)
+        if idea.save(idea_file):
+            index.record(repo_path, args.id, idea)
         print(f"Imported {args.source} as {dest_filename} into idea {args.id}")
     except Exception as e:
         print(f"Error updating idea file: {e}")
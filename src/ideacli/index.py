@@ -0,0 +1,179 @@
+"""Persistent metadata index of the conversations in an ideas repository.
+
+The index lives in ``.ideas_repo/.cache/index.sqlite`` and holds the id,
+subject, state, mtime and size of every conversation file, so that commands
+such as ``list`` don't need to open and decode every conversation JSON.
+It is checked against the file mtimes on every refresh, so conversations
+edited outside ideacli are picked up incrementally.
+"""
+
+import os
+import sqlite3
+import sys
+from ideacli import loader, paths, store
+
+CACHE_DIR = ".cache"
+INDEX_FILE = "index.sqlite"
+# How long after its last change a directory mtime is trusted, for
+# filesystems with whole second timestamps and for finer ones (see scan_needed)
+RACY_NS = 2 * 10**9
+FINE_RACY_NS = 10**8
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ideas (
+    name TEXT PRIMARY KEY,
+    id TEXT,
+    subject TEXT,
+    state TEXT,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+)
+"""
+
+
+def cache_dir(repo_path):
+    """Return the (git ignored) cache directory of the repo, creating it if needed."""
+    path = os.path.join(repo_path, CACHE_DIR)
+    gitignore = os.path.join(path, ".gitignore")
+    if not os.path.exists(gitignore):
+        os.makedirs(path, exist_ok=True)
+        # Keep the whole cache out of the ideas repo's git history
+        with open(gitignore, "w", encoding="utf-8") as f:
+            f.write("*\n")
+    return path
+
+
+def connect(repo_path):
+    """Open the index database of the repo, creating the schema if needed."""
+    conn = sqlite3.connect(os.path.join(cache_dir(repo_path), INDEX_FILE), timeout=30)
+    conn.execute(SCHEMA)
+    return conn
+
+
+def _read_metadata(idea_file):
+    """Read the indexed fields from a conversation file."""
+    header = store.read_header(idea_file)
+    return header.get("id"), header.get("subject"), header.get("state")
+
+
+def scan_needed(dir_mtime_ns, last_scan):
+    """Whether the conversations directory must be scanned for changed files.
+
+    last_scan is the (paths.dir_stamp(), time.time_ns()) pair recorded at
+    the start of the last complete scan, or None. Conversations are written
+    by renaming a temporary file into place, which updates the directory
+    mtime, so while that is unchanged no file can have changed either
+    (unless edited in place by another tool). A directory modified shortly
+    before the scan may have changed again since without its mtime showing
+    it (timestamps are coarser than nanoseconds), so it is not trusted.
+    """
+    if not last_scan or dir_mtime_ns is None or last_scan[0] != dir_mtime_ns:
+        return True
+    racy_ns = RACY_NS if dir_mtime_ns % 10**9 == 0 else FINE_RACY_NS
+    return last_scan[1] - dir_mtime_ns < racy_ns
+
+
+def refresh(conn, repo_path, workers=None):
+    """Bring the index up to date with the conversations directory.
+
+    Only files whose mtime or size changed since they were last indexed are
+    re-read (in parallel, see ideacli.loader); rows for files that
+    disappeared are dropped.
+    """
+    on_disk = paths.scan(repo_path)
+    indexed = {
+        name: (mtime_ns, size)
+        for name, mtime_ns, size in conn.execute("SELECT name, mtime_ns, size FROM ideas")
+    }
+
+    stale = [name for name, (_, *stamp) in on_disk.items() if indexed.get(name) != tuple(stamp)]
+    removed = [name for name in indexed if name not in on_disk]
+
+    stale.sort()
+    stale_files = [on_disk[name][0] for name in stale]
+    results = loader.load_all(repo_path, stale_files, reader=_read_metadata,
+                              workers=workers, processes=False)
+    rows = []
+    for name, idea_file, result in zip(stale, stale_files, results):
+        if isinstance(result, Exception):
+            print(f"Warning: could not index {idea_file}: {result}", file=sys.stderr)
+            continue
+        idea_id, subject, state = result
+        _, mtime_ns, size = on_disk[name]
+        rows.append((name, idea_id, subject, state, mtime_ns, size))
+
+    if rows or removed:
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO ideas VALUES (?, ?, ?, ?, ?, ?)", rows)
+            conn.executemany("DELETE FROM ideas WHERE name = ?", [(n,) for n in removed])
+
+
+def entries(repo_path, workers=None):
+    """Return (id, subject, state) for every conversation, refreshing the index first."""
+    conn = connect(repo_path)
+    try:
+        refresh(conn, repo_path, workers)
+        return conn.execute("SELECT id, subject, state FROM ideas ORDER BY name").fetchall()
+    finally:
+        conn.close()
+
+
+def ids_in_state(repo_path, state, workers=None):
+    """Return the IDs of the conversations in state (those without one count as "added")."""
+    return [idea_id for idea_id, _, idea_state in entries(repo_path, workers)
+            if (idea_state or "added") == state]
+
+
+def state_counts(repo_path, workers=None):
+    """Return {state: number of conversations}, refreshing the index first."""
+    conn = connect(repo_path)
+    try:
+        refresh(conn, repo_path, workers)
+        return dict(conn.execute("SELECT state, COUNT(*) FROM ideas GROUP BY state"))
+    finally:
+        conn.close()
+
+
+def match_prefix(repo_path, prefix, refresh_first=False, limit=2):
+    """Return up to limit conversation names starting with prefix, in order.
+
+    The lookup is a range scan of the index's primary key, so it costs the
+    same with a million conversations as with ten.
+    """
+    conn = connect(repo_path)
+    try:
+        if refresh_first:
+            refresh(conn, repo_path)
+        return [name for name, in conn.execute(
+            "SELECT name FROM ideas WHERE name >= ? AND name < ? ORDER BY name LIMIT ?",
+            (prefix, prefix + "\U0010ffff", limit)
+        )]
+    finally:
+        conn.close()
+
+
+def record(repo_path, idea_id, idea):
+    """Update the index entry of a conversation that has just been written."""
+    record_many(repo_path, [(idea_id, idea)])
+
+
+def record_many(repo_path, ideas):
+    """Update the index entries of several just-written conversations in one transaction.
+
+    ideas is a sequence of (idea_id, idea) pairs.
+    """
+    try:
+        rows = []
+        for idea_id, idea in ideas:
+            st = os.stat(paths.idea_path(repo_path, idea_id))
+            rows.append((idea_id, idea.get("id"), idea.get("subject"), idea.get("state"),
+                         st.st_mtime_ns, st.st_size))
+        conn = connect(repo_path)
+        try:
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO ideas VALUES (?, ?, ?, ?, ?, ?)", rows)
+        finally:
+            conn.close()
+    except (OSError, sqlite3.Error) as e:
+        # Not fatal: the next refresh notices the changed mtimes and re-reads the files
+        print(f"Warning: could not update ideas index: {e}", file=sys.stderr)
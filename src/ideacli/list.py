@@ -1,24 +1,26 @@
 """List all ideas in the repository."""
 
 import os
-import json
+import sqlite3
+from ideacli import index, paths
 from ideacli.repository import resolve_idea_path
 
+
 def list_ideas(args):
     """List ideas in the repository."""
     repo_path = resolve_idea_path(args)
-    conversation_dir = os.path.join(repo_path, "conversations")
+    conversation_dir = paths.conversation_dir(repo_path)
 
     if not os.path.exists(conversation_dir):
         print("No conversations found.")
         return
 
-    ideas = []
-    for filename in os.listdir(conversation_dir):
-        if filename.endswith(".json"):
-            with open(os.path.join(conversation_dir, filename), "r", encoding="utf-8") as f:
-                idea = json.load(f)
-                ideas.append((idea.get("id"), idea.get("subject")))
+    try:
+        ideas = [(idea_id, subject) for idea_id, subject, _
+                 in index.entries(repo_path, getattr(args, "workers", None))]
+    except sqlite3.Error as e:
+        print(f"Error reading ideas index: {e}")
+        return
 
     if not ideas:
         print("No ideas found.")
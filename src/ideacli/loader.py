@@ -0,0 +1,66 @@
+"""Parallel loading of conversation files for bulk commands.
+
+Reading many conversations one at a time spends nearly all its wall-clock
+time waiting on I/O, so bulk commands read and decode them in a thread
+pool instead. Results always come back in input order, so output stays
+deterministic whatever the worker count.
+"""
+
+import os
+from ideacli import config, store
+
+
+def worker_count(repo_path, workers=None):
+    """Resolve the worker count: explicit value, then config/env, then CPU based default."""
+    if not workers:
+        workers = config.get(repo_path, "workers")
+    if not workers:
+        workers = min(32, (os.cpu_count() or 1) + 4)
+    return max(1, int(workers))
+
+
+def _guarded(reader, path):
+    """Call reader(path), returning any error instead of raising it."""
+    try:
+        return reader(path)
+    except (OSError, ValueError) as e:
+        return e
+
+
+def _use_processes(repo_path, paths):
+    """Whether the average file is big enough for decoding to be CPU bound."""
+    total = 0
+    for path in paths:
+        try:
+            total += os.path.getsize(path)
+        except OSError:
+            pass
+    return total / len(paths) > config.get(repo_path, "process_threshold")
+
+
+def load_all(repo_path, paths, reader=store.load_conversation, workers=None, processes=None):
+    """Apply reader to every path in parallel, returning results in input order.
+
+    A file that cannot be read or decoded yields its exception instead of a
+    result, so one bad file doesn't abort a bulk command. When processes is
+    None, a process pool is used if the files are large on average (see the
+    process_threshold setting); reader must then be a picklable module-level
+    function.
+    """
+    paths = list(paths)
+    if not paths:
+        return []
+    workers = min(worker_count(repo_path, workers), len(paths))
+    if workers == 1:
+        return [_guarded(reader, path) for path in paths]
+
+    if processes is None:
+        processes = _use_processes(repo_path, paths)
+    # Imported here as the process pool pulls in all of multiprocessing
+    if processes:
+        from concurrent.futures import ProcessPoolExecutor as executor_class
+    else:
+        from concurrent.futures import ThreadPoolExecutor as executor_class
+    with executor_class(max_workers=workers) as executor:
+        chunksize = max(1, len(paths) // (workers * 4))
+        return list(executor.map(_guarded, [reader] * len(paths), paths, chunksize=chunksize))
@@ -0,0 +1,111 @@
+"""Convert an ideas repository to another conversation layout (see
+ideacli.paths) or compression (see ideacli.compression)."""
+
+import json
+import os
+import sys
+from ideacli import commit, compression, config, paths, store
+from ideacli.repository import resolve_idea_path
+
+
+def _set_setting(repo_path, key, value):
+    """Record a setting in the repo's config file; returns its path."""
+    config_file = os.path.join(repo_path, config.CONFIG_FILE)
+    settings = {}
+    if os.path.isfile(config_file):
+        with open(config_file, "r", encoding="utf-8") as f:
+            settings = json.load(f)
+    settings[key] = value
+    store.write_atomic(config_file, (json.dumps(settings, indent=2) + "\n").encode("utf-8"))
+    return config_file
+
+
+def _remove_empty_shards(repo_path):
+    with os.scandir(paths.conversation_dir(repo_path)) as entries:
+        for entry in entries:
+            if entry.is_dir() and not entry.name.startswith(".") and not os.listdir(entry.path):
+                os.rmdir(entry.path)
+
+
+def relayout(repo_path, target, batch=None):
+    """Move every conversation to the target layout and record it in the config.
+
+    Moved paths (old and new) and the config file are added to batch, if
+    given. Returns the number of conversations moved.
+    """
+    moved = 0
+    for name, (current, _, _) in sorted(paths.scan(repo_path).items()):
+        new = os.path.join(repo_path, paths.relative_path(name, target))
+        if os.path.abspath(current) == os.path.abspath(new):
+            continue
+        if os.path.exists(new):
+            print(f"Warning: {new} already exists, leaving {current} in place", file=sys.stderr)
+            continue
+        paths.ensure_parent(new)
+        os.replace(current, new)  # Keeps the mtime, so no cache needs re-reading
+        if batch:
+            batch.add(current)
+            batch.add(new)
+        moved += 1
+    _remove_empty_shards(repo_path)
+    config_file = _set_setting(repo_path, "layout", target)
+    if batch:
+        batch.add(config_file)
+    return moved
+
+
+def recompress(repo_path, method, batch=None):
+    """Rewrite every conversation not already stored with method and record it in the config.
+
+    Rewritten paths and the config file are added to batch, if given.
+    Returns the number of conversations rewritten.
+    """
+    fsync = config.get(repo_path, "fsync")
+    rewritten = 0
+    for _, (idea_file, _, _) in sorted(paths.scan(repo_path).items()):
+        with open(idea_file, "rb") as f:
+            raw = f.read()
+        if compression.method_of(raw) == method:
+            continue
+        store.write_atomic(idea_file, compression.compress(compression.decompress(raw), method),
+                           fsync)
+        if batch:
+            batch.add(idea_file)
+        rewritten += 1
+    config_file = _set_setting(repo_path, "compression", method)
+    if batch:
+        batch.add(config_file)
+    return rewritten
+
+
+def migrate_repo(args):
+    """Convert every conversation to the requested layout and/or compression, in a single commit."""
+    repo_path = resolve_idea_path(args)
+    layout = getattr(args, "layout", None)
+    method = getattr(args, "compression", None)
+    if not layout and not method:
+        print("Error: give --layout and/or --compression.", file=sys.stderr)
+        sys.exit(1)
+    for key, value in (("layout", layout), ("compression", method)):
+        if value and os.environ.get(f"IDEACLI_{key.upper()}"):
+            print(f"Error: unset IDEACLI_{key.upper()} before migrating.", file=sys.stderr)
+            sys.exit(1)
+    if method:
+        method = compression.effective_method(method)
+
+    # Queued changes name the old paths, so commit them first
+    if commit.flush(repo_path):
+        print("Committed changes queued with --no-commit.")
+
+    done = []
+    with commit.Batch(repo_path) as batch:
+        if layout:
+            moved = relayout(repo_path, layout, batch)
+            done.append(f"moved {moved} conversations to the {layout} layout")
+        if method:
+            rewritten = recompress(repo_path, method, batch)
+            how = "uncompressed" if method == "none" else f"with {method} compression"
+            done.append(f"rewrote {rewritten} conversations {how}")
+        summary = " and ".join(done)
+        batch.commit(summary[0].upper() + summary[1:])
+    print(f"{summary[0].upper()}{summary[1:]}; committed.")
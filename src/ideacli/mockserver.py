@@ -0,0 +1,115 @@
+"""A local OpenAI-compatible endpoint that answers ideacli's prompts like an LLM would.
+
+For tests, and for trying 'ideacli drive' without a model:
+
+    python -m ideacli.mockserver --port 8000
+    IDEACLI_LLM_BASE_URL=http://127.0.0.1:8000/v1 ideacli drive --all
+
+(or just 'ideacli drive --all --mock'). Asked which files it needs, it
+picks the first two offered; given files, it returns a short analysis of
+them; given no files, it creates a README. --delay makes every answer
+slow and --fail-every N answers every Nth request with HTTP 429, to
+exercise concurrency and retries.
+"""
+
+import argparse
+import ast
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from ideacli import codec
+
+_QUESTION = "Which of these files would you need to see"
+_QUOTED = re.compile(r"^--- (.+) ---$", re.M)
+
+
+def respond(prompt):
+    """Return the reply text for a prompt built by enquire or update."""
+    if _QUESTION in prompt:
+        listing = prompt.split(_QUESTION, 1)[1].splitlines()[1]
+        try:
+            files = ast.literal_eval(listing)
+        except (SyntaxError, ValueError):
+            files = []
+        return codec.dumps(list(files)[:2])
+    quoted = _QUOTED.findall(prompt)
+    if quoted:
+        return codec.dumps({"analysis": f"Mock analysis of {', '.join(quoted)}.",
+                            "conclusion": "Nothing to change."})
+    subject = prompt.split("\n", 1)[0]
+    return "```json\n" + codec.dumps({
+        "analysis": "Mock initial files.",
+        "files": {"README.md": f"# {subject}\n"},
+    }, indent=True) + "\n```"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def _reply(self, status, payload, headers=()):
+        data = codec.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        server = self.server
+        if not self.path.endswith("/chat/completions"):
+            self._reply(404, {"error": {"message": f"no route {self.path}"}})
+            return
+        request = codec.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        with server.lock:
+            server.requests += 1
+            count = server.requests
+        if server.delay:
+            time.sleep(server.delay)
+        if server.fail_every and count % server.fail_every == 0:
+            self._reply(429, {"error": {"message": "rate limited"}}, [("Retry-After", "0")])
+            return
+        content = respond(request["messages"][-1]["content"])
+        self._reply(200, {
+            "id": f"mock-{count}",
+            "object": "chat.completion",
+            "model": request.get("model", "mock"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+        })
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+def start(host="127.0.0.1", port=0, delay=0.0, fail_every=0):
+    """Serve in a background thread; returns (server, base_url). Stop with server.shutdown()."""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.delay = delay
+    server.fail_every = fail_every
+    server.requests = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds before each answer")
+    parser.add_argument("--fail-every", type=int, default=0, metavar="N",
+                        help="Answer every Nth request with HTTP 429")
+    args = parser.parse_args()
+    server, url = start(args.host, args.port, args.delay, args.fail_every)
+    print(f"Mock LLM listening on {url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""Typed, lazily decoded access to conversations.
+
+A Conversation keeps the JSON of a conversation file and decodes it only as
+far as it is used. The header fields (id, subject, state, body) are
+validated up front by a pydantic-core schema, which skips over the rest of
+the document without building Python objects for it. The heavy fields
+(files, prompt, last_prompt, response) are decoded on first access, each by
+a schema that picks out that field alone, and listing file names uses a
+schema that leaves the file contents undecoded too. Anything else in the
+file is decoded the first time it is asked for, and always before saving,
+so unknown keys survive a round trip.
+
+It also gives one place for the quirks of the format: files stored as a
+dict or as a list of {"name": ...} entries, at the top level or under
+response, and LLM responses that put non-file keys among the files.
+"""
+
+from pydantic_core import SchemaValidator, core_schema as cs
+from ideacli import codec, store
+
+HEADER_FIELDS = ("id", "subject", "state", "body")
+HEAVY_FIELDS = ("files", "prompt", "last_prompt", "response")
+# What the LLM said, besides files, in a response
+RESPONSE_KEYS = ("analysis", "conclusion", "answer")
+# Keys that are not files when they appear in a files dict
+NOT_FILES = frozenset({"state", "prompt", "last_prompt", "response", "files_needed"})
+
+_MISSING = object()
+
+
+def _optional_fields(fields):
+    return cs.typed_dict_schema(
+        {name: cs.typed_dict_field(schema, required=False) for name, schema in fields.items()})
+
+
+def _validator(fields):
+    return SchemaValidator(_optional_fields(fields))
+
+
+def _files_schema(entry):
+    """Schema for a files value in either form, falling back to anything for odd values."""
+    return cs.union_schema([
+        cs.dict_schema(cs.str_schema(), entry),
+        cs.list_schema(entry),
+        cs.any_schema(),
+    ], mode="left_to_right")
+
+
+def _as_text(value):
+    """Return a non-string header value as the JSON that stood for it."""
+    return codec.dumps(value)
+
+
+# Header fields are strings or absent. Numbers are converted as before, and
+# anything else that older files hold (true, lists, objects) becomes its JSON
+# text, as the dict based code accepted them too
+_HEADER = _validator({name: cs.nullable_schema(cs.union_schema([
+    cs.str_schema(coerce_numbers_to_str=True),
+    cs.no_info_plain_validator_function(_as_text),
+], mode="left_to_right")) for name in HEADER_FIELDS})
+_HEAVY = {name: _validator({name: cs.any_schema()}) for name in HEAVY_FIELDS}
+# Files with every key but the body: content is skipped, not decoded
+_FILE_REFERENCE = cs.union_schema([
+    _optional_fields({"name": cs.any_schema(), "path": cs.any_schema()}),
+    cs.any_schema(),
+], mode="left_to_right")
+_FILE_NAMES = _validator({
+    "files": _files_schema(_FILE_REFERENCE),
+    "response": cs.union_schema([
+        _optional_fields({"files": _files_schema(_FILE_REFERENCE)}),
+        cs.any_schema(),
+    ], mode="left_to_right"),
+})
+
+
+def iter_files(files_data):
+    """Yield (name, entry) for a files value in dict or list form, skipping non-files."""
+    if isinstance(files_data, dict):
+        for name, entry in files_data.items():
+            if name not in NOT_FILES:
+                yield name, entry
+    elif isinstance(files_data, list):
+        for entry in files_data:
+            if isinstance(entry, dict) and entry.get("name"):
+                yield entry["name"], entry
+
+
+def file_path(name, entry):
+    """Return the path of a file entry relative to the project, name included."""
+    directory = (entry.get("path") or "").strip() if isinstance(entry, dict) else ""
+    if directory in ("", "."):
+        return name
+    return f"{directory.rstrip('/')}/{name}"
+
+
+def _field(key):
+    """Return a property for a heavy field, decoded on first access (None if absent)."""
+    def setter(self, value):
+        self[key] = value
+    return property(lambda self: self.get(key), setter)
+
+
+class Conversation:
+    """A conversation, decoded on demand.
+
+    Header fields are attributes; heavy fields are properties; every key,
+    including unknown ones, can be used as with a dict (get, [], in).
+    """
+
+    __slots__ = ("id", "subject", "state", "body", "_raw", "_values", "_keys")
+
+    def __init__(self, header, raw=None, values=None, keys=None):
+        for name in HEADER_FIELDS:
+            setattr(self, name, header.get(name))
+        self._raw = raw
+        self._values = values if values is not None else {}
+        # Key order of the whole conversation, once known, kept when saving
+        self._keys = keys
+
+    @classmethod
+    def from_json(cls, data):
+        """Return the conversation encoded in data (bytes), validating its header.
+
+        Raises ValueError if data is not a conversation.
+        """
+        return cls(_HEADER.validate_json(data), raw=data)
+
+    @classmethod
+    def from_dict(cls, idea):
+        """Return a conversation holding the keys of idea (a dict, not copied)."""
+        header = _HEADER.validate_python(
+            {name: idea[name] for name in HEADER_FIELDS if name in idea})
+        return cls(header, values={k: v for k, v in idea.items() if k not in HEADER_FIELDS},
+                   keys=list(idea))
+
+    @classmethod
+    def load(cls, idea_file):
+        """Return the conversation stored in idea_file, in any compression."""
+        return cls.from_json(store.read_bytes(idea_file))
+
+    def _decode(self, key):
+        """Make sure _values holds key (or _MISSING) as stored in the file."""
+        if key in self._values or self._keys is not None:
+            return
+        if key in _HEAVY:
+            try:
+                self._values[key] = _HEAVY[key].validate_json(self._raw).get(key, _MISSING)
+                return
+            except ValueError:
+                pass  # Let the codec decide, and word the error
+        self._decode_all()
+
+    def _decode_all(self):
+        if self._keys is not None:
+            return
+        idea = codec.loads(self._raw)
+        if not isinstance(idea, dict):
+            raise codec.DecodeError("conversation is not a JSON object", "", 0)
+        for key, value in idea.items():
+            if key not in HEADER_FIELDS:
+                self._values.setdefault(key, value)  # Keep values already decoded or set
+        self._keys = list(idea)
+
+    def get(self, key, default=None):
+        if key in HEADER_FIELDS:
+            value = getattr(self, key)
+            return default if value is None else value
+        self._decode(key)
+        value = self._values.get(key, _MISSING)
+        return default if value is _MISSING else value
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __setitem__(self, key, value):
+        if key in HEADER_FIELDS:
+            setattr(self, key, value)
+        else:
+            self._values[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self[key] = None if key in HEADER_FIELDS else _MISSING
+
+    def setdefault(self, key, default):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    files = _field("files")
+    prompt = _field("prompt")
+    last_prompt = _field("last_prompt")
+
+    @property
+    def response(self):
+        """The response dict ({} if there is none)."""
+        response = self.get("response")
+        return response if isinstance(response, dict) else {}
+
+    @response.setter
+    def response(self, value):
+        self["response"] = value
+
+    def response_texts(self):
+        """Yield the analysis, conclusion and answer of the response, those present."""
+        response = self.response
+        for key in RESPONSE_KEYS:
+            if key in response:
+                yield response[key]
+
+    def file_entries(self):
+        """Yield (name, entry) for every file, those of the response first."""
+        yield from iter_files(self.response.get("files"))
+        yield from iter_files(self.get("files"))
+
+    def _file_references(self):
+        """Return file_entries(), with entries lacking their content if it wasn't decoded yet."""
+        if self._raw is None or "files" in self._values or "response" in self._values:
+            return list(self.file_entries())
+        try:
+            refs = _FILE_NAMES.validate_json(self._raw)
+        except ValueError:
+            return list(self.file_entries())
+        response = refs.get("response")
+        entries = list(iter_files(response.get("files"))) if isinstance(response, dict) else []
+        entries.extend(iter_files(refs.get("files")))
+        return entries
+
+    def file_names(self):
+        """Return the sorted names of every file, without decoding file contents."""
+        return sorted({name for name, _ in self._file_references()})
+
+    def file_paths(self):
+        """Return the sorted project paths of every file, without decoding file contents."""
+        return sorted({file_path(name, entry) for name, entry in self._file_references()})
+
+    def to_dict(self):
+        """Return the whole conversation as a plain dict (sharing its values)."""
+        self._decode_all()
+        idea = {}
+        for key in self._keys + [k for k in HEADER_FIELDS + tuple(self._values)
+                                 if k not in self._keys]:
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                idea[key] = value
+        return idea
+
+    def save(self, idea_file):
+        """Write the conversation to idea_file; returns False if it was unchanged."""
+        return store.save_conversation(idea_file, self.to_dict())
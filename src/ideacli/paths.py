@@ -0,0 +1,115 @@
+"""Locations of conversation files in an ideas repository.
+
+Two layouts are supported, chosen with the ``layout`` setting (see
+ideacli.config) and switched with ``ideacli migrate``:
+
+* ``flat`` (default): ``conversations/<id>.json``
+* ``sharded``: ``conversations/<first two characters of id>/<id>.json``,
+  which keeps directories small (like git's objects directory) when there
+  are hundreds of thousands of ideas.
+
+Every module finds conversation files through this one, and scanning
+accepts files in either layout, so a repository whose migration was
+interrupted is still read completely.
+"""
+
+import os
+from ideacli import config
+
+CONVERSATIONS = "conversations"
+LAYOUTS = ("flat", "sharded")
+SHARD_LENGTH = 2
+
+# repo_path -> (config file mtime_ns, layout), so that bulk operations don't
+# re-read the config for every path
+_layouts = {}
+
+
+def conversation_dir(repo_path):
+    """Return the directory holding the conversations of the repo."""
+    return os.path.join(repo_path, CONVERSATIONS)
+
+
+def layout(repo_path):
+    """Return the configured layout of the repo."""
+    try:
+        stamp = os.stat(os.path.join(repo_path, config.CONFIG_FILE)).st_mtime_ns
+    except OSError:
+        stamp = None
+    env = os.environ.get("IDEACLI_LAYOUT")
+    cached = _layouts.get(repo_path)
+    if cached and cached[0] == (stamp, env):
+        return cached[1]
+    value = config.get(repo_path, "layout")
+    if value not in LAYOUTS:
+        value = LAYOUTS[0]
+    _layouts[repo_path] = ((stamp, env), value)
+    return value
+
+
+def shard(idea_id):
+    """Return the shard directory name of an ID."""
+    return idea_id[:SHARD_LENGTH]
+
+
+def relative_path(idea_id, layout_name):
+    """Return the path of a conversation relative to the repo for a layout."""
+    if layout_name == "sharded":
+        return os.path.join(CONVERSATIONS, shard(idea_id), f"{idea_id}.json")
+    return os.path.join(CONVERSATIONS, f"{idea_id}.json")
+
+
+def idea_path(repo_path, idea_id):
+    """Return the path of the conversation file of an ID."""
+    return os.path.join(repo_path, relative_path(idea_id, layout(repo_path)))
+
+
+def repo_of(idea_file):
+    """Return the repo a conversation file belongs to, in either layout."""
+    directory = os.path.dirname(os.path.abspath(idea_file))
+    if os.path.basename(directory) != CONVERSATIONS:
+        directory = os.path.dirname(directory)  # A shard
+    return os.path.dirname(directory)
+
+
+def ensure_parent(idea_file):
+    """Create the directory of a conversation file about to be written."""
+    os.makedirs(os.path.dirname(idea_file), exist_ok=True)
+
+
+def _scan_dir(path, found, depth):
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.name.endswith(".json") and entry.is_file():
+                st = entry.stat()
+                found[entry.name[:-5]] = (entry.path, st.st_mtime_ns, st.st_size)
+            elif depth and entry.is_dir() and not entry.name.startswith("."):
+                _scan_dir(entry.path, found, depth - 1)
+
+
+def scan(repo_path):
+    """Return {id: (path, mtime_ns, size)} for every conversation file, in either layout."""
+    found = {}
+    if os.path.isdir(conversation_dir(repo_path)):
+        _scan_dir(conversation_dir(repo_path), found, 1)
+    return found
+
+
+def dir_stamp(repo_path):
+    """Return the latest mtime_ns of the conversation directories, or None if there are none.
+
+    Any conversation written, added or removed changes it (see
+    index.scan_needed).
+    """
+    top = conversation_dir(repo_path)
+    try:
+        latest = os.stat(top).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if layout(repo_path) == "flat":
+        return latest
+    with os.scandir(top) as entries:
+        for entry in entries:
+            if entry.is_dir() and not entry.name.startswith("."):
+                latest = max(latest, entry.stat().st_mtime_ns)
+    return latest
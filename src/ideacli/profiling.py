@@ -0,0 +1,192 @@
+"""Timing spans and profiling for a single command.
+
+Only imported when one of the global flags (--timings, --timings-json,
+--profile, --trace-memory) is given, so running without them costs nothing.
+
+Spans are recorded by wrapping the functions each phase of a command goes
+through: JSON encoding and decoding, conversation file reads and writes,
+git (subprocess or dulwich), the clipboard helpers and the cache refreshes.
+Spans nest (a file read happens inside loading all conversations) and may
+run in parallel threads, so they add up to more than the wall time.
+"""
+
+import functools
+import importlib
+import sys
+import threading
+import time
+from ideacli import codec
+
+# (module, attribute, span label); attribute may be Class.method
+SPANS = (
+    ("ideacli.codec", "loads", "json.decode"),
+    ("ideacli.codec", "dumps", "json.encode"),
+    ("ideacli.store", "read_bytes", "fs.read"),
+    ("ideacli.store", "read_header", "fs.read_header"),
+    ("ideacli.store", "write_atomic", "fs.write"),
+    ("ideacli.loader", "load_all", "load_all"),
+    ("ideacli.index", "refresh", "index.refresh"),
+    ("ideacli.search", "refresh", "search.refresh"),
+    ("ideacli.related", "refresh", "related.refresh"),
+    ("ideacli.gitbackend", "SubprocessBackend.init", "git.init"),
+    ("ideacli.gitbackend", "SubprocessBackend.commit", "git.commit"),
+    ("ideacli.gitbackend", "SubprocessBackend.status", "git.status"),
+    ("ideacli.gitbackend", "SubprocessBackend.summary", "git.status"),
+    ("ideacli.gitbackend", "DulwichBackend.init", "git.init"),
+    ("ideacli.gitbackend", "DulwichBackend.commit", "git.commit"),
+    ("ideacli.gitbackend", "DulwichBackend.status", "git.status"),
+    ("ideacli.gitbackend", "DulwichBackend.summary", "git.status"),
+    ("ideacli.clipboard", "copy_to_clipboard", "clipboard.copy"),
+    ("ideacli.clipboard", "paste_from_clipboard", "clipboard.paste"),
+    ("pyperclip", "copy", "clipboard.copy"),
+    ("pyperclip", "paste", "clipboard.paste"),
+)
+
+# Allocation sites shown by --trace-memory, and functions by --profile
+TOP = 15
+
+
+class Recorder:
+    """Totals of the spans recorded, by label."""
+
+    def __init__(self):
+        self.spans = {}
+        self._lock = threading.Lock()
+
+    def add(self, label, elapsed):
+        with self._lock:
+            calls, total, longest = self.spans.get(label, (0, 0.0, 0.0))
+            self.spans[label] = (calls + 1, total + elapsed, max(longest, elapsed))
+
+    def wrap(self, label, func):
+        """Return func, recording a span each time it is called."""
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add(label, time.perf_counter() - start)
+        timed.__wrapped_span__ = label
+        return timed
+
+    def to_dict(self, command, wall):
+        return {
+            "command": command,
+            "wall_ms": wall * 1000,
+            "spans": {label: {"calls": calls, "total_ms": total * 1000, "max_ms": longest * 1000}
+                      for label, (calls, total, longest) in self.spans.items()},
+        }
+
+
+def _resolve(module_name, attribute):
+    """Return (owner, name) for module_name:attribute, or None if it can't be imported."""
+    try:
+        owner = importlib.import_module(module_name)
+    except ImportError:
+        return None
+    *classes, name = attribute.split(".")
+    for class_name in classes:
+        owner = getattr(owner, class_name)
+    return owner, name
+
+
+def instrument(recorder, spans=SPANS):
+    """Wrap the functions listed in spans; returns a function undoing it."""
+    originals = []
+    for module_name, attribute, label in spans:
+        target = _resolve(module_name, attribute)
+        if target is None or not hasattr(*target):
+            continue
+        owner, name = target
+        func = getattr(owner, name)
+        if getattr(func, "__wrapped_span__", None):
+            continue
+        originals.append((owner, name, owner.__dict__[name]))
+        setattr(owner, name, recorder.wrap(label, func))
+
+    def restore():
+        for owner, name, func in reversed(originals):
+            setattr(owner, name, func)
+    return restore
+
+
+def format_report(report):
+    """Return the spans of a report as a table, longest total first."""
+    wall = report["wall_ms"]
+    lines = [f"Timings for '{report['command']}' (wall {wall:.1f} ms):",
+             f"  {'span':<18} {'calls':>7} {'total ms':>10} {'max ms':>9} {'% wall':>7}"]
+    spans = sorted(report["spans"].items(), key=lambda item: -item[1]["total_ms"])
+    for label, span in spans:
+        share = span["total_ms"] / wall * 100 if wall else 0.0
+        lines.append(f"  {label:<18} {span['calls']:>7} {span['total_ms']:>10.2f} "
+                     f"{span['max_ms']:>9.2f} {share:>6.1f}%")
+    if not spans:
+        lines.append("  (no spans recorded)")
+    return "\n".join(lines)
+
+
+def _report_profile(profiler, profile_file):
+    import pstats
+    profiler.dump_stats(profile_file)
+    stats = pstats.Stats(profiler, stream=sys.stderr)
+    print(f"Profile written to {profile_file} (main thread only); top {TOP} by cumulative time:",
+          file=sys.stderr)
+    stats.sort_stats("cumulative").print_stats(TOP)
+
+
+def _report_memory(tracemalloc):
+    current, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    print(f"Memory: peak {peak / 1024:.1f} KiB, still allocated {current / 1024:.1f} KiB; "
+          f"top {TOP} allocation sites:", file=sys.stderr)
+    for stat in snapshot.statistics("lineno")[:TOP]:
+        print(f"  {stat}", file=sys.stderr)
+
+
+def run(command, load, args, timings=False, timings_json=None, profile=None,
+        trace_memory=False):
+    """Run command, whose function load(command) returns, with the requested diagnostics.
+
+    The command is imported once the functions are wrapped, so that names
+    it imports with 'from ... import' are the wrapped ones too; its import
+    is the 'import' span.
+
+    timings prints the span breakdown to stderr and timings_json writes it
+    to a file; profile dumps cProfile stats to a file; trace_memory reports
+    the peak and the biggest allocation sites. Reports are made even when
+    the command exits with sys.exit.
+    """
+    recorder = Recorder()
+    restore = instrument(recorder) if timings or timings_json else None
+    profiler = None
+    if profile:
+        import cProfile
+        profiler = cProfile.Profile()
+    if trace_memory:
+        import tracemalloc
+        tracemalloc.start()
+
+    start = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    try:
+        func = recorder.wrap("import", load)(command) if restore else load(command)
+        func(args)
+    finally:
+        if profiler:
+            profiler.disable()
+        wall = time.perf_counter() - start
+        if restore:
+            restore()
+            report = recorder.to_dict(command, wall)
+            if timings:
+                print(format_report(report), file=sys.stderr)
+            if timings_json:
+                with open(timings_json, "w", encoding="utf-8") as f:
+                    f.write(codec.dumps(report, indent=True) + "\n")
+        if trace_memory:
+            _report_memory(tracemalloc)
+        if profiler:
+            _report_profile(profiler, profile)
@@ -0,0 +1,239 @@
+"""Prompt assembly within a character and token budget.
+
+The analysis prompt quotes the files the LLM asked for. PromptBuilder adds
+them one at a time against a budget (the prompt_max_tokens and
+prompt_max_chars settings, 0 for no limit): files that fit are quoted
+whole, the first one that doesn't is cut at a line boundary, and files
+after that are replaced by a one line note, so the prompt stays within the
+model's context whatever the size of the files. Files on disk are measured by
+streaming them in chunks and only the part that is quoted is read into
+memory.
+
+Token counts are estimates (words split into pieces of up to four
+characters, plus punctuation), close enough to the tokenizers of current
+models to budget with and far cheaper than running one. Estimates are
+cached in .ideas_repo/.cache/tokens.sqlite by SHA-256 of the content, so
+files quoted again are not rescanned.
+"""
+
+import codecs
+import hashlib
+import os
+import re
+import sqlite3
+
+# Average characters per token, used to turn a token budget into a read size
+CHARS_PER_TOKEN = 4
+CHUNK_SIZE = 1 << 20
+# Below this many tokens left a file is noted rather than cut to a stub
+MIN_SECTION_TOKENS = 64
+# Room kept for the note at the end of a truncated file
+NOTE_TOKENS = 40
+NOTE_CHARS = 120
+TOKEN_CACHE_FILE = "tokens.sqlite"
+
+_TOKEN_RE = re.compile(r"\w{1,4}|[^\w\s]")
+_UNLIMITED = float("inf")
+
+
+def estimate_tokens(text):
+    """Return the approximate number of tokens text encodes to."""
+    return len(_TOKEN_RE.findall(text))
+
+
+class TokenCache:
+    """Token estimates by content hash, kept in the repo's cache directory."""
+
+    def __init__(self, repo_path):
+        self.repo_path = repo_path
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            from ideacli import index
+
+            self._conn = sqlite3.connect(
+                os.path.join(index.cache_dir(self.repo_path), TOKEN_CACHE_FILE), timeout=30)
+            self._conn.execute("CREATE TABLE IF NOT EXISTS tokens "
+                               "(digest TEXT PRIMARY KEY, chars INTEGER, tokens INTEGER)")
+        return self._conn
+
+    def get(self, digest):
+        """Return (chars, tokens) for the content with this digest, or None."""
+        try:
+            return self._connect().execute(
+                "SELECT chars, tokens FROM tokens WHERE digest = ?", (digest,)).fetchone()
+        except sqlite3.Error:
+            return None
+
+    def put(self, digest, chars, tokens):
+        try:
+            self._connect().execute("INSERT OR REPLACE INTO tokens VALUES (?, ?, ?)",
+                                    (digest, chars, tokens))
+        except sqlite3.Error:
+            pass
+
+    def close(self):
+        if self._conn is not None:
+            try:
+                self._conn.commit()
+            except sqlite3.Error:
+                pass
+            self._conn.close()
+            self._conn = None
+
+
+def _chunks(path):
+    """Yield the text of a UTF-8 file in chunks of about CHUNK_SIZE."""
+    decoder = codecs.getincrementaldecoder("utf-8")("replace")
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(CHUNK_SIZE)
+            if not data:
+                break
+            yield decoder.decode(data)
+    yield decoder.decode(b"", final=True)
+
+
+def _read_head(path, chars):
+    """Return up to chars characters from the start of a UTF-8 file."""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return f.read(chars)
+
+
+class PromptBuilder:
+    """Build a prompt from text sections and quoted files within a budget.
+
+    Fixed text is always included. reserve() sets text aside that add()
+    will append later, typically the closing instructions, so files can't
+    use its share of the budget. stats holds a dict per file: name,
+    status (included, truncated, omitted or missing), tokens and chars of
+    the whole file, and included_tokens.
+    """
+
+    def __init__(self, max_tokens=0, max_chars=0, cache=None):
+        self.max_tokens = max_tokens or _UNLIMITED
+        self.max_chars = max_chars or _UNLIMITED
+        self.cache = cache
+        self.sections = []
+        self.stats = []
+        self.tokens = 0
+        self.chars = 0
+        self._reserved = []
+        self._spent = False
+
+    def _count(self, text):
+        self.tokens += estimate_tokens(text)
+        self.chars += len(text)
+
+    def reserve(self, text):
+        """Count text against the budget now; add(text, reserved=True) appends it later."""
+        self._count(text)
+        self._reserved.append(text)
+
+    def add(self, text, reserved=False):
+        """Append fixed text."""
+        if reserved:
+            self._reserved.remove(text)
+        else:
+            self._count(text)
+        self.sections.append(text)
+
+    def remaining(self):
+        """Return the (tokens, chars) still available."""
+        return self.max_tokens - self.tokens, self.max_chars - self.chars
+
+    def _measure(self, path, content):
+        """Return (chars, tokens) of a file, streaming it from path if content is None."""
+        digest = hashlib.sha256()
+        if content is None:
+            with open(path, "rb") as f:
+                for data in iter(lambda: f.read(CHUNK_SIZE), b""):
+                    digest.update(data)
+        else:
+            digest.update(content.encode("utf-8", "surrogatepass"))
+        key = digest.hexdigest()
+        cached = self.cache.get(key) if self.cache else None
+        if cached:
+            return tuple(cached)
+        if content is None:
+            chars = tokens = 0
+            for text in _chunks(path):
+                chars += len(text)
+                tokens += estimate_tokens(text)
+        else:
+            chars, tokens = len(content), estimate_tokens(content)
+        if self.cache:
+            self.cache.put(key, chars, tokens)
+        return chars, tokens
+
+    def _head(self, path, content, tokens_left, chars_left):
+        """Return the longest run of whole lines from the start that fits."""
+        limit = int(min(chars_left, tokens_left * CHARS_PER_TOKEN))
+        head = content[:limit] if content is not None else _read_head(path, limit)
+        tokens = estimate_tokens(head)
+        while head and tokens > tokens_left:
+            head = head[:int(len(head) * tokens_left / tokens * 0.98)]
+            tokens = estimate_tokens(head)
+        cut = head.rfind("\n")
+        return head[:cut + 1] if cut > 0 else head
+
+    def add_file(self, name, path=None, content=None, separator="\n"):
+        """Quote a file, read from path or given as content, as much as the budget allows.
+
+        separator is put before the file's section (none for the first).
+        Returns the stats entry of the file.
+        """
+        title = f"{separator if self.stats else ''}--- {name} ---\n"
+        if content is None and (path is None or not os.path.isfile(path)):
+            text = title + "[File not found]"
+            self.add(text)
+            stat = {"name": name, "status": "missing", "tokens": 0, "chars": 0,
+                    "included_tokens": 0}
+            self.stats.append(stat)
+            return stat
+
+        chars, tokens = self._measure(path, content)
+        stat = {"name": name, "tokens": tokens, "chars": chars}
+        tokens_left, chars_left = self.remaining()
+        tokens_left -= estimate_tokens(title)
+        chars_left -= len(title)
+        if not self._spent and tokens <= tokens_left and chars <= chars_left:
+            body = content if content is not None else "".join(_chunks(path))
+            stat.update(status="included", included_tokens=tokens)
+        elif (not self._spent and tokens_left - NOTE_TOKENS >= MIN_SECTION_TOKENS
+              and chars_left - NOTE_CHARS >= MIN_SECTION_TOKENS):
+            # Whatever follows would only fit in the scraps left, so it is omitted
+            self._spent = True
+            head = self._head(path, content, tokens_left - NOTE_TOKENS, chars_left - NOTE_CHARS)
+            included = estimate_tokens(head)
+            body = (f"{head}[... truncated: {included} of {tokens} tokens shown, "
+                    f"{chars - len(head)} characters left out]")
+            stat.update(status="truncated", included_tokens=included)
+        else:
+            self._spent = True
+            body = f"[Omitted: {tokens} tokens, {chars} characters; prompt budget exhausted]"
+            stat.update(status="omitted", included_tokens=0)
+        self.add(title + body)
+        self.stats.append(stat)
+        return stat
+
+    def text(self):
+        """Return the prompt: every section, in order."""
+        return "".join(self.sections)
+
+
+def format_stats(stats):
+    """Return a line per file saying how much of it the prompt holds."""
+    lines = []
+    for stat in stats:
+        if stat["status"] == "truncated":
+            detail = f"truncated to {stat['included_tokens']} of {stat['tokens']} tokens"
+        elif stat["status"] == "included":
+            detail = f"{stat['tokens']} tokens"
+        elif stat["status"] == "omitted":
+            detail = f"omitted, budget spent ({stat['tokens']} tokens)"
+        else:
+            detail = "not found"
+        lines.append(f"  {stat['name']}: {detail}")
+    return "\n".join(lines)
@@ -0,0 +1,171 @@
+"""LLM providers: send prompts to a model instead of going through the clipboard.
+
+A provider has one coroutine, complete(prompt), returning the model's
+reply as text, and close(). The one provider so far, "openai", talks to
+any OpenAI-compatible chat completions endpoint (OpenAI itself, or local
+servers such as llama.cpp, vLLM or Ollama, and ideacli.mockserver for
+tests). It is configured with the llm_* settings (see ideacli.config);
+the API key is read from the environment variable named by
+llm_api_key_env.
+
+Requests are made with urllib in a thread pool the size of the
+concurrency setting, so many can be in flight under asyncio without any
+HTTP library installed. They are spaced out to llm_requests_per_minute,
+and retried with exponential backoff (or as the server's Retry-After
+says) on timeouts, connection errors, 429 and 5xx responses.
+"""
+
+import asyncio
+import os
+import random
+import re
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from ideacli import codec, config
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits, server errors
+RETRY_STATUSES = frozenset({408, 409, 425, 429, 500, 502, 503, 504})
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+
+_FENCED = re.compile(r"```(?:json)?\s*\n(.*?)\n```", re.S)
+
+
+class ProviderError(Exception):
+    """A request to the model failed; retryable says whether trying again may help."""
+
+    def __init__(self, message, retryable=False, retry_after=None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Spaces requests out to at most per_minute a minute (0: no limit)."""
+
+    def __init__(self, per_minute=0):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self._next = 0.0
+
+    async def wait(self):
+        if not self.interval:
+            return
+        now = asyncio.get_event_loop().time()
+        delay = self._next - now
+        self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def _retry_after(headers):
+    try:
+        return max(0.0, float(headers.get("Retry-After")))
+    except (TypeError, ValueError):
+        return None
+
+
+class OpenAIProvider:
+    """An OpenAI-compatible chat completions endpoint."""
+
+    name = "openai"
+
+    def __init__(self, base_url, model, api_key=None, timeout=120, retries=5,
+                 requests_per_minute=0, concurrency=8):
+        self.url = base_url.rstrip("/") + "/chat/completions"
+        self.model = model
+        self.api_key = api_key
+        self.timeout = timeout
+        self.retries = retries
+        self.limiter = RateLimiter(requests_per_minute)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, concurrency))
+
+    def _post(self, body):
+        """Send one request; returns the decoded reply or raises ProviderError."""
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        request = urllib.request.Request(self.url, data=body, headers=headers, method="POST")
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return codec.loads(response.read())
+        except urllib.error.HTTPError as e:
+            detail = e.read()[:500].decode("utf-8", "replace")
+            raise ProviderError(f"HTTP {e.code} from {self.url}: {detail}",
+                                retryable=e.code in RETRY_STATUSES,
+                                retry_after=_retry_after(e.headers)) from None
+        except (urllib.error.URLError, OSError) as e:
+            raise ProviderError(f"Could not reach {self.url}: {e}", retryable=True) from None
+        except ValueError as e:
+            raise ProviderError(f"Invalid reply from {self.url}: {e}", retryable=True) from None
+
+    async def complete(self, prompt):
+        """Return the model's reply to prompt, retrying transient failures."""
+        body = codec.dumps({
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+        }).encode("utf-8")
+        loop = asyncio.get_event_loop()
+        for attempt in range(self.retries + 1):
+            await self.limiter.wait()
+            try:
+                reply = await loop.run_in_executor(self._executor, self._post, body)
+                return reply["choices"][0]["message"]["content"]
+            except (KeyError, IndexError, TypeError):
+                error = ProviderError(f"Unexpected reply from {self.url}", retryable=True)
+            except ProviderError as e:
+                error = e
+            if not error.retryable or attempt == self.retries:
+                raise error
+            delay = error.retry_after
+            if delay is None:
+                delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.0)
+            await asyncio.sleep(delay)
+        raise AssertionError("unreachable")
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+PROVIDERS = {
+    OpenAIProvider.name: OpenAIProvider,
+}
+
+
+def from_config(repo_path, **overrides):
+    """Return the configured provider; overrides replace llm_* settings (None: keep)."""
+    settings = config.load_config(repo_path)
+    settings.update({f"llm_{key}": value for key, value in overrides.items()
+                     if value is not None})
+    name = settings["llm_provider"]
+    if name not in PROVIDERS:
+        raise ValueError(f"unknown llm_provider '{name}' (choose from {', '.join(PROVIDERS)})")
+    return PROVIDERS[name](
+        settings["llm_base_url"], settings["llm_model"],
+        api_key=os.environ.get(settings["llm_api_key_env"]),
+        timeout=settings["llm_timeout"], retries=settings["llm_retries"],
+        requests_per_minute=settings["llm_requests_per_minute"],
+        concurrency=settings["llm_concurrency"])
+
+
+def parse_reply(text):
+    """Return the JSON value in a model's reply, which may be fenced or wrapped in prose.
+
+    Raises ValueError if there is none.
+    """
+    try:
+        return codec.loads(text)
+    except ValueError:
+        pass
+    for candidate in _FENCED.findall(text):
+        try:
+            return codec.loads(candidate)
+        except ValueError:
+            pass
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if starts:
+        start = min(starts)
+        end = text.rfind("}" if text[start] == "{" else "]")
+        if end > start:
+            return codec.loads(text[start:end + 1])
+    raise ValueError("no JSON in the reply")
@@ -0,0 +1,237 @@
+"""Find the existing ideas most similar to a given one.
+
+Every conversation is reduced to a hashed bag of words over its subject
+(counted twice), body, file names and response text: words are hashed into
+FEATURES buckets, weighted 1 + log(count), cut down to the MAX_TERMS
+heaviest and L2 normalised. All vectors are kept as one sparse CSR matrix
+(int32 columns, float16 values) in ``.ideas_repo/.cache/related.npz``, so
+memory is bounded at about 6 bytes per stored term whatever the vocabulary.
+
+A query weights the idea's own vector by inverse document frequency and
+scores every idea with one sparse matrix-vector product. Like the other
+caches the matrix is refreshed incrementally: only conversations whose
+mtime or size changed are re-read, the other rows are copied over as they
+are.
+
+Needs numpy (``pip install ideacli[related]``).
+"""
+
+import heapq
+import importlib.util
+import math
+import os
+import re
+import sys
+import time
+import zlib
+from collections import Counter
+from ideacli import index, loader, paths
+from ideacli.model import Conversation
+from ideacli.repository import resolve_idea_id, resolve_idea_path
+
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+RELATED_FILE = "related.npz"
+FEATURES = 1 << 20
+MAX_TERMS = 64
+
+_WORD = re.compile(r"[a-z0-9_]{2,}")
+# (path, mtime_ns, matrix) of the last matrix loaded, reused by 'ideacli serve'
+_loaded = None
+
+
+def _words(conversation):
+    """Yield the words a conversation is compared on."""
+    subject = conversation.subject or ""
+    texts = [subject, subject, conversation.body or ""]
+    texts.extend(conversation.file_names())
+    texts.extend(str(text) for text in conversation.response_texts())
+    for text in texts:
+        yield from _WORD.findall(text.lower())
+
+
+def features(idea):
+    """Return the sorted (feature, weight) pairs of an idea's normalised vector.
+
+    idea is a Conversation or a dict.
+    """
+    if not isinstance(idea, Conversation):
+        idea = Conversation.from_dict(idea)
+    counts = Counter(zlib.crc32(word.encode("utf-8")) % FEATURES for word in _words(idea))
+    weights = heapq.nlargest(MAX_TERMS, ((f, 1 + math.log(c)) for f, c in counts.items()),
+                             key=lambda item: item[1])
+    norm = math.sqrt(sum(w * w for _, w in weights)) or 1.0
+    return sorted((f, w / norm) for f, w in weights)
+
+
+def _read_features(idea_file):
+    return features(Conversation.load(idea_file))
+
+
+def _empty(np):
+    return {
+        "names": np.array([], dtype="U1"),
+        "stamps": np.zeros((0, 2), dtype=np.int64),
+        "indptr": np.zeros(1, dtype=np.int64),
+        "indices": np.zeros(0, dtype=np.int32),
+        "data": np.zeros(0, dtype=np.float16),
+        "scan": np.zeros(0, dtype=np.int64),
+    }
+
+
+def _load(np, path):
+    """Load the matrix stored at path, or an empty one."""
+    global _loaded
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return _empty(np)
+    if _loaded and _loaded[:2] == (path, mtime_ns):
+        return _loaded[2]
+    try:
+        with np.load(path) as npz:
+            matrix = {key: npz[key] for key in npz.files}
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Warning: rebuilding related ideas matrix: {e}", file=sys.stderr)
+        return _empty(np)
+    _loaded = (path, mtime_ns, matrix)
+    return matrix
+
+
+def _save(np, path, matrix):
+    """Write the matrix to path atomically."""
+    global _loaded
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **matrix)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    _loaded = (path, os.stat(path).st_mtime_ns, matrix)
+
+
+def refresh(np, repo_path, workers=None, rescan=False):
+    """Return the similarity matrix, brought up to date with the conversations directory."""
+    path = os.path.join(index.cache_dir(repo_path), RELATED_FILE)
+    matrix = _load(np, path)
+    scanned_ns = time.time_ns()
+    dir_mtime_ns = paths.dir_stamp(repo_path)
+    last_scan = tuple(matrix["scan"].tolist()) or None
+    if not rescan and not index.scan_needed(dir_mtime_ns, last_scan):
+        return matrix
+
+    on_disk = paths.scan(repo_path) if dir_mtime_ns is not None else {}
+    names = matrix["names"].tolist()
+    stamps = [tuple(stamp) for stamp in matrix["stamps"].tolist()]
+    keep = np.array([name in on_disk and on_disk[name][1:] == stamp
+                     for name, stamp in zip(names, stamps)], dtype=bool)
+    kept_names = [name for name, k in zip(names, keep) if k]
+    kept = set(kept_names)
+    stale = sorted(name for name in on_disk if name not in kept)
+
+    stale_files = [on_disk[name][0] for name in stale]
+    results = loader.load_all(repo_path, stale_files, reader=_read_features, workers=workers)
+    new_names, new_stamps, new_lengths, new_indices, new_data = [], [], [], [], []
+    complete = dir_mtime_ns is not None
+    for name, idea_file, result in zip(stale, stale_files, results):
+        if isinstance(result, Exception):
+            print(f"Warning: could not read {idea_file}: {result}", file=sys.stderr)
+            complete = False  # Retry on the next refresh
+            continue
+        new_names.append(name)
+        new_stamps.append(on_disk[name][1:])
+        new_lengths.append(len(result))
+        new_indices.extend(f for f, _ in result)
+        new_data.extend(w for _, w in result)
+
+    # Row changes, or a scan worth remembering, are written back
+    scan = [dir_mtime_ns, scanned_ns] if complete else []
+    if keep.all() and not new_names and not (
+            scan and not index.scan_needed(dir_mtime_ns, tuple(scan))):
+        return matrix
+
+    lengths = np.diff(matrix["indptr"])
+    kept_entries = np.repeat(keep, lengths)
+    all_lengths = np.concatenate([lengths[keep], np.array(new_lengths, dtype=np.int64)])
+    matrix = {
+        "names": np.array(kept_names + new_names, dtype=str),
+        "stamps": np.concatenate([matrix["stamps"][keep],
+                                  np.array(new_stamps, dtype=np.int64).reshape(-1, 2)]),
+        "indptr": np.concatenate([[0], np.cumsum(all_lengths)]).astype(np.int64),
+        "indices": np.concatenate([matrix["indices"][kept_entries],
+                                   np.array(new_indices, dtype=np.int32)]),
+        "data": np.concatenate([matrix["data"][kept_entries],
+                                np.array(new_data, dtype=np.float16)]),
+        "scan": np.array(scan, dtype=np.int64),
+    }
+    _save(np, path, matrix)
+    return matrix
+
+
+def related(repo_path, idea_id, k=5, workers=None, rescan=False):
+    """Return up to k (name, score) pairs of the ideas most similar to idea_id, best first.
+
+    Raises KeyError if there is no such idea.
+    """
+    import numpy as np
+
+    matrix = refresh(np, repo_path, workers, rescan)
+    names, indptr = matrix["names"], matrix["indptr"]
+    indices, data = matrix["indices"], matrix["data"]
+    rows = np.flatnonzero(names == idea_id)
+    if not rows.size:
+        raise KeyError(idea_id)
+    row = rows[0]
+    n = len(names)
+
+    # Only entries on the idea's own terms contribute to the scores
+    query_indices = indices[indptr[row]:indptr[row + 1]]
+    on_query = np.zeros(FEATURES, dtype=bool)
+    on_query[query_indices] = True
+    hits = np.flatnonzero(on_query[indices])
+    hit_terms = np.searchsorted(query_indices, indices[hits])
+
+    # Weight the idea's terms by inverse document frequency
+    df = np.bincount(hit_terms, minlength=len(query_indices))
+    query = data[indptr[row]:indptr[row + 1]].astype(np.float32)
+    query *= np.log((1 + n) / (1 + df)) + 1
+    query /= np.linalg.norm(query) or 1.0
+
+    # Sparse matrix-vector product over the matching entries
+    hit_rows = np.searchsorted(indptr, hits, side="right") - 1
+    scores = np.bincount(hit_rows, weights=query[hit_terms] * data[hits], minlength=n)
+    scores[row] = 0
+
+    k = min(k, n)
+    top = np.argpartition(-scores, k - 1)[:k] if k else np.array([], dtype=np.int64)
+    top = top[np.argsort(-scores[top], kind="stable")]
+    return [(str(names[i]), float(scores[i])) for i in top if scores[i] > 0]
+
+
+def related_ideas(args):
+    """Print the ideas most similar to an idea, with their files."""
+    repo_path = resolve_idea_path(args)
+    args.id = resolve_idea_id(repo_path, args.id)
+    if not HAS_NUMPY:
+        print("Error: 'ideacli related' needs numpy (pip install ideacli[related])",
+              file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        results = related(repo_path, args.id, args.top, getattr(args, "workers", None),
+                          getattr(args, "rescan", False))
+    except KeyError:
+        print(f"Error: No conversation found with ID '{args.id}'", file=sys.stderr)
+        sys.exit(1)
+
+    if not results:
+        print("No related ideas found.")
+        return
+    for name, score in results:
+        idea = Conversation.load(paths.idea_path(repo_path, name))
+        print(f"[{idea.get('id', name)}] {idea.get('subject', '(No subject)')}  ({score:.2f})")
+        files = idea.file_names()
+        if files:
+            print(f"    files: {', '.join(files)}")
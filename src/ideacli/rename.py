@@ -1,15 +1,17 @@
 """Rename the subject of an idea by ID."""
 
 import os
-import json
 import sys
-from ideacli.repository import resolve_idea_path
+from ideacli import index, paths
+from ideacli.model import Conversation
+from ideacli.repository import resolve_idea_id, resolve_idea_path
+
 
 def rename_idea(args):
     """Rename the subject of a conversation by ID."""
     repo_path = resolve_idea_path(args)
-    conversation_dir = os.path.join(repo_path, "conversations")
-    idea_file = os.path.join(conversation_dir, f"{args.id}.json")
+    args.id = resolve_idea_id(repo_path, args.id)
+    idea_file = paths.idea_path(repo_path, args.id)
 
     if not os.path.isfile(idea_file):
         print(
@@ -19,19 +21,18 @@ def rename_idea(args):
         sys.exit(1)
 
     try:
-        with open(idea_file, "r", encoding="utf-8") as f:
-            idea = json.load(f)
+        idea = Conversation.load(idea_file)
 
         old_subject = idea.get("subject", "(No subject)")
-        idea["subject"] = args.target
+        idea.subject = args.target
 
-        with open(idea_file, "w", encoding="utf-8") as f:
-            json.dump(idea, f, indent=2)
+        if idea.save(idea_file):
+            index.record(repo_path, args.id, idea)
 
         print(
             f"Renamed idea '{args.id}' from:\n  {old_subject}\nto:\n  {args.target}"
         )
 
-    except (IOError, OSError, json.JSONDecodeError) as e:
+    except (IOError, OSError, ValueError) as e:
         print(f"Error renaming idea: {e}", file=sys.stderr)
         sys.exit(1)
@@ -2,9 +2,11 @@
 
 import os
 import sys
-import subprocess
 
 IDEAS_REPO = ".ideas_repo"
+# Shortest ID prefix accepted in place of a full ID
+MIN_PREFIX = 4
+
 
 def resolve_repo_root(args):
     """Resolve the root path for the ideas repo."""
@@ -12,6 +14,7 @@ def resolve_repo_root(args):
         return os.path.abspath(args.path)
     return os.getcwd()
 
+
 def resolve_idea_path(args):
     """Resolve and validate idea repository path."""
     base_path = resolve_repo_root(args)
@@ -27,10 +30,43 @@ def resolve_idea_path(args):
 
     return ideas_repo_path
 
+
+def resolve_idea_id(repo_path, idea_id):
+    """Return the full ID of the idea that idea_id is a unique prefix of, git style.
+
+    IDs that are already complete, or match nothing, are returned unchanged
+    so that callers report missing ideas as before. Exits with an error if
+    the prefix is ambiguous.
+    """
+    from ideacli import paths
+
+    if (not idea_id or len(idea_id) < MIN_PREFIX
+            or os.path.isfile(paths.idea_path(repo_path, idea_id))):
+        return idea_id
+
+    import sqlite3
+    from ideacli import index
+
+    try:
+        matches = index.match_prefix(repo_path, idea_id)
+        if not matches or not all(
+                os.path.isfile(paths.idea_path(repo_path, name)) for name in matches):
+            # The index is only brought up to date when it might be stale
+            matches = index.match_prefix(repo_path, idea_id, refresh_first=True)
+    except sqlite3.Error:
+        return idea_id
+    if len(matches) > 1:
+        print(f"Error: ID prefix '{idea_id}' is ambiguous (e.g. {matches[0]} and "
+              f"{matches[1]}); use more characters.", file=sys.stderr)
+        sys.exit(1)
+    return matches[0] if matches else idea_id
+
+
 def ensure_repo(args):
     """Ensure the ideas repository exists and is valid."""
     return resolve_idea_path(args)
 
+
 def init_repo(args):
     """Initialize a new ideas repository."""
     path = args.path if hasattr(args, "path") and args.path else IDEAS_REPO
@@ -42,20 +78,21 @@ def init_repo(args):
         print(f"Repository already exists at {path}")
         return True
 
+    # Imported here to avoid a circular import, and because resolving the
+    # repo path (all most commands need from this module) shouldn't load git support
+    import subprocess
+    from ideacli import gitbackend, paths
+    from ideacli.commit import commit_paths
+
     try:
         os.makedirs(path, exist_ok=True)
-        subprocess.run(["git", "init"], cwd=path, check=True)
+        gitbackend.get_backend(path).init()
 
-        os.makedirs(os.path.join(path, "conversations"), exist_ok=True)
+        os.makedirs(paths.conversation_dir(path), exist_ok=True)
         with open(os.path.join(path, "README.md"), "w", encoding="utf-8") as f:
             f.write("# LLM Conversations Repository\n\nManaged by ideacli\n")
 
-        subprocess.run(["git", "add", "."], cwd=path, check=True)
-        subprocess.run(
-            ["git", "commit", "-m", "Initial repository structure"],
-            cwd=path,
-            check=True
-        )
+        commit_paths(path, ["README.md"], "Initial repository structure")
 
         print(f"Initialized new ideas repository in {path}")
         return True
@@ -64,27 +101,64 @@ def init_repo(args):
         print(f"Error initializing repository: {e}")
         return False
 
+
+# The states an idea goes through, in the order 'status' lists them
+STATES = ("added", "analysis requested", "updated")
+
+
+def _print_counts(counts):
+    print(f"Number of conversations: {sum(counts.values())}")
+    known = [state for state in STATES if state in counts]
+    others = sorted((state for state in counts if state not in STATES),
+                    key=lambda state: (state is None, state or ""))
+    for state in known + others:
+        print(f"  {state or '(no state)'}: {counts[state]}")
+    print()
+
+
+def _format_git_summary(summary):
+    """Return one line describing a gitbackend status summary."""
+    where = f"On branch {summary['branch']}" if summary["branch"] else "Not on a branch"
+    tracking = [f"{name} {summary[name]}" for name in ("ahead", "behind") if summary[name]]
+    if tracking:
+        where += f" ({', '.join(tracking)})"
+    changes = [f"{summary[name]} {name}"
+               for name in ("staged", "modified", "untracked", "conflicted") if summary[name]]
+    return f"{where}: {', '.join(changes) if changes else 'nothing to commit'}"
+
+
 def status(args):
-    """Show the status of the ideas repository."""
+    """Show the status of the ideas repository.
+
+    Conversation counts by state come from the index; git is asked for a
+    porcelain summary, unless --fast is given.
+    """
+    import sqlite3
+    from ideacli import index, paths
+
     path = resolve_idea_path(args)
     print("\nIdeas Repository Status:\n")
     print(f"Location: {path}")
 
-    conv_path = os.path.join(path, "conversations")
+    conv_path = paths.conversation_dir(path)
     if os.path.isdir(conv_path):
-        count = len([f for f in os.listdir(conv_path) if f.endswith(".json")])
-        print(f"Number of conversations: {count}\n")
+        try:
+            _print_counts(index.state_counts(path, getattr(args, "workers", None)))
+        except sqlite3.Error as e:
+            print(f"Error reading ideas index: {e}\n", file=sys.stderr)
     else:
         print("Conversations folder missing.\n")
 
-    print("Git Status:")
+    if getattr(args, "fast", False):
+        return True
+
+    import subprocess
+    from ideacli import gitbackend
+
     try:
-        output = subprocess.check_output(
-            ["git", "status"], cwd=path, text=True
-        )
-        print(output)
+        summary = gitbackend.get_backend(path).summary()
     except (OSError, subprocess.CalledProcessError) as e:
         print(f"Error getting repository status: {e}", file=sys.stderr)
         return False
-
+    print(f"Git Status: {_format_git_summary(summary)}")
     return True
@@ -0,0 +1,116 @@
+"""Local choice of the files an idea needs, instead of asking the LLM.
+
+With the file_selection setting (or 'enquire --select') set to "bm25",
+enquire ranks the idea's files against its subject and body with BM25 and
+goes straight to the analysis prompt with the best ones, skipping the
+round trip in which the LLM is asked which files it wants to see.
+
+The files of the idea are the corpus. Identifiers are split into words
+(snake_case and camelCase parts), and words of a file's name and path
+count several times, as a file named after what the idea talks about is
+usually the one it needs. Files are taken best first while they score
+above zero, up to select_max_files of them and, if prompt_max_tokens is
+set, while their estimated tokens fit in it.
+"""
+
+import math
+import os
+import re
+from collections import Counter
+from ideacli import blobs, prompt
+
+K1 = 1.2
+B = 0.75
+# How many times each word of a file's name and path is counted
+NAME_WEIGHT = 3
+# Characters of a file read for ranking; the start of a file says what it is about
+RANK_CHARS = 1 << 20
+
+_CAMEL = re.compile(r"([a-z0-9])([A-Z])")
+_WORD = re.compile(r"[a-z0-9]{2,}")
+STOPWORDS = frozenset("""
+a an and are as at be but by can do for from has have how i if in into is it its
+me my not of on or our should so that the their then there these this to use
+we what when which will with would you your
+""".split())
+
+
+def words(text):
+    """Return the lower case words of text, identifiers split into their parts."""
+    return [word for word in _WORD.findall(_CAMEL.sub(r"\1 \2", text).lower())
+            if word not in STOPWORDS]
+
+
+def rank(query, documents):
+    """Return [(name, score)] for documents ({name: text}), best first, BM25 scored.
+
+    Ties keep the order of documents.
+    """
+    terms = set(words(query))
+    counts = {}
+    for name, text in documents.items():
+        counts[name] = Counter(words(text))
+        for word in words(name):
+            counts[name][word] += NAME_WEIGHT
+    if not counts or not terms:
+        return [(name, 0.0) for name in documents]
+
+    lengths = {name: sum(tf.values()) for name, tf in counts.items()}
+    average = sum(lengths.values()) / len(lengths) or 1
+    n_docs = len(counts)
+    scores = {}
+    for name, tf in counts.items():
+        score = 0.0
+        norm = K1 * (1 - B + B * lengths[name] / average)
+        for term in terms:
+            if tf[term]:
+                df = sum(1 for other in counts.values() if other[term])
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                score += idf * tf[term] * (K1 + 1) / (tf[term] + norm)
+        scores[name] = score
+    order = list(documents)
+    return sorted(scores.items(), key=lambda item: (-item[1], order.index(item[0])))
+
+
+def file_texts(repo_path, conversation):
+    """Return {name: text to rank} for every file of a conversation.
+
+    Like the analysis prompt, a file present in the repository is read from
+    there, else its content in the idea is used.
+    """
+    texts = {}
+    for name, entry in conversation.file_entries():
+        if name in texts:
+            continue
+        path = os.path.join(repo_path, name)
+        try:
+            if os.path.isfile(path):
+                with open(path, "r", encoding="utf-8", errors="replace") as f:
+                    texts[name] = f.read(RANK_CHARS)
+                continue
+            content = blobs.file_content(repo_path, entry)
+        except OSError:
+            content = None
+        texts[name] = str(content)[:RANK_CHARS] if content is not None else ""
+    return texts
+
+
+def select_files(repo_path, conversation, max_files=5, max_tokens=0):
+    """Return [(name, score)] of the files to show the LLM, best first.
+
+    Only files scoring above zero are taken; an empty list means nothing in
+    the files matches the idea, and the LLM has to be asked.
+    """
+    texts = file_texts(repo_path, conversation)
+    query = f"{conversation.subject or ''}\n{conversation.body or ''}"
+    picked = []
+    tokens = 0
+    for name, score in rank(query, texts):
+        if score <= 0 or len(picked) >= max_files:
+            break
+        size = prompt.estimate_tokens(texts[name])
+        if max_tokens and picked and tokens + size > max_tokens:
+            continue
+        picked.append((name, score))
+        tokens += size
+    return picked
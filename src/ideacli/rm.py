@@ -1,26 +1,28 @@
-import json
 import os
 import sys
-from ideacli.repository import resolve_idea_path
+from ideacli import index, paths
+from ideacli.model import Conversation
+from ideacli.repository import resolve_idea_id, resolve_idea_path
+
 
 def remove_file(args):
     """Remove a file from the JSON record of an idea."""
     repo_path = resolve_idea_path(args)
-    idea_file = os.path.join(repo_path, "conversations", f"{args.id}.json")
+    args.id = resolve_idea_id(repo_path, args.id)
+    idea_file = paths.idea_path(repo_path, args.id)
 
     if not os.path.isfile(idea_file):
         print(f"No conversation with ID {args.id}")
         sys.exit(1)
 
-    with open(idea_file, encoding="utf-8") as f:
-        idea = json.load(f)
+    idea = Conversation.load(idea_file)
 
-    files_data = idea.get("files", {})
+    files_data = idea.files or {}
 
     if args.file_name in files_data:
         del files_data[args.file_name]
-        with open(idea_file, "w", encoding="utf-8") as f:
-            json.dump(idea, f, indent=4)
+        if idea.save(idea_file):
+            index.record(repo_path, args.id, idea)
         print(f"Removed {args.file_name} from idea {args.id}")
     else:
-        print(f"File {args.file_name} not found in idea {args.id}")
\ No newline at end of file
+        print(f"File {args.file_name} not found in idea {args.id}")
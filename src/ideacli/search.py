@@ -0,0 +1,209 @@
+"""Full-text search over the conversations of an ideas repository.
+
+The search index is an SQLite FTS5 table in ``.ideas_repo/.cache/search.sqlite``
+with one row per conversation and four columns: ``subject``, ``body``,
+``response`` (the analysis, conclusion and answer) and ``files`` (names and
+contents of the root and response files, blobs included). Like the metadata
+index it is refreshed incrementally: only conversations whose mtime or size
+changed are re-read, and they are only re-indexed if their content hash
+changed too.
+
+Queries are words (all must match), ``"quoted phrases"``, ``prefix*`` and
+``field:term`` / ``field:"a phrase"`` filters, combined with ``OR`` and
+``NOT``. Results are ranked with BM25, subject matches weighing most.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+import time
+from functools import partial
+from ideacli import blobs, codec, index, loader, paths, store
+from ideacli.model import Conversation
+from ideacli.repository import resolve_idea_path
+
+SEARCH_FILE = "search.sqlite"
+FIELDS = ("subject", "body", "response", "files")
+# BM25 weight of a match in each field, in FIELDS order
+WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+OPERATORS = {"AND", "OR", "NOT"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    rowid INTEGER PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL,
+    id TEXT,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    digest TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS fts USING fts5(subject, body, response, files);
+CREATE TABLE IF NOT EXISTS scans (
+    dir_mtime_ns INTEGER NOT NULL,
+    scanned_ns INTEGER NOT NULL
+);
+"""
+
+_TERM = re.compile(r'(?:(\w+):)?(?:"([^"]*)"|(\S+))')
+
+
+def connect(repo_path):
+    """Open the search database of the repo, creating the schema if needed."""
+    conn = sqlite3.connect(os.path.join(index.cache_dir(repo_path), SEARCH_FILE), timeout=30)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _text(value):
+    """Return value as indexable text."""
+    if value is None:
+        return ""
+    return value if isinstance(value, str) else codec.dumps(value)
+
+
+def _files_text(repo_path, conversation):
+    """Yield the name and content of every file of a conversation."""
+    for name, file_obj in conversation.file_entries():
+        yield name
+        try:
+            yield _text(blobs.file_content(repo_path, file_obj))
+        except OSError:
+            pass  # Missing blob: index the name only
+
+
+def _read_document(repo_path, idea_file):
+    """Return (id, digest, subject, body, response, files) for a conversation file."""
+    data = store.read_bytes(idea_file)
+    conversation = Conversation.from_json(data)
+    return (
+        conversation.id,
+        hashlib.sha1(data).hexdigest(),
+        _text(conversation.subject),
+        _text(conversation.body),
+        "\n".join(_text(text) for text in conversation.response_texts()),
+        "\n".join(_files_text(repo_path, conversation)),
+    )
+
+
+def refresh(conn, repo_path, workers=None, rescan=False):
+    """Bring the search index up to date with the conversations directory.
+
+    The per-file checks are skipped while the directory itself is unchanged
+    (see index.scan_needed); rescan forces them, to pick up files edited in
+    place by other tools.
+    """
+    scanned_ns = time.time_ns()
+    dir_mtime_ns = paths.dir_stamp(repo_path)
+    last_scan = conn.execute("SELECT dir_mtime_ns, scanned_ns FROM scans").fetchone()
+    if not rescan and not index.scan_needed(dir_mtime_ns, last_scan):
+        return
+
+    on_disk = paths.scan(repo_path) if dir_mtime_ns is not None else {}
+    indexed = {
+        name: (rowid, (mtime_ns, size), digest)
+        for rowid, name, mtime_ns, size, digest
+        in conn.execute("SELECT rowid, name, mtime_ns, size, digest FROM docs")
+    }
+
+    stale = sorted(name for name, (_, *stamp) in on_disk.items()
+                   if name not in indexed or indexed[name][1] != tuple(stamp))
+    removed = [indexed[name][0] for name in indexed if name not in on_disk]
+
+    stale_files = [on_disk[name][0] for name in stale]
+    results = loader.load_all(repo_path, stale_files, reader=partial(_read_document, repo_path),
+                              workers=workers, processes=False)
+    complete = dir_mtime_ns is not None
+    with conn:
+        for rowid in removed:
+            conn.execute("DELETE FROM fts WHERE rowid = ?", (rowid,))
+            conn.execute("DELETE FROM docs WHERE rowid = ?", (rowid,))
+        for name, idea_file, result in zip(stale, stale_files, results):
+            if isinstance(result, Exception):
+                print(f"Warning: could not index {idea_file}: {result}", file=sys.stderr)
+                complete = False  # Retry on the next refresh
+                continue
+            idea_id, digest, *columns = result
+            _, mtime_ns, size = on_disk[name]
+            if name in indexed:
+                rowid, _, old_digest = indexed[name]
+                conn.execute("UPDATE docs SET id = ?, mtime_ns = ?, size = ?, digest = ? "
+                             "WHERE rowid = ?", (idea_id, mtime_ns, size, digest, rowid))
+                if digest == old_digest:
+                    continue  # Touched but not changed
+                conn.execute("DELETE FROM fts WHERE rowid = ?", (rowid,))
+            else:
+                rowid = conn.execute(
+                    "INSERT INTO docs (name, id, mtime_ns, size, digest) VALUES (?, ?, ?, ?, ?)",
+                    (name, idea_id, mtime_ns, size, digest)
+                ).lastrowid
+            conn.execute("INSERT INTO fts (rowid, subject, body, response, files) "
+                         "VALUES (?, ?, ?, ?, ?)", (rowid, *columns))
+        conn.execute("DELETE FROM scans")
+        if complete:
+            conn.execute("INSERT INTO scans VALUES (?, ?)", (dir_mtime_ns, scanned_ns))
+
+
+def to_fts_query(query):
+    """Translate a search query into an FTS5 query, quoting every term.
+
+    Raises ValueError if the query has no terms.
+    """
+    parts = []
+    for match in _TERM.finditer(query):
+        field, phrase, word = match.groups()
+        if field is None and word in OPERATORS:
+            parts.append(word)
+            continue
+        if field is not None and field not in FIELDS:
+            # Not a filter, just a word with a colon in it (e.g. a URL)
+            field, word = None, match.group(0)
+        text = phrase if phrase is not None else word
+        prefix = phrase is None and len(text) > 1 and text.endswith("*")
+        if prefix:
+            text = text[:-1]
+        if not text.strip():
+            continue
+        term = '"' + text.replace('"', '""') + '"' + (" *" if prefix else "")
+        parts.append(f"{field} : {term}" if field else term)
+    if not any(part not in OPERATORS for part in parts):
+        raise ValueError("empty search query")
+    return " ".join(parts)
+
+
+def search(repo_path, query, limit=20, workers=None, rescan=False):
+    """Return (id, subject, snippet) of the best matches for query, best first."""
+    conn = connect(repo_path)
+    try:
+        refresh(conn, repo_path, workers, rescan)
+        return conn.execute(
+            "SELECT docs.id, fts.subject, snippet(fts, -1, '**', '**', '...', 12) "
+            "FROM fts JOIN docs ON docs.rowid = fts.rowid "
+            f"WHERE fts MATCH ? ORDER BY bm25(fts, {', '.join(map(str, WEIGHTS))}) LIMIT ?",
+            (to_fts_query(query), limit)
+        ).fetchall()
+    finally:
+        conn.close()
+
+
+def search_ideas(args):
+    """Search ideas and print the best matches."""
+    repo_path = resolve_idea_path(args)
+    query = " ".join(args.query)
+    try:
+        results = search(repo_path, query, args.limit, getattr(args, "workers", None),
+                         getattr(args, "rescan", False))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    except sqlite3.Error as e:
+        print(f"Error searching ideas: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if not results:
+        print("No matching ideas.")
+        return
+    for idea_id, subject, snippet in results:
+        print(f"[{idea_id}] {subject}")
+        print(f"    {' '.join(snippet.split())}")
@@ -1,15 +1,16 @@
 """Show a specific idea by ID."""
 
 import os
-import json
 import sys
-from ideacli.repository import resolve_idea_path
+from ideacli import blobs, codec, paths, store
+from ideacli.repository import resolve_idea_id, resolve_idea_path
+
 
 def show_idea(args):
     """Show the details of a conversation by ID."""
     repo_path = resolve_idea_path(args)
-    conversation_dir = os.path.join(repo_path, "conversations")
-    idea_file = os.path.join(conversation_dir, f"{args.id}.json")
+    args.id = resolve_idea_id(repo_path, args.id)
+    idea_file = paths.idea_path(repo_path, args.id)
 
     if not os.path.isfile(idea_file):
         print(
@@ -19,19 +20,20 @@ def show_idea(args):
         sys.exit(1)
 
     try:
-        with open(idea_file, "r", encoding="utf-8") as f:
-            idea = json.load(f)
+        idea = store.load_conversation(idea_file)
 
         print(f"Subject: {idea.get('subject', '(No subject)')}\n")
         print(f"Body:\n{idea.get('body', '(No body)')}\n")
 
         response = idea.get('response')
         if response:
+            if isinstance(response, dict) and "files" in response:
+                response["files"] = blobs.inline_files(repo_path, response["files"])
             print("Response:")
-            print(json.dumps(response, indent=2))
+            print(codec.dumps(response, indent=True))
         else:
             print("(No response recorded)")
 
-    except (IOError, OSError, json.JSONDecodeError) as e:
+    except (IOError, OSError, codec.DecodeError) as e:
         print(f"Error reading conversation file: {e}", file=sys.stderr)
         sys.exit(1)
@@ -0,0 +1,199 @@
+"""Reading and writing conversation files.
+
+Conversations are always written with their header keys (``id``, ``subject``
+and ``state``) first, so that metadata-only readers such as the index can
+stop scanning a file as soon as they have seen them, instead of decoding
+potentially huge ``files``, ``prompt`` and ``response`` values.
+
+Conversations may be stored compressed (see ideacli.compression); every
+reader here detects the format itself.
+
+Writes go to a temporary file that is renamed over the original, so a crash
+never leaves a half-written conversation, and are skipped altogether when
+the serialized content is unchanged.
+"""
+
+import copy
+import json
+import os
+from collections import OrderedDict
+from ideacli import codec, compression, config, paths
+
+HEADER_KEYS = ("id", "subject", "state")
+# Indentation of conversation files written by every command
+INDENT = 2
+
+# Decoded conversations keyed by path, only kept by long-running processes
+# (see enable_cache); one-shot commands read each file at most once anyway.
+_cache = None
+_cache_size = 0
+
+_CHUNK_SIZE = 8192
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+def order_keys(idea):
+    """Return a copy of idea with the header keys first, other keys in their original order."""
+    ordered = {key: idea[key] for key in HEADER_KEYS if key in idea}
+    ordered.update((key, value) for key, value in idea.items() if key not in ordered)
+    return ordered
+
+
+def enable_cache(max_entries):
+    """Keep up to max_entries decoded conversations in memory, validated by mtime and size."""
+    global _cache, _cache_size
+    _cache = OrderedDict()
+    _cache_size = max_entries
+
+
+def load_conversation(idea_file):
+    """Load and return a whole conversation."""
+    if _cache is None:
+        return codec.loads(read_bytes(idea_file))
+
+    key = os.path.abspath(idea_file)
+    st = os.stat(key)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _cache.get(key)
+    if cached and cached[0] == stamp:
+        _cache.move_to_end(key)
+        idea = cached[1]
+    else:
+        idea = codec.loads(read_bytes(key))
+        _cache[key] = (stamp, idea)
+        if len(_cache) > _cache_size:
+            _cache.popitem(last=False)
+    # Callers modify what they load; the copy is cheap as the big values are shared strings
+    return copy.deepcopy(idea)
+
+
+def read_bytes(idea_file):
+    """Return the JSON bytes of a conversation file, decompressed if need be."""
+    with open(idea_file, "rb") as f:
+        return compression.decompress(f.read())
+
+
+def serialize(idea, compact=False):
+    """Return the text of a conversation file for idea."""
+    if compact:
+        return codec.dumps(order_keys(idea))
+    return codec.dumps(order_keys(idea), indent=True)
+
+
+def write_atomic(path, data, fsync=True):
+    """Replace the file at path with data (bytes) so readers see either the old or new content."""
+    tmp_path = os.path.join(os.path.dirname(path) or ".",
+                            f".{os.path.basename(path)}.{os.getpid()}.tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _unchanged(path, data):
+    """Whether the file at path already holds exactly data."""
+    try:
+        if os.stat(path).st_size != len(data):
+            return False
+        with open(path, "rb") as f:
+            return f.read() == data
+    except FileNotFoundError:
+        return False
+
+
+def save_conversation(idea_file, idea):
+    """Write a conversation, header keys first.
+
+    Returns False, without touching the file, if it already has this
+    content, so callers can skip index and git updates too.
+    """
+    settings = config.load_config(paths.repo_of(idea_file))
+    data = serialize(idea, settings["compact_json"]).encode("utf-8")
+    data = compression.compress(data, compression.effective_method(settings["compression"]))
+    if _unchanged(idea_file, data):
+        return False
+    write_atomic(idea_file, data, settings["fsync"])
+    return True
+
+
+class _Incomplete(Exception):
+    """The buffer ends before the member being parsed does."""
+
+
+def _skip_whitespace(buf, pos):
+    while pos < len(buf) and buf[pos] in _WHITESPACE:
+        pos += 1
+    return pos
+
+
+def _parse_member(buf, pos, first, eof):
+    """Parse one 'key: value' member of an object starting at pos.
+
+    Returns (key, value, end), or (None, None, end) at the closing brace.
+    Raises _Incomplete if more input is needed to be sure of the result.
+    """
+    try:
+        pos = _skip_whitespace(buf, pos)
+        if buf[pos] == "}":
+            return None, None, pos + 1
+        if not first:
+            if buf[pos] != ",":
+                raise ValueError(f"Expected ',' at offset {pos}")
+            pos = _skip_whitespace(buf, pos + 1)
+        key, pos = _DECODER.raw_decode(buf, pos)
+        pos = _skip_whitespace(buf, pos)
+        if buf[pos] != ":":
+            raise ValueError(f"Expected ':' at offset {pos}")
+        value, pos = _DECODER.raw_decode(buf, _skip_whitespace(buf, pos + 1))
+    except (IndexError, ValueError):
+        if eof:
+            raise
+        raise _Incomplete() from None
+    # A number running up to the end of the buffer may continue in the next chunk
+    if pos >= len(buf) and not eof:
+        raise _Incomplete()
+    return key, value, pos
+
+
+def read_header(idea_file, keys=HEADER_KEYS):
+    """Return {key: value} for the wanted top-level keys of a conversation.
+
+    The file is read in chunks and parsing stops once every wanted key has
+    been seen, so for files written by save_conversation only the first few
+    hundred bytes are read (and decompressed). Keys missing from the file are absent from the
+    result.
+    """
+    wanted = set(keys)
+    found = {}
+    with compression.open_text(idea_file) as f:
+        buf = f.read(_CHUNK_SIZE)
+        eof = len(buf) < _CHUNK_SIZE
+        pos = _skip_whitespace(buf, 0)
+        if buf[pos:pos + 1] != "{":
+            raise ValueError(f"{idea_file} does not contain a JSON object")
+        pos += 1
+        first = True
+        while not wanted.issubset(found):
+            try:
+                key, value, end = _parse_member(buf, pos, first, eof)
+            except _Incomplete:
+                more = f.read(max(len(buf), _CHUNK_SIZE))
+                eof = not more
+                buf += more
+                continue
+            if key is None:
+                break
+            if key in wanted:
+                found[key] = value
+            pos = end
+            first = False
+    return found
@@ -3,17 +3,15 @@ Update mechanism for ideacli: handles stateful updates,
 ensures original prompt is included, and manages file analysis workflow.
 """
 
-import json
 import os
 import sys
+import time
 
-try:
-    import pyperclip
-    HAS_PYPERCLIP = True
-except ImportError:
-    HAS_PYPERCLIP = False
+from ideacli import blobs, codec, config, index, loader, paths, prompt
+from ideacli.model import RESPONSE_KEYS, Conversation
+from ideacli.clipboard import load_pyperclip
+from ideacli.repository import resolve_idea_id, resolve_idea_path
 
-from ideacli.repository import resolve_idea_path
 
 def deep_update(original, update):
     """
@@ -27,127 +25,292 @@ def deep_update(original, update):
         else:
             original[key] = value
 
-def update_idea(args):
-    """
-    Update an idea with new JSON content, supporting analysis phase and solution phase.
-    """
-    repo_path = resolve_idea_path(args)
-    conversation_dir = os.path.join(repo_path, "conversations")
-    os.makedirs(conversation_dir, exist_ok=True)
-    conversation_file = os.path.join(conversation_dir, f"{args.id}.json")
-
-    # Load existing data
-    if os.path.exists(conversation_file):
-        with open(conversation_file, "r", encoding="utf-8") as f:
-            existing_data = json.load(f)
-    else:
-        print(f"Error: No conversation with ID {args.id}")
-        sys.exit(1)
 
-    state = existing_data.get("state", "added")
-
-    # Read new input (clipboard or --json)
-    try:
-        if hasattr(args, 'json') and args.json:
-            new_data = json.loads(args.json)
-        else:
-            import pyperclip
-            clipboard_content = pyperclip.paste()
-            new_data = json.loads(clipboard_content)
-    except Exception as e:
-        print(f"Error: Could not parse JSON: {e}")
-        sys.exit(1)
-
-    # --- PHASE 1: "analysis requested" - user pasted files_needed from LLM ---
-    if state == "analysis requested" and "files_needed" in new_data:
-        files_needed = new_data["files_needed"]
+def build_solution_prompt(repo_path, conversation, files_needed, max_tokens=0, max_chars=0):
+    """Return a PromptBuilder holding the original question and the files_needed.
 
-        # 1. Fetch the original prompt (subject + body)
-        subject = existing_data.get("subject", "")
-        body = existing_data.get("body", "")
-        original_prompt = subject
-        if body:
-            original_prompt += "\n\n" + body
+    Files are read from the repository if there, else from the idea itself;
+    see ideacli.prompt for the budget.
+    """
+    # 1. Fetch the original prompt (subject + body)
+    subject = conversation.subject or ""
+    body = conversation.body or ""
+    original_prompt = subject
+    if body:
+        original_prompt += "\n\n" + body
 
-        # 2. Prepare the files requested
-        files_available = existing_data.get("files", {})
-        repo_root = repo_path  # Adjust if your files are elsewhere
+    # 2. Quote the files requested, within the prompt budget
+    files_available = conversation.files or {}
+    repo_root = repo_path  # Adjust if your files are elsewhere
+    cache = prompt.TokenCache(repo_path)
+    builder = prompt.PromptBuilder(max_tokens, max_chars, cache)
+    builder.add(f"{original_prompt}\n\nHere are the files you requested:\n")
+    closing = ("\n\nPlease answer the original question above, using these files. "
+               "Respond ONLY with a valid JSON object containing your analysis, "
+               "and (optionally) any updated files as a JSON property 'files'.")
+    builder.reserve(closing)
 
-        file_texts = []
+    try:
         for fname in files_needed:
             # Try from repo root, then from files in JSON if present
             fpath = os.path.join(repo_root, fname)
-            file_content = None
             if os.path.isfile(fpath):
-                with open(fpath, "r", encoding="utf-8") as f:
-                    file_content = f.read()
+                builder.add_file(fname, path=fpath)
             elif files_available and fname in files_available:
-                file_content = files_available[fname]
+                content = blobs.file_content(repo_path, files_available[fname])
+                builder.add_file(fname, content=str(content))
             else:
-                file_content = "[File not found]"
-            file_texts.append(f"--- {fname} ---\n{file_content}")
-
-        files_section = "\n".join(file_texts)
-
-        # 3. Assemble new prompt
-        solution_prompt = (
-            f"{original_prompt}\n\n"
-            f"Here are the files you requested:\n"
-            f"{files_section}\n\n"
-            "Please answer the original question above, using these files. "
-            "Respond ONLY with a valid JSON object containing your analysis, "
-            "and (optionally) any updated files as a JSON property 'files'."
-        )
-
-        # 4. Copy prompt to clipboard
-        if HAS_PYPERCLIP:
-            try:
-                pyperclip.copy(solution_prompt)
-                print(f"Prompt for LLM copied to clipboard! ({len(solution_prompt)} chars)")
-            except Exception as e:
-                print(f"Could not copy to clipboard: {e}")
-        else:
-            print("--- Prompt for LLM ---\n")
-            print(solution_prompt)
+                builder.add_file(fname)
+    finally:
+        cache.close()
+
+    # 3. Assemble new prompt
+    builder.add(closing, reserved=True)
+    return builder
+
+
+def apply_response(repo_path, existing_data, new_data, max_tokens=None, max_chars=None):
+    """Apply an LLM response (a dict) to a conversation, moving it to its next state.
+
+    In the "analysis requested" state new_data names the files_needed, and
+    the analysis prompt quoting them is built (max_tokens and max_chars
+    default to the config) and stored as last_prompt; its PromptBuilder is
+    returned. In the "updated" state new_data is the LLM's solution, stored
+    under response; None is returned. The conversation is not saved.
+    Raises ValueError if the conversation is in the wrong state, or new_data
+    is not what that state expects.
+    """
+    state = existing_data.state or "added"
+    if state == "analysis requested" and not isinstance(new_data, (dict, list)):
+        raise ValueError("Expected a JSON list of file names or an object with files_needed, "
+                         f"got {type(new_data).__name__}.")
+    if state == "updated" and not isinstance(new_data, dict):
+        raise ValueError(f"Expected a JSON object, got {type(new_data).__name__}.")
+    if state == "analysis requested" and isinstance(new_data, list):
+        # What the question asks for: a bare list of file names
+        new_data = {"files_needed": new_data}
 
-        # 5. Update state, save files_needed and prompt for auditing
-        existing_data["state"] = "updated"
+    # --- PHASE 1: "analysis requested" - user pasted files_needed from LLM ---
+    if state == "analysis requested" and "files_needed" in new_data:
+        files_needed = new_data["files_needed"]
+        if not isinstance(files_needed, list):
+            raise ValueError("files_needed must be a JSON list of file names.")
+
+        settings = config.load_config(repo_path)
+        builder = build_solution_prompt(repo_path, existing_data, files_needed,
+                                        max_tokens or settings["prompt_max_tokens"],
+                                        max_chars or settings["prompt_max_chars"])
+
+        # Update state, save files_needed and prompt for auditing
+        existing_data.state = "updated"
         existing_data["files_needed"] = files_needed
-        existing_data["last_prompt"] = solution_prompt
-        with open(conversation_file, "w", encoding="utf-8") as f:
-            json.dump(existing_data, f, indent=2)
-        print("Ready for next LLM roundtrip.")
-        return
+        existing_data.last_prompt = builder.text()
+        return builder
 
     # --- PHASE 2: "updated" - user pastes LLM's actual answer/changes ---
-    elif state == "updated":
+    if state == "updated":
         # Expect new_data to contain LLM's answer and optionally updated files
         # (This logic may need customizing depending on your LLM output structure)
 
         # Merge new content, prioritizing 'files' if present
+        # (stored under response for consistency)
+        response = existing_data.response
         if "files" in new_data:
-            # Store under response for consistency
-            if "response" not in existing_data:
-                existing_data["response"] = {}
-            existing_data["response"]["files"] = new_data["files"]
+            files_data = new_data["files"]
+            if blobs.enabled(repo_path):
+                files_data = blobs.externalize_files(repo_path, files_data)
+            response["files"] = files_data
 
         # Optionally save LLM's analysis/answer
-        for k in ("analysis", "conclusion", "answer"):
+        for k in RESPONSE_KEYS:
             if k in new_data:
-                if "response" not in existing_data:
-                    existing_data["response"] = {}
-                existing_data["response"][k] = new_data[k]
+                response[k] = new_data[k]
+        if response:
+            existing_data.response = response
 
-        existing_data["state"] = "added"  # or maybe "completed"
-        with open(conversation_file, "w", encoding="utf-8") as f:
-            json.dump(existing_data, f, indent=2)
-        print("Conversation updated with LLM's solution.")
-        return
+        existing_data.state = "added"  # or maybe "completed"
+        return None
 
     # Error conditions: update called in wrong state
-    elif state == "added":
-        print("Error: Cannot update an idea in 'added' state. Run 'enquire' first.")
+    if state == "added":
+        raise ValueError("Cannot update an idea in 'added' state. Run 'enquire' first.")
+    raise ValueError(f"Unhandled conversation state '{state}'.")
+
+
+def _batch_reply(record):
+    """Return (id, reply) of a batch response record; raises ValueError if it has none.
+
+    Records are {"id": ..., "response": ...}, the response being the LLM's
+    reply as text or already decoded, or lines of an OpenAI batch output
+    file ({"custom_id": ..., "response": {"body": {"choices": ...}}}).
+    """
+    if not isinstance(record, dict):
+        raise ValueError("not a JSON object")
+    idea_id = record.get("id") or record.get("custom_id")
+    reply = record.get("response")
+    if isinstance(reply, dict) and isinstance(reply.get("body"), dict):
+        try:
+            reply = reply["body"]["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            raise ValueError("no reply in the response body") from None
+    if not idea_id or reply is None:
+        raise ValueError("both id and response are required")
+    if isinstance(reply, str):
+        from ideacli.provider import parse_reply
+        reply = parse_reply(reply)
+    if not isinstance(reply, (dict, list)):
+        raise ValueError(f"response is a JSON {type(reply).__name__}, not an object or list")
+    return str(idea_id), reply
+
+
+def _read_batch(source):
+    """Return ([(line number, id, reply)], lines skipped) of a JSONL file of responses.
+
+    Lines that aren't a valid response are skipped with a warning.
+    """
+    replies = []
+    skipped = 0
+    stream = sys.stdin if source == "-" else open(source, "r", encoding="utf-8")
+    try:
+        for line_no, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                replies.append((line_no, *_batch_reply(codec.loads(line))))
+            except ValueError as e:
+                print(f"Warning: skipping line {line_no}: {e}", file=sys.stderr)
+                skipped += 1
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    return replies, skipped
+
+
+def update_jsonl(args, repo_path):
+    """Apply a JSONL file of LLM responses, one per idea, as 'update' applies one.
+
+    Conversations are read in a thread pool, every response applied in
+    order, and the changed conversations saved and indexed in one pass.
+    With --output, the analysis prompts of ideas that named their
+    files_needed are written as {"id", "state", "prompt"} records, ready
+    for the next batch job.
+    """
+    start = time.perf_counter()
+    replies, skipped = _read_batch(args.jsonl)
+    full_ids = {idea_id: resolve_idea_id(repo_path, idea_id) for _, idea_id, _ in replies}
+    idea_files = {idea_id: paths.idea_path(repo_path, idea_id)
+                  for idea_id in dict.fromkeys(full_ids.values())}
+    loaded = dict(zip(idea_files, loader.load_all(repo_path, idea_files.values(),
+                                                  Conversation.load, args.workers,
+                                                  processes=False)))
+
+    settings = config.load_config(repo_path)
+    max_tokens = getattr(args, "max_tokens", None) or settings["prompt_max_tokens"]
+    max_chars = getattr(args, "max_chars", None) or settings["prompt_max_chars"]
+    changed = {}
+    failed = 0
+    for line_no, idea_id, reply in replies:
+        idea_id = full_ids[idea_id]
+        data = loaded[idea_id]
+        if isinstance(data, Exception):
+            print(f"Line {line_no} [{idea_id}]: {data}", file=sys.stderr)
+            failed += 1
+            continue
+        try:
+            apply_response(repo_path, data, reply, max_tokens, max_chars)
+        except ValueError as e:
+            print(f"Line {line_no} [{idea_id}]: {e}", file=sys.stderr)
+            failed += 1
+            continue
+        changed[idea_files[idea_id]] = (idea_id, data)
+
+    saved = loader.load_all(repo_path, changed,
+                            lambda idea_file: changed[idea_file][1].save(idea_file),
+                            args.workers, processes=False)
+    index.record_many(repo_path, [entry for entry, result in zip(changed.values(), saved)
+                                  if result is True])
+    for (idea_id, _), result in zip(changed.values(), saved):
+        if isinstance(result, Exception):
+            print(f"[{idea_id}] could not be saved: {result}", file=sys.stderr)
+            failed += 1
+
+    states = [data.state for (_, data), result in zip(changed.values(), saved)
+              if not isinstance(result, Exception)]
+    if getattr(args, "output", None):
+        with open(args.output, "w", encoding="utf-8") as out:
+            for (idea_id, data), result in zip(changed.values(), saved):
+                if data.state == "updated" and not isinstance(result, Exception):
+                    out.write(codec.dumps({"id": idea_id, "state": data.state,
+                                           "prompt": data.last_prompt}) + "\n")
+    print(f"Applied {len(replies) - failed} responses to {len(states)} ideas in "
+          f"{time.perf_counter() - start:.2f}s: {states.count('updated')} waiting for an "
+          f"answer, {states.count('added')} answered"
+          + (f", {failed + skipped} failed." if failed + skipped else "."))
+    if failed or skipped:
         sys.exit(1)
+
+
+def update_idea(args):
+    """
+    Update an idea with new JSON content, supporting analysis phase and solution phase.
+    """
+    repo_path = resolve_idea_path(args)
+    if getattr(args, "jsonl", None):
+        try:
+            update_jsonl(args, repo_path)
+        except OSError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+    args.id = resolve_idea_id(repo_path, args.id)
+    conversation_file = paths.idea_path(repo_path, args.id)
+
+    # Load existing data
+    if os.path.exists(conversation_file):
+        existing_data = Conversation.load(conversation_file)
     else:
-        print(f"Error: Unhandled conversation state '{state}'.")
+        print(f"Error: No conversation with ID {args.id}")
         sys.exit(1)
+
+    # Read new input (clipboard or --json)
+    try:
+        if hasattr(args, 'json') and args.json:
+            new_data = codec.loads(args.json)
+        else:
+            import pyperclip  # Only needed, and only imported, when reading the clipboard
+            clipboard_content = pyperclip.paste()
+            new_data = codec.loads(clipboard_content)
+    except Exception as e:
+        print(f"Error: Could not parse JSON: {e}")
+        sys.exit(1)
+
+    try:
+        builder = apply_response(repo_path, existing_data, new_data,
+                                 getattr(args, "max_tokens", None),
+                                 getattr(args, "max_chars", None))
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if existing_data.save(conversation_file):
+        index.record(repo_path, args.id, existing_data)
+
+    if builder is None:
+        print("Conversation updated with LLM's solution.")
+        return
+    solution_prompt = existing_data.last_prompt
+    if any(stat["status"] != "included" for stat in builder.stats):
+        print(f"Prompt is about {builder.tokens} tokens; files quoted:")
+        print(prompt.format_stats(builder.stats))
+
+    # Copy prompt to clipboard
+    pyperclip = load_pyperclip()
+    if pyperclip:
+        try:
+            pyperclip.copy(solution_prompt)
+            print(f"Prompt for LLM copied to clipboard! ({len(solution_prompt)} chars)")
+        except Exception as e:
+            print(f"Could not copy to clipboard: {e}")
+    else:
+        print("--- Prompt for LLM ---\n")
+        print(solution_prompt)
+    print("Ready for next LLM roundtrip.")
@@ -7,9 +7,11 @@ import os
 import tempfile
 import shutil
 
-from ideacli.add import add
+from ideacli import index
+from ideacli.add import add, _new_id
 from ideacli.repository import IDEAS_REPO
 
+
 class TestAdd(unittest.TestCase):
     def setUp(self):
         # create isolated temp directory for test repo
@@ -18,13 +20,23 @@ class TestAdd(unittest.TestCase):
         os.makedirs(os.path.join(self.repo_path, "conversations"), exist_ok=True)
         self.args = mock.MagicMock()
         self.args.path = self.test_dir
+        self.args.jsonl = None
+        self.args.no_commit = False
 
     def tearDown(self):
         shutil.rmtree(self.test_dir)
 
+    @patch("ideacli.add.uuid.uuid4")
+    def test_new_id_skips_taken_ids(self, mock_uuid):
+        with open(os.path.join(self.repo_path, "conversations", "aaaaaaaa.json"), "w") as f:
+            f.write("{}")
+        mock_uuid.side_effect = ["aaaaaaaa-0000", "bbbbbbbb-0000"]
+
+        self.assertEqual(_new_id(self.repo_path), "bbbbbbbb")
+
     @patch("ideacli.repository.resolve_repo_root")
     @patch("ideacli.add.copy_to_clipboard")
-    @patch("ideacli.add.subprocess.run")
+    @patch("ideacli.commit.subprocess.run")
     def test_add_piped_input(self, mock_subprocess, mock_clipboard, mock_repo_root):
         """Test adding via piped stdin"""
         mock_repo_root.return_value = self.test_dir
@@ -40,9 +52,10 @@ class TestAdd(unittest.TestCase):
 
     @patch("ideacli.repository.resolve_repo_root")
     @patch("ideacli.add.copy_to_clipboard")
-    @patch("ideacli.add.subprocess.run")
+    @patch("ideacli.commit.subprocess.run")
     @patch("ideacli.add.input", side_effect=["Test Subject"])
-    def test_add_interactive_input(self, mock_input, mock_subprocess, mock_clipboard, mock_repo_root):
+    def test_add_interactive_input(self, mock_input, mock_subprocess, mock_clipboard,
+                                   mock_repo_root):
         """Test adding via interactive user input"""
         mock_repo_root.return_value = self.test_dir
 
@@ -53,3 +66,26 @@ class TestAdd(unittest.TestCase):
 
         mock_clipboard.assert_called_once()
         mock_subprocess.assert_called()
+
+    @patch("ideacli.repository.resolve_repo_root")
+    @patch("ideacli.commit.subprocess.run")
+    def test_add_jsonl(self, mock_subprocess, mock_repo_root):
+        """Test bulk adding from a JSONL file with a single commit"""
+        mock_repo_root.return_value = self.test_dir
+        jsonl = os.path.join(self.test_dir, "ideas.jsonl")
+        with open(jsonl, "w", encoding="utf-8") as f:
+            f.write('{"subject": "One", "body": "First body"}\n')
+            f.write('not json\n')
+            f.write('\n')
+            f.write('{"subject": "Two", "body": "Second body"}\n')
+            f.write('{"subject": "No body"}\n')
+        self.args.jsonl = jsonl
+
+        with patch("sys.stdout", new_callable=io.StringIO) as out:
+            add(self.args)
+
+        self.assertIn("Added 2 ideas", out.getvalue())
+        subjects = sorted(subject for _, subject, _ in index.entries(self.repo_path))
+        self.assertEqual(subjects, ["One", "Two"])
+        commands = [call.args[0][:2] for call in mock_subprocess.call_args_list]
+        self.assertEqual(commands, [["git", "add"], ["git", "commit"]])
@@ -0,0 +1,92 @@
+"""Tests for batch enquire to JSONL and 'update --jsonl'."""
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from ideacli import codec, store
+from ideacli.enquire import enquire
+from ideacli.update import update_idea
+
+IDEAS = {
+    "aaaa1111": {"id": "aaaa1111", "subject": "Start a project", "body": "From scratch",
+                 "state": "added"},
+    "bbbb2222": {"id": "bbbb2222", "subject": "Fix it", "body": "Something is broken",
+                 "state": "added", "files": {"main.py": {"content": "print(1)\n"}}},
+    "cccc3333": {"id": "cccc3333", "subject": "Done", "body": "Already asked",
+                 "state": "updated", "prompt": "Old prompt"},
+}
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.repo_path = os.path.join(self.temp_dir, ".ideas_repo")
+        os.makedirs(os.path.join(self.repo_path, "conversations"))
+        for idea_id, idea in IDEAS.items():
+            store.save_conversation(self._file(idea_id), idea)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _file(self, idea_id):
+        return os.path.join(self.repo_path, "conversations", f"{idea_id}.json")
+
+    def _read_jsonl(self, name):
+        with open(name, "r", encoding="utf-8") as f:
+            return [codec.loads(line) for line in f]
+
+    def test_enquire_all_writes_jsonl(self):
+        output = os.path.join(self.temp_dir, "prompts.jsonl")
+        args = SimpleNamespace(path=self.temp_dir, id=None, ids_from=None, all=True,
+                               state="added", output=output, prompt=None, select=None,
+                               workers=2)
+        with patch("sys.stdout", new_callable=io.StringIO) as out:
+            enquire(args)
+        self.assertIn("Wrote 2 prompts", out.getvalue())
+
+        records = {record["id"]: record for record in self._read_jsonl(output)}
+        self.assertEqual(set(records), {"aaaa1111", "bbbb2222"})
+        self.assertEqual(records["aaaa1111"]["state"], "updated")
+        self.assertEqual(records["bbbb2222"]["state"], "analysis requested")
+        self.assertIn("['main.py']", records["bbbb2222"]["prompt"])
+        self.assertEqual(store.load_conversation(self._file("bbbb2222"))["prompt"],
+                         records["bbbb2222"]["prompt"])
+
+    def test_update_jsonl_applies_responses(self):
+        store.save_conversation(self._file("bbbb2222"),
+                                dict(IDEAS["bbbb2222"], state="analysis requested"))
+        responses = os.path.join(self.temp_dir, "responses.jsonl")
+        with open(responses, "w", encoding="utf-8") as f:
+            f.write(codec.dumps({"id": "bbbb2222", "response": '```json\n["main.py"]\n```'}) + "\n")
+            f.write(codec.dumps({"custom_id": "cccc3333", "response": {"body": {"choices": [
+                {"message": {"content": '{"files": {"a.py": "x = 1"}}'}}]}}}) + "\n")
+            f.write("not json\n")
+            f.write(codec.dumps({"id": "aaaa1111", "response": 5}) + "\n")
+        output = os.path.join(self.temp_dir, "next.jsonl")
+        args = SimpleNamespace(path=self.temp_dir, id=None, jsonl=responses, output=output,
+                               workers=2, max_tokens=None, max_chars=None)
+        with patch("sys.stdout", new_callable=io.StringIO) as out, \
+                patch("sys.stderr", new_callable=io.StringIO) as err, \
+                self.assertRaises(SystemExit):
+            update_idea(args)
+        self.assertIn("1 waiting for an answer, 1 answered, 2 failed", out.getvalue())
+        self.assertIn("skipping line 3", err.getvalue())
+        self.assertIn("skipping line 4: response is a JSON int", err.getvalue())
+
+        fixed = store.load_conversation(self._file("bbbb2222"))
+        self.assertEqual(fixed["state"], "updated")
+        self.assertEqual(fixed["files_needed"], ["main.py"])
+        self.assertEqual(self._read_jsonl(output),
+                         [{"id": "bbbb2222", "state": "updated", "prompt": fixed["last_prompt"]}])
+        done = store.load_conversation(self._file("cccc3333"))
+        self.assertEqual(done["state"], "added")
+        self.assertEqual(done["response"]["files"], {"a.py": "x = 1"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from ideacli import blobs, store
+from ideacli.files import extract_files
+from ideacli.importer import import_idea
+
+
+class TestBlobs(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.repo_path = os.path.join(self.temp_dir, ".ideas_repo")
+        os.makedirs(os.path.join(self.repo_path, "conversations"))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_put_dedupes_identical_content(self):
+        first = blobs.put(self.repo_path, "print('hi')\n")
+        second = blobs.put(self.repo_path, "print('hi')\n")
+
+        self.assertEqual(first, second)
+        self.assertEqual(blobs.get(self.repo_path, first), "print('hi')\n")
+        self.assertEqual(len(os.listdir(os.path.join(self.repo_path, "blobs"))), 1)
+
+    def test_externalize_and_inline_round_trip(self):
+        idea = {
+            "id": "i",
+            "files": {"a.py": "x = 1\n"},
+            "response": {"files": [{"name": "b.py", "content": "y = 2\n", "path": "src"}]},
+        }
+        original = json.loads(json.dumps(idea))
+
+        self.assertTrue(blobs.externalize_idea(self.repo_path, idea))
+        self.assertEqual(set(idea["files"]["a.py"]), {"blob"})
+        self.assertNotIn("content", idea["response"]["files"][0])
+        self.assertFalse(blobs.externalize_idea(self.repo_path, idea))
+        self.assertEqual(len(list(blobs.referenced(idea))), 2)
+
+        self.assertTrue(blobs.inline_idea(self.repo_path, idea))
+        self.assertEqual(idea, original)
+
+    def test_import_and_extract_with_blob_store(self):
+        with open(os.path.join(self.repo_path, "config.json"), "w", encoding="utf-8") as f:
+            json.dump({"blob_store": True}, f)
+        idea_file = os.path.join(self.repo_path, "conversations", "abc.json")
+        store.save_conversation(idea_file, {"id": "abc", "subject": "s"})
+        source = os.path.join(self.temp_dir, "tool.py")
+        with open(source, "w", encoding="utf-8") as f:
+            f.write("print('tool')\n")
+
+        args = MagicMock(path=self.temp_dir, id="abc", source=source,
+                         destination=None, force=False)
+        import_idea(args)
+
+        entry = store.load_conversation(idea_file)["files"]["tool.py"]
+        self.assertEqual(list(entry), ["blob"])
+
+        out_dir = os.path.join(self.temp_dir, "out")
+        os.makedirs(out_dir)
+        cwd = os.path.realpath(os.curdir)
+        os.chdir(out_dir)
+        try:
+            extract_files(MagicMock(path=self.temp_dir, id="abc", dry_run=False, diff=False,
+                                    workers=None))
+        finally:
+            os.chdir(cwd)
+        with open(os.path.join(out_dir, "tool.py"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "print('tool')\n")
+
+    def test_import_keeps_list_form_and_refuses_existing_files(self):
+        idea_file = os.path.join(self.repo_path, "conversations", "abc.json")
+        store.save_conversation(idea_file, {
+            "id": "abc", "files": [{"name": "a.py", "content": "a = 1\n"}],
+            "response": {"files": {"b.py": "b = 1\n"}}})
+        source = os.path.join(self.temp_dir, "b.py")
+        with open(source, "w", encoding="utf-8") as f:
+            f.write("b = 2\n")
+
+        args = MagicMock(path=self.temp_dir, id="abc", source=source,
+                         destination=None, force=False)
+        with self.assertRaises(SystemExit), patch("sys.stdout"):
+            import_idea(args)
+        args.force = True
+        with patch("sys.stdout"):
+            import_idea(args)
+
+        self.assertEqual(store.load_conversation(idea_file)["files"],
+                         [{"name": "a.py", "content": "a = 1\n"},
+                          {"name": "b.py", "content": "b = 2\n"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import json
+import unittest
+
+from ideacli import codec
+
+DOCUMENTS = [
+    {
+        "id": "abcd1234", "subject": "Ünïcode 😀 and \x7f controls \x1f\b", "state": "added",
+        "body": 'quotes " and \\ backslashes, "1e16" in a string',
+        "files": {"a.py": {"content": "x = 1\n" * 100, "path": "src"}},
+        "response": {"floats": [0.1, 1e16, 1e-07, -2.5e+300, 2.0], "empty": {}, "list": []},
+    },
+    {"ints": [0, -1, 2 ** 63 - 1, 2 ** 64 - 1, -2 ** 63, 2 ** 70]},
+    {"non string key": {1: "one"}},
+    [],
+    "plain",
+]
+
+
+class TestCodec(unittest.TestCase):
+    def tearDown(self):
+        codec.use()
+
+    def test_every_backend_matches_the_standard_library(self):
+        for name in codec.BACKENDS:
+            if codec.use(name) != name:
+                continue  # Not installed
+            for doc in DOCUMENTS:
+                with self.subTest(backend=name, doc=doc):
+                    self.assertEqual(codec.dumps(doc, indent=True), json.dumps(doc, indent=2))
+                    self.assertEqual(codec.dumps(doc), json.dumps(doc, separators=(",", ":")))
+                    text = json.dumps(doc)
+                    self.assertEqual(codec.loads(text), json.loads(text))
+                    self.assertEqual(codec.loads(text.encode("utf-8")), json.loads(text))
+
+    def test_invalid_json_raises_decode_error(self):
+        for name in codec.BACKENDS:
+            if codec.use(name) != name:
+                continue
+            with self.subTest(backend=name), self.assertRaises(codec.DecodeError):
+                codec.loads(b'{"id": ')
+
+
+if __name__ == "__main__":
+    unittest.main()
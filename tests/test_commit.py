@@ -0,0 +1,71 @@
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+from unittest.mock import patch
+
+from ideacli import commit
+from ideacli.add import add
+
+
+def git(repo_path, *args):
+    return subprocess.run(["git", *args], cwd=repo_path, check=True,
+                          capture_output=True, text=True).stdout
+
+
+class TestCommit(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.repo_path = os.path.join(self.test_dir, ".ideas_repo")
+        os.makedirs(os.path.join(self.repo_path, "conversations"))
+        git(self.repo_path, "init", "-q")
+        git(self.repo_path, "config", "user.email", "test@example.com")
+        git(self.repo_path, "config", "user.name", "Test")
+        self.args = mock.MagicMock()
+        self.args.path = self.test_dir
+        self.args.jsonl = None
+        self.args.message = None
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    @patch("ideacli.add.copy_to_clipboard")
+    def add_idea(self, text, mock_clipboard):
+        self.args.no_commit = True
+        sys.stdin = io.StringIO(text)
+        sys.stdin.isatty = lambda: False
+        add(self.args)
+
+    def test_no_commit_then_commit_makes_one_commit(self):
+        self.add_idea("First\nbody one\n")
+        self.add_idea("Second\nbody two\n")
+        # An unrelated file must not be swept into the batch
+        with open(os.path.join(self.repo_path, "notes.txt"), "w", encoding="utf-8") as f:
+            f.write("scratch")
+
+        self.assertEqual(len(list(commit.read_pending(self.repo_path))), 2)
+        with patch("sys.stdout", new_callable=io.StringIO) as out:
+            commit.commit_pending(self.args)
+
+        self.assertIn("Committed 2 queued change(s).", out.getvalue())
+        self.assertEqual(git(self.repo_path, "rev-list", "--count", "HEAD").strip(), "1")
+        committed = git(self.repo_path, "show", "--name-only", "--format=%B", "HEAD")
+        self.assertIn("Batch of 2 changes", committed)
+        self.assertIn("- Add idea:", committed)
+        self.assertEqual(committed.count("conversations/"), 2)
+        self.assertNotIn("notes.txt", committed)
+        self.assertEqual(list(commit.read_pending(self.repo_path)), [])
+
+    def test_commit_with_nothing_queued(self):
+        with patch("sys.stdout", new_callable=io.StringIO) as out:
+            commit.commit_pending(self.args)
+
+        self.assertIn("Nothing queued to commit.", out.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import argparse
+import io
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from ideacli import daemon
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "needs Unix domain sockets")
+class TestDaemon(unittest.TestCase):
+    def setUp(self):
+        self.cwd_fd = os.open(".", os.O_RDONLY)
+        self.temp_dir = tempfile.mkdtemp()
+        self.repo_dir = os.path.join(self.temp_dir, ".ideas_repo")
+        os.makedirs(os.path.join(self.repo_dir, "conversations"))
+        with open(os.path.join(self.repo_dir, "conversations", "abc.json"), "w",
+                  encoding="utf-8") as f:
+            json.dump({"id": "abc", "subject": "Served", "body": "From the daemon"}, f)
+
+    def tearDown(self):
+        os.fchdir(self.cwd_fd)
+        os.close(self.cwd_fd)
+        shutil.rmtree(self.temp_dir)
+
+    def start_server(self):
+        args = argparse.Namespace(path=self.temp_dir, stop=False)
+        with patch("sys.stdout", new_callable=io.StringIO):
+            thread = threading.Thread(target=daemon.serve, args=(args,), daemon=True)
+            thread.start()
+            for _ in range(100):
+                if os.path.exists(daemon.socket_path(self.repo_dir)):
+                    break
+                time.sleep(0.02)
+        return thread
+
+    def stop_server(self, thread):
+        with patch("sys.stdout", new_callable=io.StringIO) as out:
+            daemon.serve(argparse.Namespace(path=self.temp_dir, stop=True))
+        thread.join(5)
+        self.assertEqual(out.getvalue(), "Server stopped.\n")
+        self.assertFalse(os.path.exists(daemon.socket_path(self.repo_dir)))
+
+    def forward(self, *argv):
+        args = argparse.Namespace(command=argv[0], path=self.temp_dir)
+        with patch("sys.stdout", new_callable=io.StringIO) as out, \
+                patch("sys.stderr", new_callable=io.StringIO) as err:
+            code = daemon.forward(args, [*argv, "--path", self.temp_dir])
+        return code, out.getvalue(), err.getvalue()
+
+    def test_forward_without_server(self):
+        self.assertEqual(self.forward("list"), (None, "", ""))
+
+    def test_commands_run_in_server(self):
+        thread = self.start_server()
+        try:
+            self.assertEqual(self.forward("list"), (0, "[abc] Served\n", ""))
+
+            code, out, _ = self.forward("show", "--id", "abc")
+            self.assertEqual(code, 0)
+            self.assertIn("From the daemon", out)
+
+            code, _, err = self.forward("show", "--id", "missing")
+            self.assertEqual(code, 1)
+            self.assertIn("No conversation found with ID 'missing'", err)
+
+            # Only read-mostly commands are forwarded
+            self.assertIsNone(self.forward("add")[0])
+            self.assertIsNone(self.forward("enquire", "--id", "abc")[0])
+        finally:
+            self.stop_server(thread)
+
+    def test_second_server_is_refused(self):
+        thread = self.start_server()
+        try:
+            self.assertEqual(daemon._send(daemon.socket_path(self.repo_dir), {"ping": True}),
+                             {"code": 0})
+            with patch("sys.stdout", new_callable=io.StringIO), \
+                    patch("sys.stderr", new_callable=io.StringIO) as err, \
+                    self.assertRaises(SystemExit):
+                daemon.serve(argparse.Namespace(path=self.temp_dir, stop=False))
+            self.assertIn("a server is already running", err.getvalue())
+        finally:
+            self.stop_server(thread)
+
+    def test_client_settings_apply_per_request(self):
+        with patch.dict(os.environ, {"IDEACLI_WORKERS": "3", "IDEACLI_LAYOUT": "flat"}):
+            with daemon._environment({"IDEACLI_WORKERS": "1", "PATH": "/nowhere"}):
+                self.assertEqual(os.environ["IDEACLI_WORKERS"], "1")
+                self.assertNotIn("IDEACLI_LAYOUT", os.environ)
+                self.assertNotEqual(os.environ.get("PATH"), "/nowhere")
+            self.assertEqual(os.environ["IDEACLI_WORKERS"], "3")
+            self.assertEqual(os.environ["IDEACLI_LAYOUT"], "flat")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+"""Tests for extracting the files of an idea."""
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from ideacli import store
+from ideacli.files import extract_files
+
+
+class TestExtract(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.repo_path = os.path.join(self.temp_dir, ".ideas_repo")
+        self.idea_file = os.path.join(self.repo_path, "conversations", "abc.json")
+        os.makedirs(os.path.dirname(self.idea_file))
+        self.out_dir = os.path.join(self.temp_dir, "out")
+        os.makedirs(self.out_dir)
+        self.cwd = os.path.realpath(os.curdir)
+        os.chdir(self.out_dir)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.temp_dir)
+
+    def save(self, files):
+        store.save_conversation(self.idea_file, {"id": "abc", "subject": "s", "files": {
+            name: {"content": content, "path": "src"} for name, content in files.items()}})
+
+    def extract(self, **options):
+        args = SimpleNamespace(path=self.temp_dir, id="abc", dry_run=False, diff=False,
+                               workers=2)
+        vars(args).update(options)
+        with patch("sys.stdout", new_callable=io.StringIO) as out:
+            extract_files(args)
+        return out.getvalue()
+
+    def read(self, name):
+        with open(os.path.join(self.out_dir, "src", name), encoding="utf-8") as f:
+            return f.read()
+
+    def test_unchanged_files_are_skipped_and_stale_ones_removed(self):
+        self.save({"a.py": "a = 1\n", "b.py": "b = 1\n", "c.py": "c = 1\n"})
+        self.assertIn("3 written, 0 unchanged, 0 removed", self.extract())
+        a_mtime = os.stat(os.path.join("src", "a.py")).st_mtime_ns
+        with open(os.path.join("src", "c.py"), "a", encoding="utf-8") as f:
+            f.write("# edited by hand\n")
+
+        self.save({"a.py": "a = 1\n", "b.py": "b = 2\n"})
+        output = self.extract()
+
+        self.assertIn("1 written, 1 unchanged, 0 removed", output)
+        self.assertIn("Kept src/c.py", output)
+        self.assertEqual(os.stat(os.path.join("src", "a.py")).st_mtime_ns, a_mtime)
+        self.assertEqual(self.read("b.py"), "b = 2\n")
+
+        self.save({"a.py": "a = 1\n"})
+        self.assertIn("0 written, 1 unchanged, 1 removed", self.extract())
+        self.assertFalse(os.path.exists(os.path.join("src", "b.py")))
+
+    def test_dry_run_with_diff_changes_nothing(self):
+        self.save({"a.py": "a = 1\n"})
+        self.extract()
+        self.save({"a.py": "a = 2\n", "new.py": "new = 1\n"})
+
+        output = self.extract(dry_run=True, diff=True)
+
+        self.assertIn("-a = 1\n+a = 2\n", output)
+        self.assertIn("--- /dev/null\n+++ src/new.py\n", output)
+        self.assertIn("Dry run: 2 to write, 0 unchanged, 0 to remove", output)
+        self.assertEqual(self.read("a.py"), "a = 1\n")
+        self.assertFalse(os.path.exists(os.path.join("src", "new.py")))
+
+
+if __name__ == "__main__":
+    unittest.main()
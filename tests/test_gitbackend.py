@@ -0,0 +1,151 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from ideacli import commit, gitbackend
+
+
+def git(repo_path, *args):
+    return subprocess.run(["git", *args], cwd=repo_path, check=True,
+                          capture_output=True, text=True).stdout
+
+
+class BackendTests:
+    """Behaviour every git backend must share."""
+
+    backend = None
+
+    def setUp(self):
+        self.repo_path = tempfile.mkdtemp()
+        env = {"IDEACLI_GIT_BACKEND": self.backend,
+               "GIT_AUTHOR_NAME": "Test", "GIT_AUTHOR_EMAIL": "test@example.com",
+               "GIT_COMMITTER_NAME": "Test", "GIT_COMMITTER_EMAIL": "test@example.com"}
+        self.env = patch.dict(os.environ, env)
+        self.env.start()
+        gitbackend.get_backend(self.repo_path).init()
+        os.makedirs(os.path.join(self.repo_path, "conversations"))
+
+    def tearDown(self):
+        self.env.stop()
+        shutil.rmtree(self.repo_path)
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(os.path.join(self.repo_path, path)), exist_ok=True)
+        with open(os.path.join(self.repo_path, path), "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def test_commits_only_listed_paths(self):
+        self.write("README.md", "readme")
+        commit.commit_paths(self.repo_path, ["README.md"], "Initial")
+        self.write("conversations/a.json", "{}")
+        self.write("conversations/b.json", "{}")
+        self.write("untouched.txt", "not mine")
+
+        commit.commit_paths(self.repo_path, ["conversations/a.json", "conversations/b.json"],
+                            "Add two")
+
+        self.assertEqual(git(self.repo_path, "log", "--format=%s"), "Add two\nInitial\n")
+        self.assertEqual(
+            git(self.repo_path, "ls-tree", "-r", "--name-only", "HEAD").split(),
+            ["README.md", "conversations/a.json", "conversations/b.json"]
+        )
+        self.assertEqual(git(self.repo_path, "status", "--porcelain"), "?? untouched.txt\n")
+
+    def test_large_commit_leaves_other_staged_paths(self):
+        self.write("README.md", "readme")
+        commit.commit_paths(self.repo_path, ["README.md"], "Initial")
+        self.write("staged.txt", "staged by hand")
+        git(self.repo_path, "add", "staged.txt")
+        ideas = [f"conversations/{n:04d}.json" for n in range(1001)]
+        for path in ideas:
+            self.write(path, "{}")
+
+        commit.commit_paths(self.repo_path, ideas, "Add many")
+
+        self.assertEqual(
+            git(self.repo_path, "ls-tree", "-r", "--name-only", "HEAD").split(),
+            ["README.md", *ideas]
+        )
+        self.assertEqual(git(self.repo_path, "status", "--porcelain"), "A  staged.txt\n")
+
+    def test_summary_counts_changes(self):
+        self.write("conversations/a.json", "{}")
+        self.write("conversations/b.json", "{}")
+        commit.commit_paths(self.repo_path, ["conversations/a.json", "conversations/b.json"],
+                            "Add")
+        self.write("conversations/a.json", "{\"changed\": true}")
+        self.write("conversations/c.json", "{}")
+        self.write("notes.txt", "untracked")
+        git(self.repo_path, "add", "conversations/c.json")
+
+        summary = gitbackend.get_backend(self.repo_path).summary()
+
+        self.assertEqual((summary["staged"], summary["modified"], summary["untracked"]),
+                         (1, 1, 1))
+        self.assertTrue(summary["branch"])
+
+    def test_commits_removals(self):
+        self.write("conversations/a.json", "{}")
+        self.write("conversations/b.json", "{}")
+        commit.commit_paths(self.repo_path, ["conversations/a.json", "conversations/b.json"],
+                            "Add")
+        os.remove(os.path.join(self.repo_path, "conversations", "a.json"))
+
+        commit.commit_paths(self.repo_path, ["conversations/a.json"], "Remove")
+
+        self.assertEqual(
+            git(self.repo_path, "ls-tree", "-r", "--name-only", "HEAD").split(),
+            ["conversations/b.json"]
+        )
+        self.assertEqual(git(self.repo_path, "status", "--porcelain"), "")
+
+    def test_moves_of_uncommitted_files(self):
+        self.write("conversations/a.json", "{}")
+        commit.commit_paths(self.repo_path, ["conversations/a.json"], "Add")
+        # b.json moves before it was ever committed
+        self.write("conversations/bb/b.json", "{}")
+
+        commit.commit_paths(self.repo_path, ["conversations/b.json", "conversations/bb/b.json"],
+                            "Move")
+
+        self.assertEqual(
+            git(self.repo_path, "ls-tree", "-r", "--name-only", "HEAD").split(),
+            ["conversations/a.json", "conversations/bb/b.json"]
+        )
+
+
+class TestSubprocessBackend(BackendTests, unittest.TestCase):
+    backend = "subprocess"
+
+
+@unittest.skipUnless(gitbackend.HAS_DULWICH, "dulwich not installed")
+class TestDulwichBackend(BackendTests, unittest.TestCase):
+    backend = "dulwich"
+
+
+class TestParsePorcelain(unittest.TestCase):
+    def test_parse_porcelain(self):
+        output = ("## main...origin/main [ahead 2, behind 1]\0R  new.json\0old.json\0"
+                  " M a.json\0MM b.json\0UU c.json\0?? d.json\0")
+
+        self.assertEqual(gitbackend.parse_porcelain(output), {
+            "branch": "main", "ahead": 2, "behind": 1,
+            "staged": 2, "modified": 2, "untracked": 1, "conflicted": 1,
+        })
+        self.assertIsNone(gitbackend.parse_porcelain("## HEAD (no branch)\0")["branch"])
+
+
+class TestGetBackend(unittest.TestCase):
+    def test_falls_back_to_subprocess(self):
+        with patch.dict(os.environ, {"IDEACLI_GIT_BACKEND": "dulwich"}), \
+                patch("ideacli.gitbackend.HAS_DULWICH", False):
+            backend = gitbackend.get_backend(tempfile.gettempdir())
+
+        self.assertIsInstance(backend, gitbackend.SubprocessBackend)
+
+
+if __name__ == "__main__":
+    unittest.main()
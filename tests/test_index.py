@@ -0,0 +1,100 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from ideacli import index
+from ideacli.list import list_ideas
+
+
+class DummyArgs:
+    def __init__(self, path):
+        self.path = path
+
+
+class TestIndex(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.repo_dir = os.path.join(self.temp_dir, ".ideas_repo")
+        self.conv_dir = os.path.join(self.repo_dir, "conversations")
+        os.makedirs(self.conv_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write_idea(self, idea_id, subject, **extra):
+        idea = {"id": idea_id, "subject": subject, "body": "body"}
+        idea.update(extra)
+        with open(os.path.join(self.conv_dir, f"{idea_id}.json"), "w", encoding="utf-8") as f:
+            json.dump(idea, f)
+        return idea
+
+    def test_entries_indexes_new_files(self):
+        self.write_idea("aaa", "First")
+        self.write_idea("bbb", "Second", state="updated")
+
+        self.assertEqual(
+            index.entries(self.repo_dir),
+            [("aaa", "First", None), ("bbb", "Second", "updated")]
+        )
+        # The cache must never end up in the ideas repo's history
+        with open(os.path.join(self.repo_dir, ".cache", ".gitignore"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "*\n")
+
+    def test_entries_picks_up_external_edits_and_removals(self):
+        self.write_idea("aaa", "First")
+        self.write_idea("bbb", "Second")
+        index.entries(self.repo_dir)
+
+        self.write_idea("aaa", "First, edited by hand")
+        os.utime(os.path.join(self.conv_dir, "aaa.json"), ns=(1, 1))
+        os.remove(os.path.join(self.conv_dir, "bbb.json"))
+
+        self.assertEqual(index.entries(self.repo_dir), [("aaa", "First, edited by hand", None)])
+
+    def test_unchanged_files_are_not_reread(self):
+        self.write_idea("aaa", "First")
+        index.entries(self.repo_dir)
+
+        with patch("ideacli.index._read_metadata") as mock_read:
+            index.entries(self.repo_dir)
+        mock_read.assert_not_called()
+
+    def test_scan_needed(self):
+        fine = 5 * 10**9 + 123
+        coarse = 5 * 10**9
+        self.assertTrue(index.scan_needed(fine, None))
+        self.assertTrue(index.scan_needed(fine, (fine - 1, fine + 10**9)))
+        self.assertFalse(index.scan_needed(fine, (fine, fine + index.FINE_RACY_NS)))
+        self.assertTrue(index.scan_needed(fine, (fine, fine + 1000)))
+        self.assertTrue(index.scan_needed(coarse, (coarse, coarse + 10**9)))
+        self.assertFalse(index.scan_needed(coarse, (coarse, coarse + index.RACY_NS)))
+
+    def test_record_updates_entry(self):
+        idea = self.write_idea("aaa", "First")
+        index.entries(self.repo_dir)
+
+        idea["subject"] = "Renamed"
+        with open(os.path.join(self.conv_dir, "aaa.json"), "w", encoding="utf-8") as f:
+            json.dump(idea, f)
+        index.record(self.repo_dir, "aaa", idea)
+
+        with patch("ideacli.index._read_metadata") as mock_read:
+            self.assertEqual(index.entries(self.repo_dir), [("aaa", "Renamed", None)])
+        mock_read.assert_not_called()
+
+    def test_list_ideas_uses_index(self):
+        self.write_idea("bbb", "beta")
+        self.write_idea("aaa", "Alpha")
+
+        with patch("sys.stdout", new_callable=io.StringIO) as out:
+            list_ideas(DummyArgs(self.temp_dir))
+
+        self.assertEqual(out.getvalue(), "[aaa] Alpha\n[bbb] beta\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from ideacli import config, loader
+
+
+class TestLoader(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.paths = []
+        for n in range(20):
+            path = os.path.join(self.temp_dir, f"{n:02d}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"id": str(n)}, f)
+            self.paths.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_results_keep_input_order(self):
+        results = loader.load_all(self.temp_dir, self.paths, workers=8, processes=False)
+
+        self.assertEqual([r["id"] for r in results], [str(n) for n in range(20)])
+
+    def test_errors_are_returned_not_raised(self):
+        with open(self.paths[3], "w", encoding="utf-8") as f:
+            f.write("{broken")
+        missing = os.path.join(self.temp_dir, "missing.json")
+
+        results = loader.load_all(self.temp_dir, [self.paths[3], missing, self.paths[4]],
+                                  workers=2, processes=False)
+
+        self.assertIsInstance(results[0], ValueError)
+        self.assertIsInstance(results[1], OSError)
+        self.assertEqual(results[2], {"id": "4"})
+
+    def test_worker_count_precedence(self):
+        with patch.dict(os.environ, {"IDEACLI_WORKERS": "3"}):
+            self.assertEqual(loader.worker_count(self.temp_dir), 3)
+            self.assertEqual(loader.worker_count(self.temp_dir, 5), 5)
+
+        with open(os.path.join(self.temp_dir, "config.json"), "w", encoding="utf-8") as f:
+            json.dump({"workers": 2}, f)
+        self.assertEqual(loader.worker_count(self.temp_dir), 2)
+
+    def test_config_is_parsed_again_only_when_changed(self):
+        config_file = os.path.join(self.temp_dir, "config.json")
+        with open(config_file, "w", encoding="utf-8") as f:
+            json.dump({"workers": 2}, f)
+        with patch("ideacli.config.json.load", wraps=json.load) as parse:
+            self.assertEqual(config.get(self.temp_dir, "workers"), 2)
+            self.assertEqual(config.get(self.temp_dir, "workers"), 2)
+            self.assertEqual(parse.call_count, 1)
+
+            with open(config_file, "w", encoding="utf-8") as f:
+                json.dump({"workers": 12}, f)
+            self.assertEqual(config.get(self.temp_dir, "workers"), 12)
+            self.assertEqual(parse.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
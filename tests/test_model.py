@@ -0,0 +1,83 @@
+import json
+import unittest
+
+from ideacli.model import Conversation
+
+IDEA = {
+    "id": "abcd1234",
+    "subject": "Subject",
+    "state": "updated",
+    "created": "2024-01-01",
+    "body": "Body",
+    "files": {
+        "a.py": {"content": "print(1)", "path": "src"},
+        "legacy.txt": "plain content",
+        "state": "not a file",
+    },
+    "response": {
+        "analysis": "Looks fine",
+        "files": [{"name": "b.py", "content": "print(2)", "path": "lib/"}],
+    },
+}
+
+
+class TestConversation(unittest.TestCase):
+    def load(self, idea=IDEA):
+        return Conversation.from_json(json.dumps(idea).encode("utf-8"))
+
+    def test_header_only_decodes_nothing_else(self):
+        conversation = self.load()
+
+        self.assertEqual((conversation.id, conversation.subject, conversation.state),
+                         ("abcd1234", "Subject", "updated"))
+        self.assertEqual(conversation.body, "Body")
+        self.assertEqual(conversation._values, {})
+
+    def test_heavy_fields_decode_one_at_a_time(self):
+        conversation = self.load()
+
+        self.assertEqual(conversation.response["analysis"], "Looks fine")
+        self.assertEqual(list(conversation._values), ["response"])
+        self.assertIsNone(conversation.prompt)
+        self.assertNotIn("prompt", conversation)
+
+    def test_file_listing_skips_contents_and_non_files(self):
+        conversation = self.load()
+
+        self.assertEqual(conversation.file_paths(), ["legacy.txt", "lib/b.py", "src/a.py"])
+        self.assertEqual(conversation.file_names(), ["a.py", "b.py", "legacy.txt"])
+        self.assertEqual(conversation._values, {})
+
+    def test_round_trip_keeps_unknown_keys_and_order(self):
+        conversation = self.load()
+        conversation.subject = "Renamed"
+        conversation.response["conclusion"] = "Done"
+
+        expected = json.loads(json.dumps(IDEA))
+        expected["subject"] = "Renamed"
+        expected["response"]["conclusion"] = "Done"
+        self.assertEqual(conversation.to_dict(), expected)
+        self.assertEqual(list(conversation.to_dict()), list(IDEA))
+
+    def test_from_dict_and_deletion(self):
+        conversation = Conversation.from_dict({"id": "x", "subject": 42, "files": {"a": "b"}})
+
+        self.assertEqual(conversation.subject, "42")
+        self.assertEqual(conversation.file_names(), ["a"])
+        del conversation["files"]
+        self.assertEqual(conversation.to_dict(), {"id": "x", "subject": "42"})
+
+    def test_non_string_header_values_become_json_text(self):
+        conversation = self.load({"id": "x", "subject": True, "body": ["a", 1], "state": None})
+
+        self.assertEqual((conversation.subject, conversation.body, conversation.state),
+                         ("true", '["a",1]', None))
+
+    def test_invalid_conversations_raise_value_error(self):
+        for data in (b"[1, 2]", b'{"id": '):
+            with self.subTest(data=data), self.assertRaises(ValueError):
+                Conversation.from_json(data).to_dict()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from ideacli import index, migrate, paths, store
+
+
+class TestPaths(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.repo_path = os.path.join(self.temp_dir, ".ideas_repo")
+        os.makedirs(os.path.join(self.repo_path, "conversations"))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def save(self, idea_id):
+        idea_file = paths.idea_path(self.repo_path, idea_id)
+        paths.ensure_parent(idea_file)
+        store.save_conversation(idea_file, {"id": idea_id, "subject": f"About {idea_id}"})
+        return idea_file
+
+    def test_flat_layout_by_default(self):
+        self.assertEqual(paths.idea_path(self.repo_path, "abcd1234"),
+                         os.path.join(self.repo_path, "conversations", "abcd1234.json"))
+
+    def test_relayout_round_trip(self):
+        for idea_id in ("abcd1234", "ab999999", "12345678"):
+            self.save(idea_id)
+        self.assertEqual([entry[0] for entry in index.entries(self.repo_path)],
+                         ["12345678", "ab999999", "abcd1234"])
+
+        self.assertEqual(migrate.relayout(self.repo_path, "sharded"), 3)
+        self.assertEqual(paths.layout(self.repo_path), "sharded")
+        self.assertEqual(paths.idea_path(self.repo_path, "abcd1234"),
+                         os.path.join(self.repo_path, "conversations", "ab", "abcd1234.json"))
+        self.assertTrue(os.path.isfile(paths.idea_path(self.repo_path, "ab999999")))
+        self.assertEqual(sorted(os.listdir(paths.conversation_dir(self.repo_path))),
+                         ["12", "ab"])
+        # The settings file is preserved, layout added
+        with open(os.path.join(self.repo_path, "config.json"), encoding="utf-8") as f:
+            self.assertEqual(json.load(f), {"layout": "sharded"})
+
+        # Writes follow the new layout and are picked up by scans
+        self.save("ff000000")
+        self.assertEqual(len(paths.scan(self.repo_path)), 4)
+        self.assertEqual(len(index.entries(self.repo_path)), 4)
+
+        self.assertEqual(migrate.relayout(self.repo_path, "flat"), 4)
+        self.assertEqual(sorted(os.listdir(paths.conversation_dir(self.repo_path))),
+                         ["12345678.json", "ab999999.json", "abcd1234.json", "ff000000.json"])
+
+    def test_scan_reads_both_layouts(self):
+        self.save("abcd1234")
+        os.makedirs(os.path.join(self.repo_path, "conversations", "12"))
+        store.save_conversation(
+            os.path.join(self.repo_path, "conversations", "12", "12345678.json"), {"id": "x"})
+
+        self.assertEqual(sorted(paths.scan(self.repo_path)), ["12345678", "abcd1234"])
+
+
+if __name__ == "__main__":
+    unittest.main()
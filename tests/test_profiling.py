@@ -0,0 +1,71 @@
+"""Tests for the timing and profiling options."""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from ideacli import cli, codec, profiling
+
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_instrument_records_and_restores(self):
+        original = codec.loads
+        recorder = profiling.Recorder()
+        restore = profiling.instrument(recorder)
+        try:
+            codec.loads(b'{"a": 1}')
+            codec.loads(b'{"a": 2}')
+        finally:
+            restore()
+
+        self.assertIs(codec.loads, original)
+        self.assertEqual(recorder.spans["json.decode"][0], 2)
+        report = recorder.to_dict("show", 0.5)
+        self.assertEqual(report["spans"]["json.decode"]["calls"], 2)
+        self.assertIn("json.decode", profiling.format_report(report))
+
+    def test_reports_even_when_the_command_exits(self):
+        output = os.path.join(self.temp_dir, "timings.json")
+        profile = os.path.join(self.temp_dir, "profile.out")
+
+        def command(args):
+            codec.dumps({"id": "x"})
+            sys.exit(3)
+
+        with self.assertRaises(SystemExit), mock.patch("sys.stderr"):
+            profiling.run("add", lambda name: command, None, timings_json=output,
+                          profile=profile, trace_memory=True)
+
+        with open(output, encoding="utf-8") as f:
+            report = json.load(f)
+        self.assertEqual(report["command"], "add")
+        self.assertEqual(set(report["spans"]), {"import", "json.encode"})
+        self.assertTrue(os.path.getsize(profile))
+
+    def test_cli_flag_runs_the_command_in_process(self):
+        output = os.path.join(self.temp_dir, "timings.json")
+        argv = ["ideacli", "--timings-json", output, "list", "--path", self.temp_dir]
+
+        with mock.patch.object(sys, "argv", argv), \
+                mock.patch("ideacli.daemon.forward") as forward, \
+                mock.patch("ideacli.list.list_ideas") as list_ideas:
+            cli.main()
+
+        forward.assert_not_called()
+        list_ideas.assert_called_once()
+        with open(output, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["command"], "list")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""Tests for budgeted prompt assembly."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from ideacli import prompt
+
+
+class TestPromptBuilder(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.source = os.path.join(self.temp_dir, "big.py")
+        with open(self.source, "w", encoding="utf-8") as f:
+            f.writelines(f"def function_{n}(argument):\n    return argument * {n}\n"
+                         for n in range(2000))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_without_budget_files_are_quoted_whole(self):
+        builder = prompt.PromptBuilder()
+        builder.add("Question\n\nHere are the files you requested:\n")
+        builder.add_file("a.py", content="a = 1\n")
+        builder.add_file("missing.py")
+        builder.add("\n\nAnswer.")
+
+        self.assertEqual(builder.text(), "Question\n\nHere are the files you requested:\n"
+                                         "--- a.py ---\na = 1\n\n--- missing.py ---\n"
+                                         "[File not found]\n\nAnswer.")
+        self.assertEqual([s["status"] for s in builder.stats], ["included", "missing"])
+
+    def test_budget_truncates_then_omits(self):
+        builder = prompt.PromptBuilder(max_tokens=2000)
+        builder.reserve("Closing instructions.")
+        builder.add_file("small.py", content="x = 1\n")
+        builder.add_file("big.py", path=self.source)
+        builder.add_file("after.py", content="y = 2\n" * 100)
+        builder.add("Closing instructions.", reserved=True)
+
+        self.assertEqual([s["status"] for s in builder.stats],
+                         ["included", "truncated", "omitted"])
+        self.assertLessEqual(prompt.estimate_tokens(builder.text()), 2000)
+        self.assertTrue(builder.text().endswith("Closing instructions."))
+        self.assertIn("truncated to", prompt.format_stats(builder.stats))
+
+    def test_character_budget(self):
+        builder = prompt.PromptBuilder(max_chars=5000)
+        builder.add_file("big.py", path=self.source)
+
+        self.assertLessEqual(len(builder.text()), 5000)
+        self.assertEqual(builder.stats[0]["status"], "truncated")
+
+    def test_token_estimates_are_cached_by_content(self):
+        repo_path = os.path.join(self.temp_dir, ".ideas_repo")
+        os.makedirs(repo_path)
+        cache = prompt.TokenCache(repo_path)
+        try:
+            first = prompt.PromptBuilder(cache=cache).add_file("big.py", path=self.source)
+            cache.put("unrelated", 1, 1)
+            with open(self.source, encoding="utf-8") as f:
+                content = f.read()
+            second = prompt.PromptBuilder(cache=cache).add_file("copy.py", content=content)
+        finally:
+            cache.close()
+
+        self.assertEqual((first["chars"], first["tokens"]), (second["chars"], second["tokens"]))
+        cache = prompt.TokenCache(repo_path)
+        try:
+            self.assertEqual(cache.get("unrelated"), (1, 1))
+        finally:
+            cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""Tests for the LLM provider, the mock server and 'ideacli drive'."""
+
+import asyncio
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from ideacli import mockserver, provider, store
+from ideacli.drive import drive
+from ideacli.model import Conversation
+from ideacli.update import apply_response
+
+IDEAS = {
+    "aaaa1111": {"id": "aaaa1111", "subject": "Start a project", "body": "From scratch",
+                 "state": "added"},
+    "bbbb2222": {"id": "bbbb2222", "subject": "Fix it", "body": "Something is broken",
+                 "state": "added",
+                 "files": {"main.py": {"content": "print(1)\n"},
+                           "util.py": {"content": "x = 1\n"},
+                           "other.py": {"content": "y = 2\n"}}},
+}
+
+
+class TestProvider(unittest.TestCase):
+    def setUp(self):
+        self.server, self.base_url = mockserver.start(fail_every=2)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_complete_retries_rate_limits(self):
+        llm = provider.OpenAIProvider(self.base_url, "mock", retries=2, concurrency=4)
+
+        async def ask():
+            return await asyncio.gather(*(llm.complete("Hello") for _ in range(4)))
+
+        try:
+            replies = asyncio.run(ask())
+        finally:
+            llm.close()
+        self.assertEqual(len(replies), 4)
+        self.assertIn("README.md", replies[0])
+        self.assertGreater(self.server.requests, 4)
+
+    def test_complete_gives_up(self):
+        self.server.fail_every = 1
+        llm = provider.OpenAIProvider(self.base_url, "mock", retries=2)
+        try:
+            with self.assertRaises(provider.ProviderError) as caught:
+                asyncio.run(llm.complete("Hello"))
+        finally:
+            llm.close()
+        self.assertTrue(caught.exception.retryable)
+        self.assertEqual(self.server.requests, 3)
+
+    def test_parse_reply(self):
+        self.assertEqual(provider.parse_reply('["a.py"]'), ["a.py"])
+        self.assertEqual(provider.parse_reply('Sure:\n```json\n{"a": 1}\n```\nDone'), {"a": 1})
+        self.assertEqual(provider.parse_reply('Here it is: {"a": [1]} as asked'), {"a": [1]})
+        with self.assertRaises(ValueError):
+            provider.parse_reply("No JSON here")
+
+    def test_apply_response_rejects_scalars(self):
+        for state, reply in (("analysis requested", True), ("analysis requested", "a.py"),
+                             ("analysis requested", {"files_needed": "a.py"}),
+                             ("updated", 5), ("updated", ["a.py"])):
+            conversation = Conversation.from_dict({"id": "aaaa1111", "state": state})
+            with self.subTest(state=state, reply=reply), self.assertRaises(ValueError):
+                apply_response("/nonexistent", conversation, reply)
+
+
+class TestDrive(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.repo_path = os.path.join(self.temp_dir, ".ideas_repo")
+        os.makedirs(os.path.join(self.repo_path, "conversations"))
+        for idea_id, idea in IDEAS.items():
+            store.save_conversation(
+                os.path.join(self.repo_path, "conversations", f"{idea_id}.json"), idea)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_drive_all_answers_every_idea(self):
+        args = SimpleNamespace(path=self.temp_dir, id=None, all=True, state="added",
+                               select=None, concurrency=2, rpm=None, retries=None,
+                               base_url=None, model=None, mock=True, workers=None)
+        with patch("sys.stdout", new_callable=io.StringIO) as out:
+            drive(args)
+        self.assertIn("Drove 2 ideas", out.getvalue())
+
+        new = store.load_conversation(
+            os.path.join(self.repo_path, "conversations", "aaaa1111.json"))
+        self.assertEqual(new["state"], "added")
+        self.assertIn("README.md", new["response"]["files"])
+
+        fix = store.load_conversation(
+            os.path.join(self.repo_path, "conversations", "bbbb2222.json"))
+        self.assertEqual(fix["state"], "added")
+        self.assertEqual(len(fix["files_needed"]), 2)
+        self.assertIn(f"--- {fix['files_needed'][0]} ---", fix["last_prompt"])
+        self.assertEqual(fix["response"]["conclusion"], "Nothing to change.")
+
+
+if __name__ == "__main__":
+    unittest.main()
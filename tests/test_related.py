@@ -0,0 +1,54 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from ideacli import related, store
+
+
+@unittest.skipUnless(related.HAS_NUMPY, "numpy not installed")
+class TestRelated(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.repo_path = os.path.join(self.temp_dir, ".ideas_repo")
+        os.makedirs(os.path.join(self.repo_path, "conversations"))
+        self.save("a1", "Faster JSON parser", "Speed up the JSON parser with a tokenizer")
+        self.save("b2", "JSON parser errors", "Better error messages from the parser")
+        self.save("c3", "Dark mode", "Add a dark theme to the web page")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def save(self, idea_id, subject, body):
+        store.save_conversation(
+            os.path.join(self.repo_path, "conversations", f"{idea_id}.json"),
+            {"id": idea_id, "subject": subject, "body": body}
+        )
+
+    def test_features_are_normalised(self):
+        weights = [w for _, w in related.features({"subject": "a parser", "body": "parser"})]
+        self.assertAlmostEqual(sum(w * w for w in weights), 1.0)
+
+    def test_most_similar_first(self):
+        results = related.related(self.repo_path, "a1")
+        self.assertEqual([name for name, _ in results], ["b2", "c3"])
+        self.assertGreater(results[0][1], results[1][1])
+
+    def test_refresh_updates_changed_rows(self):
+        related.related(self.repo_path, "a1")
+        self.save("c3", "Dark mode", "Render tokenizer output in a dark theme")
+        self.save("d4", "Parser speed", "A faster JSON tokenizer")
+        os.remove(os.path.join(self.repo_path, "conversations", "b2.json"))
+
+        names = [name for name, _ in related.related(self.repo_path, "a1", k=5)]
+        self.assertEqual(names[0], "d4")
+        self.assertIn("c3", names)
+        self.assertNotIn("b2", names)
+
+    def test_unknown_idea(self):
+        with self.assertRaises(KeyError):
+            related.related(self.repo_path, "zz")
+
+
+if __name__ == "__main__":
+    unittest.main()
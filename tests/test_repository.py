@@ -1,13 +1,17 @@
+import io
 import os
 import tempfile
 import unittest
 from unittest.mock import patch
-from ideacli.repository import init_repo, resolve_idea_path, status
+from ideacli import store
+from ideacli.repository import init_repo, resolve_idea_id, resolve_idea_path, status
+
 
 class DummyArgs:
     def __init__(self, path=None):
         self.path = path
 
+
 class TestRepository(unittest.TestCase):
     def setUp(self):
         self.temp_dir = tempfile.mkdtemp()
@@ -37,7 +41,7 @@ class TestRepository(unittest.TestCase):
             resolve_idea_path(self.mock_args)
 
     @patch("ideacli.repository.resolve_idea_path")
-    @patch("ideacli.repository.subprocess.check_output")
+    @patch("ideacli.gitbackend.subprocess.check_output")
     @patch("ideacli.repository.os.listdir")
     @patch("ideacli.repository.os.path.isdir")
     def test_status_with_repo(self, mock_isdir, mock_listdir, mock_check_output, mock_resolve):
@@ -46,10 +50,43 @@ class TestRepository(unittest.TestCase):
         os.makedirs(conversations_path, exist_ok=True)
         mock_isdir.side_effect = lambda path: True
         mock_listdir.return_value = ["idea1.json", "idea2.json"]
-        mock_check_output.side_effect = lambda *args, **kwargs: "On branch main\nnothing to commit\n"
+        mock_check_output.side_effect = (
+            lambda *args, **kwargs: "On branch main\nnothing to commit\n")
 
         result = status(self.mock_args)
         self.assertTrue(result)
 
+    @patch("ideacli.gitbackend.get_backend")
+    def test_status_counts_states_and_fast_skips_git(self, mock_backend):
+        conversations_path = os.path.join(self.repo_path, "conversations")
+        os.makedirs(conversations_path)
+        for idea_id, state in (("1111", "added"), ("2222", "updated"), ("3333", "added")):
+            store.save_conversation(os.path.join(conversations_path, f"{idea_id}.json"),
+                                    {"id": idea_id, "subject": "S", "state": state})
+        self.mock_args.fast = True
+
+        with patch("sys.stdout", new_callable=io.StringIO) as out:
+            self.assertTrue(status(self.mock_args))
+
+        self.assertIn("Number of conversations: 3\n  added: 2\n  updated: 1\n", out.getvalue())
+        mock_backend.assert_not_called()
+
+    def test_resolve_idea_id_prefixes(self):
+        conversations_path = os.path.join(self.repo_path, "conversations")
+        os.makedirs(conversations_path)
+        for idea_id in ("1234abcd", "1234ef01", "5678abcd"):
+            store.save_conversation(os.path.join(conversations_path, f"{idea_id}.json"),
+                                    {"id": idea_id})
+
+        self.assertEqual(resolve_idea_id(self.repo_path, "5678"), "5678abcd")
+        self.assertEqual(resolve_idea_id(self.repo_path, "1234e"), "1234ef01")
+        self.assertEqual(resolve_idea_id(self.repo_path, "1234abcd"), "1234abcd")
+        # Too short or unknown IDs are left for the command to report
+        self.assertEqual(resolve_idea_id(self.repo_path, "567"), "567")
+        self.assertEqual(resolve_idea_id(self.repo_path, "9999"), "9999")
+        with self.assertRaises(SystemExit):
+            resolve_idea_id(self.repo_path, "1234")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,70 @@
+"""Tests for local file selection."""
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from ideacli import retrieval, store
+from ideacli.enquire import enquire
+from ideacli.model import Conversation
+
+IDEA = {
+    "id": "abcd1234",
+    "subject": "Retry failed uploads",
+    "body": "The uploadFile function should retry when the network drops.",
+    "state": "added",
+    "files": {
+        "uploader.py": {"content": "def upload_file(path):\n    send(path)\n", "path": "src"},
+        "network.py": {"content": "def send(data):\n    socket.write(data)\n"},
+        "colours.css": {"content": "body { color: red; }\n"},
+    },
+}
+
+
+class TestRetrieval(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.repo_path = os.path.join(self.temp_dir, ".ideas_repo")
+        os.makedirs(os.path.join(self.repo_path, "conversations"))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_words_split_identifiers(self):
+        self.assertEqual(retrieval.words("uploadFile upload_file The HTTPServer"),
+                         ["upload", "file", "upload", "file", "httpserver"])
+
+    def test_select_files_ranks_and_limits(self):
+        conversation = Conversation.from_dict(dict(IDEA))
+
+        picked = retrieval.select_files(self.repo_path, conversation)
+        self.assertEqual([name for name, _ in picked], ["uploader.py", "network.py"])
+        self.assertEqual(len(retrieval.select_files(self.repo_path, conversation, 1)), 1)
+
+        conversation.subject, conversation.body = "Unrelated", "Nothing in common"
+        self.assertEqual(retrieval.select_files(self.repo_path, conversation), [])
+
+    def test_enquire_with_bm25_skips_the_files_question(self):
+        idea_file = os.path.join(self.repo_path, "conversations", "abcd1234.json")
+        store.save_conversation(idea_file, IDEA)
+        args = SimpleNamespace(path=self.temp_dir, id="abcd1234", prompt=None, output=None,
+                               select="bm25")
+
+        with patch("ideacli.enquire.load_pyperclip", return_value=None), \
+                patch("sys.stdout", new_callable=io.StringIO):
+            enquire(args)
+
+        idea = store.load_conversation(idea_file)
+        self.assertEqual(idea["state"], "updated")
+        self.assertEqual(idea["files_needed"], ["uploader.py", "network.py"])
+        self.assertIn("--- uploader.py ---\ndef upload_file", idea["prompt"])
+        self.assertEqual(idea["last_prompt"], idea["prompt"])
+        self.assertNotIn("colours.css", idea["prompt"])
+
+
+if __name__ == "__main__":
+    unittest.main()
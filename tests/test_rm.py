@@ -0,0 +1,76 @@
+"""Tests for removing a file from an idea."""
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from ideacli import index, store
+from ideacli.rm import remove_file
+
+
+class TestRemoveFile(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.repo_path = os.path.join(self.temp_dir, ".ideas_repo")
+        self.idea_file = os.path.join(self.repo_path, "conversations", "abc12345.json")
+        os.makedirs(os.path.dirname(self.idea_file))
+        store.save_conversation(self.idea_file, {
+            "id": "abc12345", "subject": "Two files", "state": "added",
+            "files": {"a.py": {"content": "a = 1\n"}, "b.py": {"content": "b = 1\n"}}})
+        # Index the conversation as it is before the removal
+        index.entries(self.repo_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def remove(self, file_name, idea_id="abc1"):
+        args = SimpleNamespace(path=self.temp_dir, id=idea_id, file_name=file_name)
+        with patch("ideacli.rm.index.record", wraps=index.record) as record, \
+                patch("sys.stdout", new_callable=io.StringIO) as out:
+            remove_file(args)
+        return out.getvalue(), record
+
+    def indexed(self):
+        conn = index.connect(self.repo_path)
+        try:
+            return conn.execute("SELECT mtime_ns, size FROM ideas WHERE name = ?",
+                                ("abc12345",)).fetchone()
+        finally:
+            conn.close()
+
+    def test_removes_entry_and_refreshes_index(self):
+        output, record = self.remove("a.py")
+
+        self.assertEqual(output, "Removed a.py from idea abc12345\n")
+        self.assertEqual(list(store.load_conversation(self.idea_file)["files"]), ["b.py"])
+        record.assert_called_once()
+        self.assertEqual(record.call_args[0][:2], (self.repo_path, "abc12345"))
+        st = os.stat(self.idea_file)
+        self.assertEqual(self.indexed(), (st.st_mtime_ns, st.st_size))
+
+    def test_unknown_file_changes_nothing(self):
+        with open(self.idea_file, "rb") as f:
+            before = f.read()
+        row = self.indexed()
+
+        output, record = self.remove("missing.py")
+
+        self.assertEqual(output, "File missing.py not found in idea abc12345\n")
+        with open(self.idea_file, "rb") as f:
+            self.assertEqual(f.read(), before)
+        record.assert_not_called()
+        self.assertEqual(self.indexed(), row)
+
+    def test_unknown_idea_exits(self):
+        with self.assertRaises(SystemExit):
+            self.remove("a.py", idea_id="zzzz")
+        self.assertEqual(list(store.load_conversation(self.idea_file)["files"]),
+                         ["a.py", "b.py"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from ideacli import search, store
+
+
+class TestSearch(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.repo_path = os.path.join(self.temp_dir, ".ideas_repo")
+        os.makedirs(os.path.join(self.repo_path, "conversations"))
+        self.save("a1", {"subject": "Faster parser", "body": "Rewrite the tokenizer loop"})
+        self.save("b2", {"subject": "Dark mode", "body": "The parser docs need a dark theme",
+                         "response": {"answer": "Use CSS variables",
+                                      "files": {"theme.css": "body { color: black }"}}})
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def save(self, idea_id, idea):
+        store.save_conversation(
+            os.path.join(self.repo_path, "conversations", f"{idea_id}.json"),
+            dict(idea, id=idea_id)
+        )
+
+    def ids(self, query):
+        return [row[0] for row in search.search(self.repo_path, query)]
+
+    def test_ranks_subject_matches_first(self):
+        self.assertEqual(self.ids("parser"), ["a1", "b2"])
+
+    def test_field_filters_phrases_and_prefixes(self):
+        self.assertEqual(self.ids("body:parser"), ["b2"])
+        self.assertEqual(self.ids('"dark theme"'), ["b2"])
+        self.assertEqual(self.ids('"theme dark"'), [])
+        self.assertEqual(self.ids("files:colo*"), ["b2"])
+        self.assertEqual(self.ids("response:css"), ["b2"])
+        self.assertEqual(self.ids("tokenizer OR variables"), ["a1", "b2"])
+        self.assertEqual(self.ids("parser NOT dark"), ["a1"])
+
+    def test_punctuation_is_not_query_syntax(self):
+        self.assertEqual(self.ids("theme.css"), ["b2"])
+        self.assertEqual(self.ids("unknown:field"), [])
+
+    def test_refresh_picks_up_changes(self):
+        self.ids("parser")
+        self.save("a1", {"subject": "Slower lexer", "body": "Nothing to see"})
+        os.remove(os.path.join(self.repo_path, "conversations", "b2.json"))
+
+        self.assertEqual(self.ids("parser"), [])
+        self.assertEqual(self.ids("lexer"), ["a1"])
+
+    def test_list_form_files_and_non_files_keys(self):
+        self.save("c3", {"subject": "Logging", "body": "Quieter logs",
+                         "files": [{"name": "logger.py", "content": "import syslog"}],
+                         "response": {"files": {"state": "chattering"}}})
+
+        self.assertEqual(self.ids("files:syslog"), ["c3"])
+        self.assertEqual(self.ids("files:logger*"), ["c3"])
+        self.assertEqual(self.ids("chattering"), [])
+
+    def test_empty_query(self):
+        with self.assertRaises(ValueError):
+            search.to_fts_query('"" OR')
+
+
+if __name__ == "__main__":
+    unittest.main()
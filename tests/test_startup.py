@@ -0,0 +1,68 @@
+"""Import-time regression checks for the CLI entry point."""
+
+import os
+import subprocess
+import sys
+import unittest
+
+# Budget for importing what 'ideacli list' or 'ideacli show' imports before
+# running: the CLI, the server forwarding path and the command, in milliseconds.
+# Generous enough for slow CI machines; typical figures are well under half of it.
+IMPORT_BUDGET_MS = float(os.environ.get("IDEACLI_IMPORT_BUDGET_MS", "100"))
+
+# Modules that list/show must not pull in at startup
+HEAVY_MODULES = {
+    "ideacli.add", "ideacli.enquire", "ideacli.update", "ideacli.files",
+    "ideacli.gitbackend", "pyperclip", "dulwich", "importlib.metadata",
+    "subprocess", "concurrent.futures.process",
+}
+
+
+def import_profile(statement, top_level=False):
+    """Return {module: cumulative microseconds} from python -X importtime.
+
+    With top_level, only the modules the statement imported directly (whose
+    cumulative times include all the others) are returned.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, check=True
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if top_level and name.startswith("  "):
+            continue
+        if cumulative.strip().isdigit():
+            profile[name.strip()] = int(cumulative)
+    return profile
+
+
+class TestStartup(unittest.TestCase):
+    def check_command(self, module):
+        # cli.main imports ideacli.daemon to try a running server before the command
+        statement = f"import ideacli.cli, ideacli.daemon, {module}"
+        profile = import_profile(statement)
+        self.assertFalse(HEAVY_MODULES & set(profile), "heavy modules imported at startup")
+
+        top_level = import_profile(statement, top_level=True)
+        self.assertIn("ideacli.daemon", top_level)
+        elapsed_ms = sum(us for name, us in top_level.items() if name.startswith("ideacli")) / 1000
+        self.assertLess(elapsed_ms, IMPORT_BUDGET_MS)
+
+    def test_list_startup(self):
+        self.check_command("ideacli.list")
+
+    def test_show_startup(self):
+        self.check_command("ideacli.show")
+
+    def test_version_is_lazy(self):
+        profile = import_profile("import ideacli")
+
+        self.assertNotIn("importlib.metadata", profile)
+
+
+if __name__ == "__main__":
+    unittest.main()
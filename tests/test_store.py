@@ -0,0 +1,134 @@
+import gc
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import warnings
+from unittest.mock import patch
+
+from ideacli import config, migrate, store
+
+
+class TestStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.idea_file = os.path.join(self.temp_dir, "idea.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write_raw(self, text):
+        with open(self.idea_file, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def test_save_puts_header_keys_first(self):
+        store.save_conversation(self.idea_file, {
+            "body": "b", "files": {"a.py": "x"}, "state": "updated", "subject": "s", "id": "i"
+        })
+
+        with open(self.idea_file, encoding="utf-8") as f:
+            self.assertEqual(
+                list(json.load(f)),
+                ["id", "subject", "state", "body", "files"]
+            )
+
+    def test_save_skips_unchanged_content(self):
+        idea = {"id": "i", "subject": "s", "body": "b"}
+        self.assertTrue(store.save_conversation(self.idea_file, idea))
+        os.utime(self.idea_file, ns=(0, 0))
+
+        self.assertFalse(store.save_conversation(self.idea_file, dict(idea)))
+        self.assertEqual(os.stat(self.idea_file).st_mtime_ns, 0)
+        self.assertTrue(store.save_conversation(self.idea_file, dict(idea, body="c")))
+        self.assertEqual(os.listdir(self.temp_dir), ["idea.json"])
+
+    def test_save_compact_when_configured(self):
+        with patch.dict(os.environ, {"IDEACLI_COMPACT_JSON": "1"}):
+            store.save_conversation(self.idea_file, {"id": "i", "subject": "s", "state": "added"})
+
+        with open(self.idea_file, encoding="utf-8") as f:
+            self.assertEqual(f.read(), '{"id":"i","subject":"s","state":"added"}')
+        self.assertEqual(store.read_header(self.idea_file),
+                         {"id": "i", "subject": "s", "state": "added"})
+
+    def test_gzip_round_trip(self):
+        idea = {"id": "i", "subject": "s", "state": "added", "body": "b" * 10000}
+        with patch.dict(os.environ, {"IDEACLI_COMPRESSION": "gzip"}):
+            self.assertTrue(store.save_conversation(self.idea_file, idea))
+            self.assertFalse(store.save_conversation(self.idea_file, dict(idea)))
+
+        with open(self.idea_file, "rb") as f:
+            self.assertEqual(f.read(2), b"\x1f\x8b")
+        self.assertLess(os.path.getsize(self.idea_file), 1000)
+        # Readers detect the format whatever the current setting
+        self.assertEqual(store.load_conversation(self.idea_file), idea)
+        self.assertEqual(store.read_header(self.idea_file),
+                         {"id": "i", "subject": "s", "state": "added"})
+        self.assertEqual(json.loads(store.read_bytes(self.idea_file)), idea)
+
+    def test_read_header_closes_compressed_file(self):
+        with patch.dict(os.environ, {"IDEACLI_COMPRESSION": "gzip"}):
+            store.save_conversation(self.idea_file, {"id": "i", "subject": "s"})
+
+        # A leaked file warns from its finalizer, where the error ends up
+        # with sys.unraisablehook rather than in the test
+        unraisable = []
+        with warnings.catch_warnings(), patch("sys.unraisablehook", unraisable.append):
+            warnings.simplefilter("error", ResourceWarning)
+            for _ in range(3):
+                self.assertEqual(store.read_header(self.idea_file), {"id": "i", "subject": "s"})
+            gc.collect()
+        self.assertEqual([hook.exc_value for hook in unraisable], [])
+
+    def test_recompress_converts_every_file(self):
+        repo_path = os.path.join(self.temp_dir, "repo")
+        os.makedirs(os.path.join(repo_path, "conversations"))
+        plain = os.path.join(repo_path, "conversations", "a.json")
+        packed = os.path.join(repo_path, "conversations", "b.json")
+        store.save_conversation(plain, {"id": "a"})
+        with patch.dict(os.environ, {"IDEACLI_COMPRESSION": "gzip"}):
+            store.save_conversation(packed, {"id": "b"})
+
+        self.assertEqual(migrate.recompress(repo_path, "gzip"), 1)
+        self.assertEqual(config.get(repo_path, "compression"), "gzip")
+        self.assertEqual(store.load_conversation(plain), {"id": "a"})
+        self.assertEqual(migrate.recompress(repo_path, "none"), 2)
+        with open(packed, encoding="utf-8") as f:
+            self.assertEqual(json.load(f), {"id": "b"})
+
+    def test_read_header_stops_after_header(self):
+        # Anything after the header keys is never looked at
+        self.write_raw('{"id": "i", "subject": "s", "state": "added", "files": not json at all')
+
+        self.assertEqual(
+            store.read_header(self.idea_file),
+            {"id": "i", "subject": "s", "state": "added"}
+        )
+
+    def test_read_header_handles_legacy_key_order(self):
+        big = "x" * 100000
+        self.write_raw(json.dumps({
+            "id": "i", "body": big, "files": {"a.py": big, "n": [1, 2.5, None]},
+            "count": 12345, "subject": "sé", "state": "updated"
+        }))
+
+        self.assertEqual(
+            store.read_header(self.idea_file),
+            {"id": "i", "subject": "sé", "state": "updated"}
+        )
+
+    def test_read_header_missing_keys(self):
+        self.write_raw('{"id": "i", "subject": "s", "body": "b"}')
+
+        self.assertEqual(store.read_header(self.idea_file), {"id": "i", "subject": "s"})
+
+    def test_read_header_rejects_truncated_file(self):
+        self.write_raw('{"id": "i", "body": "never ends')
+
+        with self.assertRaises(ValueError):
+            store.read_header(self.idea_file)
+
+
+if __name__ == "__main__":
+    unittest.main()